@@ -1,3 +1,4 @@
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
@@ -10,7 +11,8 @@ from sqlalchemy import select
 
 from app.config import settings
 from app.database import get_db
-from app.models import User
+from app.executor import ExecutorSaturated, password_executor
+from app.models import User, UserRole
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
@@ -24,6 +26,41 @@ def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
 
 
+# ── Off-loop hashing ──────────────────────────────────────────────────────────
+# In-flight hashing calls per client IP (only touched from the event loop)
+_hashing_per_client: dict[str, int] = {}
+
+
+async def _run_hashing(client: str, fn, *args):
+    """``fn(*args)`` on the password executor: 429 past PASSWORD_HASH_MAX_PER_IP
+    calls from ``client``, 503 when the executor is saturated."""
+    in_flight = _hashing_per_client.get(client, 0)
+    if in_flight >= settings.PASSWORD_HASH_MAX_PER_IP:
+        raise HTTPException(
+            status.HTTP_429_TOO_MANY_REQUESTS,
+            "Too many concurrent login attempts, retry shortly.",
+            headers={"Retry-After": "1"},
+        )
+    _hashing_per_client[client] = in_flight + 1
+    try:
+        return await password_executor.run(fn, *args)
+    except ExecutorSaturated as exc:
+        raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, str(exc))
+    finally:
+        if _hashing_per_client[client] <= 1:
+            del _hashing_per_client[client]
+        else:
+            _hashing_per_client[client] -= 1
+
+
+async def hash_password_async(password: str, client: str) -> str:
+    return await _run_hashing(client, hash_password, password)
+
+
+async def verify_password_async(plain: str, hashed: str, client: str) -> bool:
+    return await _run_hashing(client, verify_password, plain, hashed)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     # JWT spec requires 'sub' to be a string
@@ -36,6 +73,68 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
+def user_claims(user: User) -> dict:
+    """Token payload for ``user``; the claims beyond ``sub`` are only read
+    when ``AUTH_TRUST_TOKEN_CLAIMS`` is enabled."""
+    return {"sub": user.id, "email": user.email, "name": user.name, "role": user.role.value}
+
+
+# ── User cache ────────────────────────────────────────────────────────────────
+
+class UserCache:
+    """Users by ID for ``ttl_seconds``, so authenticated requests skip the lookup.
+
+    Deactivating a user through this process takes effect at once; other
+    workers stop accepting them once their cached copy expires.
+    """
+
+    def __init__(self, ttl_seconds: float = 30.0, max_entries: int = 10_000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._users: dict[int, tuple[User, float]] = {}
+        self._deactivated: set[int] = set()
+
+    def get(self, user_id: int) -> User | None:
+        entry = self._users.get(user_id)
+        if entry is None:
+            return None
+        if entry[1] < time.monotonic():
+            del self._users[user_id]
+            return None
+        return entry[0]
+
+    def put(self, user: User) -> None:
+        if self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+        if len(self._users) >= self.max_entries:
+            self._users.pop(next(iter(self._users)))
+        self._users[user.id] = (user, time.monotonic() + self.ttl_seconds)
+
+    def from_claims(self, user_id: int, payload: dict) -> User | None:
+        """A detached user built from token claims, or ``None`` to look it up."""
+        if user_id in self._deactivated:
+            return None
+        try:
+            return User(
+                id=user_id, email=payload["email"], name=payload["name"],
+                role=UserRole(payload["role"]), is_active=True,
+            )
+        except (KeyError, ValueError):
+            return None  # issued before the claims were added
+
+    def invalidate(self, user_id: int, active: bool) -> None:
+        """Forget the cached copy after ``is_active`` changed to ``active``."""
+        self._users.pop(user_id, None)
+        if active:
+            self._deactivated.discard(user_id)
+        else:
+            self._deactivated.add(user_id)
+
+
+# ── Module-level singleton ────────────────────────────────────────────────────
+user_cache = UserCache(ttl_seconds=settings.AUTH_USER_CACHE_TTL_SECONDS)
+
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db),
@@ -54,8 +153,21 @@ async def get_current_user(
     except (JWTError, ValueError):
         raise credentials_exception
 
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+    if settings.AUTH_TRUST_TOKEN_CLAIMS:
+        user = user_cache.from_claims(user_id, payload)
     if user is None:
-        raise credentials_exception
+        result = await db.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one_or_none()
+        if user is None or not user.is_active:
+            raise credentials_exception
+    user_cache.put(user)
+    return user
+
+
+async def require_admin(user: User = Depends(get_current_user)) -> User:
+    if user.role != UserRole.admin:
+        raise HTTPException(status.HTTP_403_FORBIDDEN, "Admin privileges required.")
     return user
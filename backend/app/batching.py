@@ -0,0 +1,122 @@
+"""
+batching.py
+-----------
+Async micro-batcher that coalesces concurrent single-row requests.
+
+Requests arriving within ``max_wait_ms`` of each other (or until
+``max_batch_size`` are waiting) are handed to one vectorized handler call on
+the inference executor, and each result is fanned back to its caller.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Callable
+
+from app.config import settings
+from app.executor import InferenceExecutor, inference_executor
+from app.ml_service import model_loader
+from app.model_registry import model_registry
+from app.prediction_cache import canonical_key, prediction_cache
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Collect items for a short window, process them in one call, fan out.
+
+    ``handler`` receives the list of items and must return one result per
+    item, in order; an ``Exception`` instance in place of a result is raised
+    to that item's caller only.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[list], list],
+        executor: InferenceExecutor,
+        max_batch_size: int,
+        max_wait_ms: float,
+    ):
+        self._handler = handler
+        self._executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._pending: list[tuple[Any, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_wait_ms > 0 and self.max_batch_size > 1
+
+    async def submit(self, item: Any) -> Any:
+        """Queue ``item`` for the next batch and await its result."""
+        if not self.enabled:
+            result = (await self._executor.run(self._handler, [item]))[0]
+        else:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._pending.append((item, future))
+            if len(self._pending) >= self.max_batch_size:
+                self._flush()
+            elif self._timer is None:
+                self._timer = loop.call_later(self.max_wait_ms / 1000, self._flush)
+            result = await future
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[Any, asyncio.Future]]) -> None:
+        try:
+            results = await self._executor.run(self._handler, [item for item, _ in batch])
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        logger.debug("Micro-batch of %d processed", len(batch))
+        for (_, future), result in zip(batch, results):
+            if not future.done():  # caller may have gone away
+                future.set_result(result)
+
+
+def _predict_many(rows: list[dict]) -> list:
+    """Cached or freshly scored result per row, on the active model version."""
+    service = model_loader.service()
+    results: list = [None] * len(rows)
+    todo = list(range(len(rows)))
+    if prediction_cache.enabled:
+        keys = [canonical_key(row, service.version) for row in rows]
+        results = prediction_cache.get_many(keys)
+        todo = [i for i, result in enumerate(results) if result is None]
+    if todo:
+        fresh = service.predict_many([rows[i] for i in todo])
+        for i, result in zip(todo, fresh):
+            results[i] = result
+        if prediction_cache.enabled:
+            prediction_cache.put_many(
+                [(keys[i], r) for i, r in zip(todo, fresh) if not isinstance(r, Exception)],
+                service.version,
+            )
+    model_registry.record_rows(rows, results)
+    return results
+
+
+# ── Module-level singleton ────────────────────────────────────────────────────
+single_batcher = MicroBatcher(
+    handler=_predict_many,
+    executor=inference_executor,
+    max_batch_size=settings.CLASSIFY_BATCH_MAX_SIZE,
+    max_wait_ms=settings.CLASSIFY_BATCH_WINDOW_MS,
+)
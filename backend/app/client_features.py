@@ -0,0 +1,54 @@
+"""
+client_features.py
+------------------
+Stored ``Client`` rows as raw pipeline records.
+
+``PIPELINE_COLUMNS`` inverts ``seed_clients.COLUMN_MAP`` (minus the target
+column), so clients can be scored straight from the database instead of the
+caller resending every raw field.
+"""
+
+from __future__ import annotations
+
+import hashlib
+
+import orjson
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Client
+from app.seed_clients import COLUMN_MAP
+
+TARGET_COLUMN = "Purchased_Coverage_Bundle"
+
+# Client model field → pipeline (train.csv) column
+PIPELINE_COLUMNS = {
+    field: column for column, field in COLUMN_MAP.items() if column != TARGET_COLUMN
+}
+FEATURE_COLUMNS = list(PIPELINE_COLUMNS.values())
+
+
+async def fetch_client_features(
+    db: AsyncSession, ids: list[int]
+) -> tuple[list[int], list[tuple]]:
+    """Client IDs found and their pipeline values, in the order of ``ids``.
+
+    One query for all IDs; only the feature columns are selected. Each value
+    tuple is ordered like ``FEATURE_COLUMNS``.
+    """
+    query = select(
+        Client.id, *(getattr(Client, field) for field in PIPELINE_COLUMNS)
+    ).where(Client.id.in_(ids))
+    found = {row[0]: tuple(row[1:]) for row in (await db.execute(query)).all()}
+    ordered = [i for i in ids if i in found]
+    return ordered, [found[i] for i in ordered]
+
+
+def features_hash(values: tuple) -> str:
+    """Hash of one client's pipeline values, to detect changed rows."""
+    return hashlib.blake2b(orjson.dumps(values), digest_size=16).hexdigest()
+
+
+def as_record(values: tuple) -> dict:
+    """One client's values as a raw row dict keyed by pipeline column."""
+    return dict(zip(FEATURE_COLUMNS, values))
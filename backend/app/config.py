@@ -4,16 +4,124 @@ import os
 
 class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite+aiosqlite:///./broker.db"
+    # Read-only engine for dashboard reads; empty means DATABASE_URL.
+    DATABASE_READ_URL: str = ""
+
+    # Connection pool per engine. Recycle and pre-ping apply to server
+    # databases (PostgreSQL); SQLite file connections do not go stale.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+
+    # Applied to every SQLite connection: WAL lets reads run while a write
+    # is in progress; NORMAL is durable across application crashes in WAL.
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_BUSY_TIMEOUT_MS: int = 5_000
     SECRET_KEY: str = "super-secret-key-change-in-production-2026"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24  # 24 hours
 
+    # Authenticated users are cached per worker for this long instead of being
+    # read on every request (0 disables). Trusting token claims skips the
+    # lookup entirely: a user deactivated through another worker keeps access
+    # until their token expires.
+    AUTH_USER_CACHE_TTL_SECONDS: float = 30
+    AUTH_TRUST_TOKEN_CLAIMS: bool = False
+
+    # Inference executor: worker threads and how many calls may wait for one
+    # before classification endpoints answer 503.
+    INFERENCE_WORKERS: int = 2
+    INFERENCE_MAX_QUEUE: int = 16
+
+    # bcrypt for login/register runs on its own pool: worker threads, calls
+    # allowed to wait before answering 503, and concurrent hashing calls per
+    # client IP before answering 429.
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+    PASSWORD_HASH_MAX_PER_IP: int = 2
+
+    # Reverse proxies (comma-separated IPs or networks, "*" for any) whose
+    # X-Forwarded-For header gives the client IP for per-IP limits. Empty
+    # leaves it to the server: uvicorn trusts FORWARDED_ALLOW_IPS (default
+    # 127.0.0.1), otherwise every client behind a proxy shares one IP.
+    TRUSTED_PROXIES: str = ""
+
+    # Micro-batching for /api/classify/single: concurrent requests arriving
+    # within the window are scored together (window <= 0 disables it).
+    CLASSIFY_BATCH_WINDOW_MS: float = 2.0
+    CLASSIFY_BATCH_MAX_SIZE: int = 64
+
+    # Rows parsed and scored per chunk by /api/classify/batch/stream.
+    CLASSIFY_STREAM_CHUNK_ROWS: int = 10_000
+
+    # Client IDs accepted by one /api/classify/clients?ids= request.
+    CLASSIFY_CLIENTS_MAX_IDS: int = 5_000
+
+    # Predicted-class SHAP explanations kept in the LRU cache (0 disables it).
+    SHAP_CACHE_SIZE: int = 10_000
+
+    # Native UBJSON booster from ml/pipelines/export_model.py; empty means
+    # model.ubj next to model.joblib (used when present, else the joblib).
+    MODEL_BOOSTER_PATH: str = ""
+
+    # Load the model in the background at startup; otherwise on first use.
+    MODEL_WARMUP: bool = True
+
+    # Refuse to load a model without its fitted preprocessor.joblib (from
+    # ml/pipelines/fit_preprocessor.py). Otherwise a warning is logged and the
+    # population statistics are fit on each request batch.
+    REQUIRE_PREPROCESSOR: bool = False
+
+    # Hot reload: versions kept loaded (active, previous and shadow are never
+    # evicted), recent request rows replayed to warm a new version, and
+    # shadow-scoring calls allowed to queue before further ones are dropped.
+    MODEL_REGISTRY_MAX_VERSIONS: int = 3
+    MODEL_WARMUP_SAMPLE_ROWS: int = 64
+    MODEL_SHADOW_MAX_PENDING: int = 4
+    # POST /api/models/load only reads model files inside this directory
+    # (relative paths are taken from it).
+    MODEL_DIR: str = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+        "front-end",
+        "src",
+    )
+
+    # /api/classify/single results cached per (client features, model version):
+    # entries (0 disables), time-to-live, and an optional SQLite file shared
+    # between workers (empty keeps the cache in-process only).
+    PREDICTION_CACHE_SIZE: int = 10_000
+    PREDICTION_CACHE_TTL_SECONDS: float = 3600
+    PREDICTION_CACHE_PATH: str = ""
+
+    # Stored client predictions: clients scored per rescoring step, whether
+    # a model change (including the startup load) triggers an incremental pass,
+    # and how often a pass runs anyway to catch clients written by other
+    # processes such as the seed script (0 disables).
+    CLIENT_RESCORE_CHUNK_ROWS: int = 5_000
+    CLIENT_RESCORE_ON_MODEL_CHANGE: bool = True
+    CLIENT_RESCORE_INTERVAL_SECONDS: float = 600
+
+    # Dashboard summary older than this is refreshed in the background while
+    # the stale copy is still served.
+    DASHBOARD_STATS_MAX_AGE_SECONDS: float = 60
+    # Dimension combinations the single-scan SQLite refresh groups into
+    # before it falls back to one scan per dimension.
+    DASHBOARD_STATS_MAX_GROUPS: int = 50_000
+
     DATA_DIR: str = os.path.join(
         os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
         "front-end",
         "data",
     )
 
+    # Background batch jobs: where inputs/results live and how many run at once.
+    JOBS_DIR: str = os.path.join(os.path.dirname(os.path.dirname(__file__)), "jobs")
+    JOBS_WORKERS: int = 1
+
     class Config:
         env_file = ".env"
 
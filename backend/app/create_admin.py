@@ -0,0 +1,51 @@
+"""Create an admin user, or promote an existing user to admin.
+
+Usage: python -m app.create_admin --email admin@example.com --name Admin
+(prompts for the password of a new user).
+"""
+
+import argparse
+import asyncio
+import getpass
+
+from sqlalchemy import select
+
+from app.auth import hash_password
+from app.database import engine, Base, async_session
+from app.models import User, UserRole
+
+
+async def create_admin(email: str, name: str | None, password: str | None) -> User:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with async_session() as session:
+        user = (await session.execute(select(User).where(User.email == email))).scalar_one_or_none()
+        if user is None:
+            if not password:
+                raise SystemExit("A password is required to create a new user.")
+            user = User(email=email, name=name or email, hashed_password=hash_password(password))
+            session.add(user)
+        user.role = UserRole.admin
+        user.is_active = True
+        await session.commit()
+        return user
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create or promote an admin user.")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--name", default=None)
+    parser.add_argument("--password", default=None,
+                        help="Password for a new user (prompted when omitted)")
+    args = parser.parse_args()
+
+    password = args.password
+    if password is None:
+        password = getpass.getpass("Password (leave empty to promote an existing user): ")
+    asyncio.run(create_admin(args.email, args.name, password))
+    print(f"{args.email} is now an admin.")
+
+
+if __name__ == "__main__":
+    main()
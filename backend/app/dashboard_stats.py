@@ -0,0 +1,317 @@
+"""
+dashboard_stats.py
+------------------
+Dashboard statistics from one scan of ``clients``, kept in a materialized
+summary.
+
+``compute_aggregates`` reads ``clients`` once. PostgreSQL groups it by each
+of the seven dashboard dimensions with GROUPING SETS. Other backends
+(SQLite) group it by all seven dimensions together, and the groups are
+rolled up per dimension in Python. These dimensions have few values, so
+that is a modest number of groups; past ``max_groups`` combinations the
+query falls back to seven single-column GROUP BYs, which scan the table
+once per dimension but return one row per distinct value.
+
+The additive aggregates (counts, income sum) are stored in the single-row
+``dashboard_summary`` table:
+``record_inserts`` folds newly inserted clients into it without a rescan,
+and any other change is picked up by a full refresh once the summary is
+older than ``max_age``. Readers get the summary from an in-process copy; a
+stale summary is still served while one background refresh runs, so the
+dashboard never waits on a scan except the very first time. Reads and scans
+go through the read-only engine; only the summary row is written.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+
+from sqlalchemy import CompoundSelect, Select, case, func, literal, select, union_all
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session, read_session
+from app.models import Client, DashboardSummary
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_ID = 1
+
+# DashboardStats field → Client column
+DIMENSIONS = {
+    "bundle_distribution": "purchased_coverage_bundle",
+    "region_distribution": "region_code",
+    "employment_distribution": "employment_status",
+    "agency_type_distribution": "broker_agency_type",
+    "monthly_distribution": "policy_start_month",
+    "channel_distribution": "acquisition_channel",
+    "deductible_distribution": "deductible_tier",
+}
+
+
+@dataclass
+class Aggregates:
+    """Additive dashboard aggregates; two of them merge by adding."""
+    clients: int = 0
+    cancelled: int = 0
+    income_sum: float = 0.0
+    income_count: int = 0
+    distributions: dict[str, dict[str, int]] = field(
+        default_factory=lambda: {name: {} for name in DIMENSIONS}
+    )
+
+    def add_group(self, values: tuple, clients: int, cancelled: int,
+                  income_sum: float, income_count: int) -> None:
+        self.add_totals(clients, cancelled, income_sum, income_count)
+        for name, value in zip(DIMENSIONS, values):
+            self.add_count(name, value, clients)
+
+    def add_totals(self, clients: int, cancelled: int,
+                   income_sum: float, income_count: int) -> None:
+        self.clients += clients
+        self.cancelled += cancelled
+        self.income_sum += income_sum
+        self.income_count += income_count
+
+    def add_count(self, name: str, value: str | None, clients: int) -> None:
+        dist = self.distributions[name]
+        key = value or "Unknown"
+        dist[key] = dist.get(key, 0) + clients
+
+    def merge(self, other: Aggregates) -> None:
+        self.clients += other.clients
+        self.cancelled += other.cancelled
+        self.income_sum += other.income_sum
+        self.income_count += other.income_count
+        for name, dist in other.distributions.items():
+            mine = self.distributions.setdefault(name, {})
+            for key, n in dist.items():
+                mine[key] = mine.get(key, 0) + n
+
+    def to_stats(self) -> dict:
+        """The ``DashboardStats`` fields."""
+        avg_income = self.income_sum / self.income_count if self.income_count else 0
+        return {
+            "total_clients": self.clients,
+            "total_cancelled": self.cancelled,
+            "total_active": self.clients - self.cancelled,
+            "cancellation_rate": (
+                round(self.cancelled / self.clients * 100, 2) if self.clients else 0
+            ),
+            "avg_income": round(avg_income, 2),
+            **self.distributions,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Aggregates:
+        return cls(**data)
+
+
+def _dims_and_measures() -> tuple[list, tuple]:
+    dims = [getattr(Client, column) for column in DIMENSIONS.values()]
+    measures = (
+        func.count(Client.id).label("clients"),
+        func.sum(case((Client.policy_cancelled == 1, 1), else_=0)).label("cancelled"),
+        func.sum(Client.estimated_annual_income).label("income_sum"),
+        func.count(Client.estimated_annual_income).label("income_count"),
+    )
+    return dims, measures
+
+
+def aggregates_query(dialect: str) -> Select:
+    """The single-scan grouping of ``clients`` for the ``dialect`` backend.
+
+    On PostgreSQL, GROUPING SETS of the seven dimensions; rows are
+    ``(grouping, *dimension values, *measures)`` where ``grouping`` is the
+    GROUPING() bitmask. Elsewhere, one GROUP BY over all seven dimensions;
+    rows are ``(*dimension values, *measures)``. The measures are
+    ``clients, cancelled, income_sum, income_count``.
+    """
+    dims, measures = _dims_and_measures()
+    if dialect == "postgresql":
+        return select(func.grouping(*dims).label("grouping_id"), *dims, *measures).group_by(
+            func.grouping_sets(*dims)
+        )
+    return select(*dims, *measures).group_by(*dims)
+
+
+def per_dimension_query() -> CompoundSelect:
+    """Seven single-column GROUP BYs in one UNION ALL (one scan each); rows
+    are ``(dimension index, value, *measures)``."""
+    dims, measures = _dims_and_measures()
+    return union_all(*(
+        select(literal(i).label("dimension"), dim.label("value"), *measures).group_by(dim)
+        for i, dim in enumerate(dims)
+    ))
+
+
+async def compute_aggregates(db: AsyncSession, max_groups: int | None = None) -> Aggregates:
+    """All dashboard aggregates from one scan of ``clients``.
+
+    Off PostgreSQL, more than ``max_groups`` dimension combinations (default
+    ``DASHBOARD_STATS_MAX_GROUPS``) switches to ``per_dimension_query``.
+    """
+    dialect = (await db.connection()).dialect.name
+    names = list(DIMENSIONS)
+    n_dims = len(names)
+    if dialect == "postgresql":
+        rows = (await db.execute(aggregates_query(dialect))).all()
+        # GROUPING() sets the bit of every dimension a row is not grouped by
+        # (the first dimension is the highest bit).
+        all_bits = (1 << n_dims) - 1
+        index = {all_bits ^ (1 << (n_dims - 1 - i)): i for i in range(n_dims)}
+        return _per_dimension_aggregates(
+            (index[row[0]], row[1 + index[row[0]]], *row[1 + n_dims:]) for row in rows
+        )
+
+    if max_groups is None:
+        max_groups = settings.DASHBOARD_STATS_MAX_GROUPS
+    rows = (await db.execute(aggregates_query(dialect).limit(max_groups + 1))).all()
+    if len(rows) <= max_groups:
+        agg = Aggregates()
+        for row in rows:
+            clients, cancelled, income_sum, income_count = row[n_dims:]
+            agg.add_group(tuple(row[:n_dims]), clients, cancelled or 0,
+                          income_sum or 0.0, income_count)
+        return agg
+
+    logger.warning("Dashboard dimensions combine into more than %d groups; "
+                   "aggregating them one dimension at a time.", max_groups)
+    return _per_dimension_aggregates((await db.execute(per_dimension_query())).all())
+
+
+def _per_dimension_aggregates(rows) -> Aggregates:
+    """Aggregates from ``(dimension index, value, *measures)`` rows."""
+    names = list(DIMENSIONS)
+    agg = Aggregates()
+    for dimension, value, clients, cancelled, income_sum, income_count in rows:
+        agg.add_count(names[dimension], value, clients)
+        if dimension == 0:
+            # Each dimension's groups cover every client once; count them once.
+            agg.add_totals(clients, cancelled or 0, income_sum or 0.0, income_count)
+    return agg
+
+
+def aggregate_records(records: list[dict]) -> Aggregates:
+    """Aggregates of client records (``Client`` field → value), e.g. a seeded batch."""
+    agg = Aggregates()
+    columns = list(DIMENSIONS.values())
+    for record in records:
+        income = record.get("estimated_annual_income")
+        agg.add_group(
+            tuple(record.get(c) for c in columns), 1,
+            1 if record.get("policy_cancelled") == 1 else 0,
+            income or 0.0, 0 if income is None else 1,
+        )
+    return agg
+
+
+class DashboardStatsCache:
+    """Materialized dashboard summary with a staleness bound of about ``max_age``."""
+
+    def __init__(self, max_age: float = 60.0):
+        self.max_age = max_age
+        self._stats: dict | None = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+        self._refresh_task: asyncio.Task | None = None
+
+    async def get(self, db: AsyncSession) -> dict:
+        """Dashboard stats, at most about ``2 * max_age`` seconds behind the table.
+
+        ``db`` is only read from, so it may be a read-only session.
+        """
+        if self._stats is not None and time.time() - self._checked_at < self.max_age:
+            return self._stats
+        async with self._lock:
+            now = time.time()
+            if self._stats is not None and now - self._checked_at < self.max_age:
+                return self._stats
+            summary = await db.get(DashboardSummary, SUMMARY_ID)
+            if summary is None:
+                agg = await self._rebuild(db)
+            else:
+                agg = Aggregates.from_dict(summary.aggregates)
+                if now - summary.updated_at >= self.max_age:
+                    self._refresh_in_background()
+            self._remember(agg)
+            return self._stats
+
+    def _remember(self, agg: Aggregates) -> None:
+        self._stats = agg.to_stats()
+        self._checked_at = time.time()
+
+    def _refresh_in_background(self) -> None:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._background_refresh())
+
+    async def _background_refresh(self) -> None:
+        try:
+            async with read_session() as db:
+                self._remember(await self._rebuild(db))
+        except Exception:
+            logger.exception("Dashboard summary refresh failed")
+
+    async def refresh(self, db: AsyncSession) -> Aggregates:
+        """Recompute the summary from ``clients`` and store it, both on ``db``."""
+        t0 = time.perf_counter()
+        agg = await compute_aggregates(db)
+        await _store(db, agg)
+        _log_refresh(t0, agg)
+        return agg
+
+    async def _rebuild(self, read_db: AsyncSession) -> Aggregates:
+        """Like ``refresh``, scanning on ``read_db`` and storing on a write session."""
+        t0 = time.perf_counter()
+        agg = await compute_aggregates(read_db)
+        async with async_session() as db:
+            await _store(db, agg)
+        _log_refresh(t0, agg)
+        return agg
+
+    async def record_inserts(self, db: AsyncSession, records: list[dict]) -> None:
+        """Fold newly inserted clients into the stored summary without a rescan.
+
+        The caller commits, in the same transaction as the inserts. Without
+        a stored summary there is nothing to update; the next read computes
+        it in full.
+        """
+        summary = await db.get(DashboardSummary, SUMMARY_ID)
+        if summary is None:
+            return
+        agg = Aggregates.from_dict(summary.aggregates)
+        agg.merge(aggregate_records(records))
+        summary.aggregates = asdict(agg)
+        summary.updated_at = time.time()
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Drop this worker's copy; the next read goes back to the summary table."""
+        self._checked_at = 0.0
+
+
+def _log_refresh(t0: float, agg: Aggregates) -> None:
+    logger.info("Dashboard summary refreshed in %.3fs (%d clients).",
+                time.perf_counter() - t0, agg.clients)
+
+
+async def _store(db: AsyncSession, agg: Aggregates) -> None:
+    summary = await db.get(DashboardSummary, SUMMARY_ID)
+    if summary is None:
+        db.add(DashboardSummary(id=SUMMARY_ID, aggregates=asdict(agg), updated_at=time.time()))
+    else:
+        summary.aggregates = asdict(agg)
+        summary.updated_at = time.time()
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Another worker created the row first; its summary is just as fresh.
+        await db.rollback()
+
+
+# ── Module-level singleton ────────────────────────────────────────────────────
+dashboard_stats = DashboardStatsCache(max_age=settings.DASHBOARD_STATS_MAX_AGE_SECONDS)
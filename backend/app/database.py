@@ -1,11 +1,93 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+"""
+database.py
+-----------
+Async engines, sessions and the declarative base.
+
+Two engines share one database: ``engine`` for everything that writes, and
+``read_engine`` (read-only, its own pool) for dashboard reads, so those never
+wait for a connection held by seeding or other write traffic. SQLite
+connections get WAL journaling and the other ``SQLITE_*`` pragmas on
+connect, letting readers run alongside a writer, and foreign-key
+enforcement, which SQLite leaves off by default (deleting a client then
+cascades to its stored prediction). ``postgresql://`` URLs are
+served by asyncpg.
+"""
+
+from sqlalchemy import event
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import DeclarativeBase
 
 from app.config import settings
 
-engine = create_async_engine(settings.DATABASE_URL, echo=False)
+
+def database_url(url: str) -> URL:
+    """``url`` with plain PostgreSQL schemes mapped to the asyncpg driver."""
+    parsed = make_url(url.replace("postgres://", "postgresql://", 1))
+    if parsed.drivername == "postgresql":
+        parsed = parsed.set(drivername="postgresql+asyncpg")
+    return parsed
+
+
+def engine_options(url: URL, read_only: bool = False) -> dict:
+    """``create_async_engine`` keyword arguments for ``url`` from the ``DB_*`` settings."""
+    options: dict = {"echo": False}
+    if url.get_backend_name() == "sqlite":
+        if url.database in (None, "", ":memory:"):
+            return options  # a single shared connection; pool settings do not apply
+        options.update(pool_size=settings.DB_POOL_SIZE, max_overflow=settings.DB_MAX_OVERFLOW,
+                       pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS)
+        return options
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    if read_only and url.get_backend_name() == "postgresql":
+        options["connect_args"] = {"server_settings": {"default_transaction_read_only": "on"}}
+    return options
+
+
+def sqlite_pragmas(read_only: bool = False) -> list[str]:
+    """Statements run on every new SQLite connection."""
+    pragmas = [
+        f"PRAGMA busy_timeout = {int(settings.SQLITE_BUSY_TIMEOUT_MS)}",
+        f"PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA mmap_size = {int(settings.SQLITE_MMAP_SIZE)}",
+        "PRAGMA foreign_keys = ON",
+    ]
+    if read_only:
+        # The journal mode is a property of the file, set by the writers
+        pragmas.append("PRAGMA query_only = ON")
+    else:
+        pragmas.insert(1, f"PRAGMA journal_mode = {settings.SQLITE_JOURNAL_MODE}")
+    return pragmas
+
+
+def make_engine(url: str, read_only: bool = False) -> AsyncEngine:
+    parsed = database_url(url)
+    db_engine = create_async_engine(parsed, **engine_options(parsed, read_only))
+    if parsed.get_backend_name() == "sqlite":
+        pragmas = sqlite_pragmas(read_only)
+
+        @event.listens_for(db_engine.sync_engine, "connect")
+        def _apply_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for pragma in pragmas:
+                cursor.execute(pragma)
+            cursor.close()
+
+    return db_engine
+
+
+engine = make_engine(settings.DATABASE_URL)
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+read_engine = make_engine(settings.DATABASE_READ_URL or settings.DATABASE_URL, read_only=True)
+read_session = async_sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
+
 
 class Base(DeclarativeBase):
     pass
@@ -14,3 +96,20 @@ class Base(DeclarativeBase):
 async def get_db():
     async with async_session() as session:
         yield session
+
+
+async def get_read_db():
+    """Session on the read-only engine, for endpoints that never write."""
+    async with read_session() as session:
+        yield session
+
+
+def create_missing_indexes(sync_conn) -> None:
+    """Create declared indexes missing from existing tables.
+
+    ``create_all`` skips tables that already exist, together with any
+    indexes added to their models since.
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
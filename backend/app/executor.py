@@ -0,0 +1,110 @@
+"""
+executor.py
+-----------
+Bounded thread pools that keep CPU-bound inference and password hashing off
+the asyncio event loop.
+
+XGBoost prediction and the NumPy feature engineering release the GIL, so a
+thread pool gives real parallelism without reloading the model per process.
+Work beyond ``max_workers`` running + ``max_queue`` waiting is rejected with
+``ExecutorSaturated`` so routers can answer 503 instead of piling up latency.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorSaturated(RuntimeError):
+    """Raised when the executor's queue is full."""
+
+
+class InferenceExecutor:
+    """Run blocking callables on a bounded pool with queue-depth limits."""
+
+    def __init__(self, max_workers: int, max_queue: int, name: str = "inference"):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._name = name
+        self._pool: ThreadPoolExecutor | None = None
+        self._in_flight = 0  # only touched from the event loop thread
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix=self._name
+            )
+        return self._pool
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Await ``fn(*args, **kwargs)`` on the pool, or raise ``ExecutorSaturated``."""
+        if self._in_flight >= self.capacity:
+            logger.warning("%s executor saturated (%d in flight)", self._name, self._in_flight)
+            raise ExecutorSaturated(
+                f"{self._name.capitalize()} capacity exhausted, retry shortly."
+            )
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._get_pool(), functools.partial(fn, *args, **kwargs)
+            )
+        finally:
+            self._in_flight -= 1
+
+    async def run_admitted(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Like ``run`` but skips the queue check.
+
+        For follow-up work of a request that was already admitted (e.g. the
+        later chunks of a stream), which should wait rather than fail midway.
+        """
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._get_pool(), functools.partial(fn, *args, **kwargs)
+            )
+        finally:
+            self._in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+        }
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+# ── Module-level singleton ────────────────────────────────────────────────────
+inference_executor = InferenceExecutor(
+    max_workers=settings.INFERENCE_WORKERS,
+    max_queue=settings.INFERENCE_MAX_QUEUE,
+)
+# bcrypt also releases the GIL; a separate pool keeps a login burst from
+# taking inference workers.
+password_executor = InferenceExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+    name="password",
+)
@@ -0,0 +1,122 @@
+"""
+explanations.py
+---------------
+Batched, cached SHAP explanations on the XGBoost booster.
+
+``ShapExplainer.explain`` runs ``pred_contribs`` once for every row of a
+batch that is not already cached, keeps only each row's predicted-class
+contributions as a compact float32 matrix, and caches them in an LRU keyed
+by a hash of the (float32) feature vector and the class index.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import xgboost as xgb
+
+logger = logging.getLogger(__name__)
+
+
+def top_features(values: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """Per-row indices and values of the ``k`` largest ``|values|``, descending."""
+    k = max(1, min(k, values.shape[1]))
+    order = np.argsort(-np.abs(values), axis=1, kind="stable")[:, :k]
+    order = np.ascontiguousarray(order)
+    return order, np.take_along_axis(values, order, axis=1)
+
+
+class ShapExplainer:
+    """Exact TreeSHAP for a batch of rows, restricted to one class per row."""
+
+    def __init__(
+        self,
+        booster: xgb.Booster,
+        feature_names: list[str],
+        n_classes: int,
+        cache_size: int = 10_000,
+    ):
+        self.booster = booster
+        self.feature_names = list(feature_names)
+        self.n_classes = n_classes
+        self.cache_size = cache_size
+        self._cache: OrderedDict[bytes, tuple[np.ndarray, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(row: np.ndarray, class_idx: int) -> bytes:
+        h = hashlib.blake2b(row.tobytes(), digest_size=16)
+        h.update(int(class_idx).to_bytes(2, "little"))
+        return h.digest()
+
+    def _contribs(self, X: np.ndarray, class_idx: np.ndarray) -> np.ndarray:
+        """``(n, n_features + 1)`` contributions (bias last) for ``class_idx``."""
+        dm = xgb.DMatrix(X, feature_names=self.feature_names or None)
+        contribs = self.booster.predict(dm, pred_contribs=True)
+        n, n_features = X.shape
+        rows = np.arange(n)
+        # Multiclass output is (n, n_classes, F+1), or flattened in older builds
+        if contribs.ndim == 2 and contribs.shape[1] == self.n_classes * (n_features + 1):
+            contribs = contribs.reshape(n, self.n_classes, n_features + 1)
+        if contribs.ndim == 3:
+            contribs = contribs[rows, class_idx]
+        return contribs
+
+    def explain(
+        self, X: np.ndarray, class_idx: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """SHAP values ``(n, n_features)`` and base values ``(n,)``, float32.
+
+        Rows found in the cache are not recomputed; repeated rows within the
+        batch are computed once.
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        class_idx = np.asarray(class_idx)
+        n, n_features = X.shape
+        values = np.empty((n, n_features), dtype=np.float32)
+        base = np.empty(n, dtype=np.float32)
+
+        keys = [self._key(X[i], class_idx[i]) for i in range(n)]
+        todo: dict[bytes, list[int]] = {}
+        with self._lock:
+            for i, key in enumerate(keys):
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    values[i], base[i] = cached
+                else:
+                    todo.setdefault(key, []).append(i)
+            self.hits += n - sum(len(v) for v in todo.values())
+            self.misses += len(todo)
+
+        if todo:
+            first = np.fromiter((rows[0] for rows in todo.values()), dtype=np.intp)
+            contribs = self._contribs(X[first], class_idx[first])
+            with self._lock:
+                for (key, rows), row_contribs in zip(todo.items(), contribs):
+                    sv, bias = row_contribs[:-1], float(row_contribs[-1])
+                    values[rows] = sv
+                    base[rows] = bias
+                    self._cache[key] = (values[rows[0]].copy(), bias)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return values, base
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._cache),
+                "capacity": self.cache_size,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
@@ -0,0 +1,340 @@
+"""
+jobs.py
+-------
+Background batch classification jobs.
+
+A job scores an uploaded CSV chunk by chunk on a small local worker pool and
+appends each chunk's predictions to a Parquet file under
+``JOBS_DIR/<job_id>/``. Progress is tracked in memory and mirrored to a
+``status.json`` next to the results, so any API worker sharing the directory
+can report on a job and serve its results. Each job records the ID of the
+user who submitted it, and the process (host and PID) that runs it: a job
+left queued or running by a process that is gone is marked failed at the
+next startup (``recover``), and jobs still queued at shutdown are marked
+failed then.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO
+
+from app.config import settings
+from app.ml_service import model_loader
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pyarrow as pa
+
+    from app.ml_pipeline import ClassificationService
+
+logger = logging.getLogger(__name__)
+
+INPUT_NAME = "input.csv"
+RESULT_NAME = "predictions.parquet"
+STATUS_NAME = "status.json"
+
+# Persist progress at most this often while a job is running (seconds).
+_STATUS_INTERVAL = 1.0
+
+
+@dataclass
+class Job:
+    """State of one batch job (also its on-disk ``status.json``)."""
+    id: str
+    filename: str
+    owner_id: int | None = None
+    status: str = "queued"          # queued | running | completed | failed
+    total_rows: int | None = None
+    rows_processed: int = 0
+    created_at: float = 0.0
+    started_at: float | None = None
+    finished_at: float | None = None
+    error: str | None = None
+    model_version: str | None = None
+    worker: str | None = None       # "host:pid" of the process running the job
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    def to_dict(self) -> dict:
+        """Status payload with derived throughput (rows/s) and ETA (s)."""
+        data = asdict(self)
+        del data["worker"]
+        throughput = eta = None
+        if self.started_at is not None and self.rows_processed:
+            elapsed = (self.finished_at or time.time()) - self.started_at
+            if elapsed > 0:
+                throughput = round(self.rows_processed / elapsed, 1)
+        if self.status == "running" and throughput and self.total_rows is not None:
+            eta = round(max(self.total_rows - self.rows_processed, 0) / throughput, 1)
+        elif self.status == "completed":
+            eta = 0.0
+        data["throughput_rows_per_sec"] = throughput
+        data["eta_seconds"] = eta
+        return data
+
+
+def _count_rows(path: Path, chunk_rows: int) -> int:
+    """Data rows in a CSV file, as ``pd.read_csv`` will read them.
+
+    Parsed rather than line-counted, so quoted fields spanning lines and
+    blank lines count the way the scoring pass sees them; only the first
+    column is converted.
+    """
+    import pandas as pd
+
+    return sum(len(chunk) for chunk in pd.read_csv(path, usecols=[0], chunksize=chunk_rows))
+
+
+def _worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _process_alive(pid: int) -> bool:
+    if os.name == "nt":
+        # os.kill cannot probe a process on Windows; assume it is still running.
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # exists, owned by another user
+    return True
+
+
+class JobManager:
+    """Create, run and look up batch jobs stored under ``root``."""
+
+    def __init__(
+        self,
+        root: str | Path,
+        max_workers: int = 1,
+        chunk_rows: int = 10_000,
+        service: ClassificationService | None = None,
+    ):
+        self._service = service
+        self.root = Path(root)
+        self.max_workers = max_workers
+        self.chunk_rows = chunk_rows
+        self._jobs: dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._pool: ThreadPoolExecutor | None = None
+
+    @property
+    def service(self) -> ClassificationService:
+        return self._service or model_loader.service()
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="batch-job"
+            )
+        return self._pool
+
+    def job_dir(self, job_id: str) -> Path:
+        return self.root / job_id
+
+    def result_path(self, job_id: str) -> Path:
+        return self.job_dir(job_id) / RESULT_NAME
+
+    # ── submission ────────────────────────────────────────────────────────
+
+    def submit_csv(self, fileobj: BinaryIO, filename: str, owner_id: int | None = None) -> Job:
+        """Copy an uploaded CSV into a new job directory and queue it (blocking I/O)."""
+        job = Job(id=uuid.uuid4().hex, filename=filename, owner_id=owner_id,
+                  created_at=time.time(), worker=_worker_id())
+        job_dir = self.job_dir(job.id)
+        job_dir.mkdir(parents=True, exist_ok=True)
+        with open(job_dir / INPUT_NAME, "wb") as dst:
+            shutil.copyfileobj(fileobj, dst, 1 << 20)
+
+        with self._lock:
+            self._jobs[job.id] = job
+        self._save(job)
+        self._get_pool().submit(self._run, job)
+        logger.info("Queued batch job %s (%s)", job.id, filename)
+        return job
+
+    # ── lookup ────────────────────────────────────────────────────────────
+
+    def get(self, job_id: str) -> Job | None:
+        """A job from this process, or from its ``status.json`` if run elsewhere."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+        # Job IDs are hex UUIDs; refuse anything else before touching the disk.
+        if not job_id.isalnum():
+            return None
+        status = self.job_dir(job_id) / STATUS_NAME
+        if not status.is_file():
+            return None
+        return Job(**json.loads(status.read_text()))
+
+    def recent(self, limit: int = 50, owner_id: int | None = None) -> list[Job]:
+        """Most recently created jobs first, only ``owner_id``'s if given."""
+        jobs = []
+        if self.root.is_dir():
+            for status in self.root.glob(f"*/{STATUS_NAME}"):
+                job = self.get(status.parent.name)
+                if job is not None and (owner_id is None or job.owner_id == owner_id):
+                    jobs.append(job)
+        jobs.sort(key=lambda j: j.created_at, reverse=True)
+        return jobs[:limit]
+
+    # ── execution ─────────────────────────────────────────────────────────
+
+    def _save(self, job: Job) -> None:
+        status = self.job_dir(job.id) / STATUS_NAME
+        tmp = status.with_suffix(".tmp")
+        tmp.write_text(json.dumps(asdict(job)))
+        tmp.replace(status)  # atomic, so readers never see a partial file
+
+    @staticmethod
+    def _result_table(
+        service: ClassificationService, user_ids: list, proba: np.ndarray, row_offset: int
+    ) -> pa.Table:
+        import numpy as np
+        import pyarrow as pa
+
+        preds = np.argmax(proba, axis=1)
+        pct = (proba * 100).astype(np.float32)
+        columns = {
+            "row_index": pa.array(np.arange(row_offset, row_offset + len(proba))),
+            "user_id": pa.array([str(u) for u in user_ids], type=pa.string()),
+            "predicted_bundle": pa.DictionaryArray.from_arrays(
+                pa.array(preds.astype(np.int32)), pa.array(service.class_names)
+            ),
+            "confidence": pa.array(pct[np.arange(len(pct)), preds]),
+        }
+        for j, cls in enumerate(service.class_names):
+            columns[f"prob_{cls}"] = pa.array(pct[:, j])
+        return pa.table(columns)
+
+    def _run(self, job: Job) -> None:
+        import pandas as pd
+        import pyarrow.parquet as pq
+
+        job_dir = self.job_dir(job.id)
+        source = job_dir / INPUT_NAME
+        partial = job_dir / f"{RESULT_NAME}.part"
+        # One model version for the whole job, even if the active one changes mid-run.
+        service = self.service
+        with self._lock:
+            if job.status != "queued":  # failed by ``shutdown`` before it started
+                return
+            job.status = "running"
+        job.model_version = service.version
+        job.started_at = time.time()
+        self._save(job)
+
+        writer: pq.ParquetWriter | None = None
+        try:
+            job.total_rows = _count_rows(source, self.chunk_rows)
+            self._save(job)
+            last_save = time.monotonic()
+            for chunk in pd.read_csv(source, chunksize=self.chunk_rows):
+                if chunk.empty:  # a header-only file still yields one empty chunk
+                    continue
+                user_ids, proba = service.score_frame(chunk, row_offset=job.rows_processed)
+                table = self._result_table(service, user_ids, proba, job.rows_processed)
+                if writer is None:
+                    writer = pq.ParquetWriter(partial, table.schema)
+                writer.write_table(table)
+                job.rows_processed += len(chunk)
+                if time.monotonic() - last_save >= _STATUS_INTERVAL:
+                    self._save(job)
+                    last_save = time.monotonic()
+            if writer is None:
+                raise ValueError("Data validation failed: uploaded CSV has no rows.")
+            writer.close()
+            writer = None
+            partial.replace(job_dir / RESULT_NAME)
+            job.status = "completed"
+            logger.info("Batch job %s completed | rows=%d", job.id, job.rows_processed)
+        except Exception as exc:
+            if isinstance(exc, ValueError):
+                logger.warning("Batch job %s rejected: %s", job.id, exc)
+            else:
+                logger.exception("Batch job %s failed", job.id)
+            job.status = "failed"
+            job.error = str(exc)
+            if writer is not None:
+                writer.close()
+            partial.unlink(missing_ok=True)
+        finally:
+            job.finished_at = time.time()
+            self._save(job)
+            source.unlink(missing_ok=True)
+
+    def _abandon(self, job: Job, reason: str) -> None:
+        """Mark a job that will never run to the end as failed and drop its files."""
+        job.status = "failed"
+        job.error = reason
+        job.finished_at = time.time()
+        self._save(job)
+        job_dir = self.job_dir(job.id)
+        (job_dir / INPUT_NAME).unlink(missing_ok=True)
+        (job_dir / f"{RESULT_NAME}.part").unlink(missing_ok=True)
+        logger.warning("Batch job %s failed: %s", job.id, reason)
+
+    def recover(self) -> int:
+        """Fail the jobs that a stopped process on this host left queued or running.
+
+        Jobs of live processes (other API workers) are left alone. Returns
+        the number of jobs marked failed.
+        """
+        if not self.root.is_dir():
+            return 0
+        host, pid = _worker_id().split(":")
+        with self._lock:
+            mine = set(self._jobs)
+        abandoned = 0
+        for status in self.root.glob(f"*/{STATUS_NAME}"):
+            try:
+                job = Job(**json.loads(status.read_text()))
+            except (OSError, ValueError, TypeError):
+                continue
+            if job.done or job.id in mine:
+                continue
+            if job.worker is not None:
+                job_host, _, job_pid = job.worker.rpartition(":")
+                if job_host != host or (job_pid != pid and _process_alive(int(job_pid))):
+                    continue
+            self._abandon(job, "Interrupted: the server stopped before the job finished.")
+            abandoned += 1
+        return abandoned
+
+    def shutdown(self) -> None:
+        """Stop taking jobs. Queued jobs are failed; running ones finish
+        before the interpreter exits."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        with self._lock:
+            queued = [job for job in self._jobs.values() if job.status == "queued"]
+            for job in queued:
+                job.status = "failed"
+        for job in queued:
+            self._abandon(job, "Cancelled: the server shut down before the job started.")
+
+
+# ── Module-level singleton ────────────────────────────────────────────────────
+job_manager = JobManager(
+    root=settings.JOBS_DIR,
+    max_workers=settings.JOBS_WORKERS,
+    chunk_rows=settings.CLASSIFY_STREAM_CHUNK_ROWS,
+)
@@ -3,10 +3,18 @@ import logging
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
 
-from app.database import engine, Base
-from app.routers import auth, clients, dashboard, data, classification, policies
-from app.ml_pipeline import classification_service
+from app.config import settings
+from app.database import engine, read_engine, Base, create_missing_indexes
+from app.executor import inference_executor, password_executor
+from app.jobs import job_manager
+from app.ml_service import model_loader
+from app.model_registry import model_registry
+from app.prediction_cache import prediction_cache
+from app.rescoring import client_rescorer
+from app.routers import auth, clients, dashboard, data, classification, models, policies
 
 logger = logging.getLogger(__name__)
 
@@ -16,16 +24,29 @@ async def lifespan(app: FastAPI):
     # Create tables on startup
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(create_missing_indexes)
 
-    # Load ML model
-    try:
-        classification_service.load()
-        logger.info("ML classification model loaded successfully.")
-    except Exception as exc:
-        logger.error("Failed to load ML model: %s", exc)
+    # Batch jobs that a stopped server left queued or running will never finish
+    job_manager.recover()
+
+    # Stored client predictions are refreshed whenever the active model changes
+    client_rescorer.start()
+
+    # Load the ML model in the background so non-ML routes serve immediately
+    if settings.MODEL_WARMUP:
+        model_loader.start_warm_up()
 
     yield
 
+    await client_rescorer.stop()
+    inference_executor.shutdown()
+    password_executor.shutdown()
+    job_manager.shutdown()
+    model_registry.shutdown()
+    prediction_cache.close()
+    await engine.dispose()
+    await read_engine.dispose()
+
 
 app = FastAPI(
     title="Broker AI API",
@@ -40,14 +61,21 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Pagination headers of GET /api/clients
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
 )
 
+# Client address from X-Forwarded-For when the peer is a trusted proxy
+if settings.TRUSTED_PROXIES:
+    app.add_middleware(ProxyHeadersMiddleware, trusted_hosts=settings.TRUSTED_PROXIES)
+
 # Register routers
 app.include_router(auth.router)
 app.include_router(clients.router)
 app.include_router(dashboard.router)
 app.include_router(data.router)
 app.include_router(classification.router)
+app.include_router(models.router)
 app.include_router(policies.router)
 
 
@@ -56,6 +84,13 @@ async def root():
     return {"message": "Broker AI API is running"}
 
 
+@app.get("/ready")
+async def ready():
+    """Model readiness: 200 once the classifier is loaded, 503 until then."""
+    status = model_loader.status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
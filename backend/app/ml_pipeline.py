@@ -4,27 +4,34 @@ ml_pipeline.py
 Thin wrapper that integrates the project's ``ml/`` pipeline
 (validation → feature engineering → prediction) into the FastAPI backend.
 
-Loaded once at startup; exposes ``predict_single`` and ``predict_batch``.
+One instance per loaded model version (see ``app.model_registry``);
+exposes ``predict_single`` and ``predict_batch``.
 """
 
 from __future__ import annotations
 
+import hashlib
+import os
 import sys
 import logging
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
-import xgboost as xgb
 
 # Add the ml/ project root so we can import its modules
 _ML_ROOT = str(Path(__file__).resolve().parent.parent.parent / "ml")
 if _ML_ROOT not in sys.path:
     sys.path.insert(0, _ML_ROOT)
 
-from src.preprocessing.validation import validate        # noqa: E402
-from src.preprocessing.feature_engineering import preprocess  # noqa: E402
-from src.model.predictor import load_model                # noqa: E402
+from src.preprocessing.validation import validate              # noqa: E402
+from src.preprocessing.fused_engine import preprocess_fused    # noqa: E402
+from src.preprocessing.row_encoder import RowEncoder           # noqa: E402
+from src.model.predictor import load_model, load_preprocessor  # noqa: E402
+from src.model.artifact import default_booster_path, load_booster  # noqa: E402
+
+from app.config import settings                                # noqa: E402
+from app.explanations import ShapExplainer, top_features       # noqa: E402
 
 logger = logging.getLogger(__name__)
 
@@ -48,48 +55,118 @@ CLASS_NAMES = [
 ]
 
 
+def model_version(path: str) -> str:
+    """``<file stem>-<content hash>``: stable across restarts, new per artifact."""
+    h = hashlib.blake2b(digest_size=4)
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            h.update(block)
+    return f"{Path(path).stem}-{h.hexdigest()}"
+
+
 class ClassificationService:
-    """Singleton service wrapping the ML pipeline."""
+    """Service wrapping the ML pipeline for one model version."""
 
     def __init__(self):
+        self.version: str | None = None
+        self.model_path: str | None = None
         self.model = None
+        self.booster = None
+        self.preprocessor = None
+        self.row_encoder: RowEncoder | None = None
+        self.explainer: ShapExplainer | None = None
+        self._softmax_margin = False
         self.class_names: list[str] = CLASS_NAMES
         self.feature_names: list[str] = []
         self.global_importances: dict[str, float] = {}
 
     # ── startup ───────────────────────────────────────────────────────────
 
-    def load(self) -> None:
-        """Load model. Call once at app startup."""
-        logger.info("Loading model from %s …", _MODEL_PATH)
-        self.model = load_model(_MODEL_PATH)
+    def load(self, model_path: str | None = None) -> None:
+        """Load model and fitted preprocessing state.
 
-        if hasattr(self.model, "feature_names_in_"):
-            self.feature_names = [str(f) for f in self.model.feature_names_in_]
+        ``model_path`` is a ``.ubj`` booster or a joblib model; by default
+        the configured startup model. For a joblib path the native UBJSON
+        booster exported next to it by ``ml/pipelines/export_model.py`` is
+        preferred (no unpickling of the sklearn wrapper) when present.
+        """
+        if model_path is None:
+            model_path = _MODEL_PATH
+            booster_path = settings.MODEL_BOOSTER_PATH or default_booster_path(_MODEL_PATH)
+        elif model_path.endswith(".ubj"):
+            booster_path = model_path
+        else:
+            booster_path = default_booster_path(model_path)
+        if booster_path == model_path or os.path.exists(booster_path):
+            logger.info("Loading booster from %s …", booster_path)
+            self.model = None
+            self.booster, meta = load_booster(booster_path)
+            objective = meta.get("objective")
+            feature_names = meta.get("feature_names") or []
+            importances = meta.get("feature_importances") or []
+            self.class_names = meta.get("class_names") or CLASS_NAMES
+            self.model_path = booster_path
         else:
-            self.feature_names = []
+            logger.info("Loading model from %s …", model_path)
+            self.model = load_model(model_path)
+            self.booster = self.model.get_booster()
+            objective = getattr(self.model, "objective", None)
+            feature_names = [str(f) for f in getattr(self.model, "feature_names_in_", [])]
+            importances = getattr(self.model, "feature_importances_", [])
+            self.class_names = CLASS_NAMES
+            self.model_path = model_path
+        self.version = model_version(self.model_path)
+        self.preprocessor = load_preprocessor(model_path=model_path)
+        if self.preprocessor is None:
+            message = (
+                f"No fitted preprocessor for {model_path}: income deciles, the "
+                "underwriting median, encoder vocabularies and ID frequencies will "
+                "be fit on each request batch, so a client's score depends on the "
+                "batch it arrives in. Create preprocessor.joblib next to the model "
+                "with ml/pipelines/fit_preprocessor.py."
+            )
+            if settings.REQUIRE_PREPROCESSOR:
+                raise FileNotFoundError(message)
+            logger.warning(message)
+        # sklearn's predict_proba applies softmax to the margin for this objective
+        self._softmax_margin = objective == "multi:softmax"
+
+        self.feature_names = list(feature_names)
+        if self.feature_names:
+            self.row_encoder = RowEncoder(self.feature_names, self.preprocessor)
+        else:
+            self.row_encoder = None
+
+        # Fresh explanation cache for this booster
+        self.explainer = ShapExplainer(
+            self.booster, self.feature_names, len(self.class_names),
+            cache_size=settings.SHAP_CACHE_SIZE,
+        )
 
         # Pre-compute global feature importances
-        if hasattr(self.model, "feature_importances_"):
-            imp = self.model.feature_importances_
-            self.global_importances = {
-                fname: round(float(v), 5)
-                for fname, v in zip(self.feature_names, imp)
-            }
+        self.global_importances = {
+            fname: round(float(v), 5)
+            for fname, v in zip(self.feature_names, importances)
+        }
 
-        logger.info("ClassificationService ready — %d features, %d classes.",
-                     len(self.feature_names), len(self.class_names))
+        logger.info("ClassificationService %s ready — %d features, %d classes.",
+                     self.version, len(self.feature_names), len(self.class_names))
 
     @property
     def is_ready(self) -> bool:
-        return self.model is not None
+        return self.booster is not None
 
     # ── helpers ───────────────────────────────────────────────────────────
 
     def _run_pipeline(self, df_raw: pd.DataFrame) -> pd.DataFrame:
-        """Validate → feature-engineer → return feature DataFrame."""
+        """Validate → feature-engineer → return feature DataFrame.
+
+        Uses the single-pass engine, emitting only the model's features.
+        """
         validate(df_raw, raise_on_error=True)
-        return preprocess(df_raw)
+        return preprocess_fused(
+            df_raw, fitted=self.preprocessor, columns=self.feature_names or None
+        )
 
     def _get_feature_matrix(self, df_feat: pd.DataFrame) -> pd.DataFrame:
         """Drop ID / target columns and return the feature matrix.
@@ -110,37 +187,34 @@ class ClassificationService:
             X = X[self.feature_names]
         return X
 
-    def _compute_shap(self, X: pd.DataFrame, pred_idx: int) -> list[dict]:
-        """Use XGBoost native SHAP (pred_contribs) for the predicted class."""
+    def _predict_proba(self, X: np.ndarray | pd.DataFrame) -> np.ndarray:
+        """Class probabilities straight from the booster (no sklearn wrapper)."""
+        if self._softmax_margin:
+            margin = self.booster.inplace_predict(X, predict_type="margin")
+            exp = np.exp(margin - margin.max(axis=1, keepdims=True))
+            return exp / exp.sum(axis=1, keepdims=True)
+        return self.booster.inplace_predict(X)
+
+    def _compute_shap(
+        self, X: np.ndarray | pd.DataFrame, pred_idx: np.ndarray
+    ) -> list[tuple[list[dict], float]]:
+        """Use XGBoost native SHAP (pred_contribs) for each row's predicted class.
+
+        Goes through the batched, cached ``ShapExplainer``; returns an
+        ``(explanations, base_value)`` pair per row.
+        """
         try:
-            booster = self.model.get_booster()
-            dm = xgb.DMatrix(X, feature_names=list(X.columns))
-            # pred_contribs returns shape (n_samples, n_features+1) for binary
-            # or (n_samples, n_classes * (n_features+1)) for multiclass
-            contribs = booster.predict(dm, pred_contribs=True)
-
-            n_features = X.shape[1]
-            n_classes = len(self.class_names)
-
-            if contribs.ndim == 2 and contribs.shape[1] == n_classes * (n_features + 1):
-                # Multi-class: reshape to (n_samples, n_classes, n_features+1)
-                contribs = contribs.reshape(-1, n_classes, n_features + 1)
-                sv = contribs[0, pred_idx, :-1]  # drop bias term
-                base_value = float(contribs[0, pred_idx, -1])
-            elif contribs.ndim == 3:
-                sv = contribs[0, pred_idx, :-1]
-                base_value = float(contribs[0, pred_idx, -1])
-            else:
-                sv = contribs[0, :-1]
-                base_value = float(contribs[0, -1])
-
-            feature_names = list(X.columns)
-            explanations = [
-                {"feature": fname, "shap_value": round(float(v), 5)}
-                for fname, v in zip(feature_names, sv)
+            values, base_values = self.explainer.explain(X, pred_idx)
+            order, picked = top_features(values, values.shape[1])
+            names = np.asarray(self.feature_names, dtype=object)[order].tolist()
+            rounded = np.round(picked.astype(np.float64), 5).tolist()
+            return [
+                (
+                    [{"feature": f, "shap_value": v} for f, v in zip(row_names, row_values)],
+                    round(float(base_value), 5),
+                )
+                for row_names, row_values, base_value in zip(names, rounded, base_values)
             ]
-            explanations.sort(key=lambda x: abs(x["shap_value"]), reverse=True)
-            return explanations, round(base_value, 5)
         except Exception as exc:
             logger.warning("SHAP computation failed, using feature importances: %s", exc)
             # Fallback: return global feature importances as proxy
@@ -151,7 +225,81 @@ class ClassificationService:
                     key=lambda x: abs(x[1]), reverse=True
                 )
             ]
-            return explanations, 0.0
+            return [(explanations, 0.0)] * X.shape[0]
+
+    def explain_batch(
+        self,
+        X: np.ndarray | pd.DataFrame,
+        pred_idx: np.ndarray,
+        layout: str = "rows",
+        precision: str = "rounded",
+        top_k: int | None = None,
+    ) -> list[dict] | dict:
+        """Predicted-class SHAP values for a scored batch.
+
+        ``layout="rows"`` gives ``feature_explanations`` / ``base_value`` per
+        row (like ``predict_single``); ``"columnar"`` gives ``shap_values``
+        arrays (``(rows, features)``, or ``(rows, k)`` with ``feature_indices``
+        into ``feature_names`` when ``top_k`` is set) plus ``base_value``.
+        """
+        values, base_values = self.explainer.explain(X, pred_idx)
+        if precision == "rounded":
+            values = np.round(values.astype(np.float64), 5)
+            base_values = np.round(base_values.astype(np.float64), 5)
+        order = None
+        if top_k is not None or layout == "rows":
+            order, values = top_features(values, top_k or values.shape[1])
+
+        if layout == "columnar":
+            columns = {"base_value": base_values, "shap_values": values}
+            if order is not None:
+                columns["feature_indices"] = order
+            return columns
+
+        names = np.asarray(self.feature_names, dtype=object)[order].tolist()
+        return [
+            {
+                "feature_explanations": [
+                    {"feature": f, "shap_value": v} for f, v in zip(row_names, row_values)
+                ],
+                "base_value": base_value,
+            }
+            for row_names, row_values, base_value in zip(
+                names, values.tolist(), base_values.tolist()
+            )
+        ]
+
+    def encode_row(self, row: dict) -> np.ndarray | pd.DataFrame:
+        """Feature matrix (one row) for a raw client record.
+
+        Encodes the row straight into a float32 vector (no DataFrame) when
+        the model exposes its feature names.
+        """
+        if self.row_encoder is not None:
+            return self.row_encoder.encode(row)
+        return self._get_feature_matrix(self._run_pipeline(pd.DataFrame([row])))
+
+    def predict_encoded(self, X: np.ndarray | pd.DataFrame) -> list[dict]:
+        """Score a feature matrix on the booster: one predict, one SHAP call."""
+        proba = self._predict_proba(X)
+        preds = np.argmax(proba, axis=1)
+        shap = self._compute_shap(X, preds)
+
+        results = []
+        for i, pred_idx in enumerate(preds):
+            explanations, base_value = shap[i]
+            results.append({
+                "predicted_bundle": self.class_names[int(pred_idx)],
+                "predicted_index": int(pred_idx),
+                "confidence": round(float(proba[i, pred_idx]) * 100, 2),
+                "class_probabilities": {
+                    cls: round(float(p) * 100, 2)
+                    for cls, p in zip(self.class_names, proba[i])
+                },
+                "feature_explanations": explanations,
+                "base_value": base_value,
+            })
+        return results
 
     # ── single prediction ─────────────────────────────────────────────────
 
@@ -160,81 +308,219 @@ class ClassificationService:
         Full pipeline for **one** client row (raw column values).
         Returns prediction, probabilities and SHAP explanations.
         """
-        df_raw = pd.DataFrame([row])
-        df_feat = self._run_pipeline(df_raw)
-        X = self._get_feature_matrix(df_feat)
+        return self.predict_encoded(self.encode_row(row))[0]
 
-        proba = self.model.predict_proba(X)[0]
-        pred_idx = int(np.argmax(proba))
-        pred_label = self.class_names[pred_idx]
-
-        # SHAP explanations
-        explanations, base_value = self._compute_shap(X, pred_idx)
+    def predict_many(self, rows: list[dict]) -> list[dict | Exception]:
+        """
+        ``predict_single`` for several independent rows in one vectorized call.
 
-        return {
-            "predicted_bundle": pred_label,
-            "predicted_index": pred_idx,
-            "confidence": round(float(proba[pred_idx]) * 100, 2),
-            "class_probabilities": {
-                cls: round(float(p) * 100, 2)
-                for cls, p in zip(self.class_names, proba)
-            },
-            "feature_explanations": explanations,
-            "base_value": base_value,
-        }
+        A row that fails encoding yields its exception in place of a result,
+        so one bad request does not fail the others scored alongside it.
+        """
+        results: list[dict | Exception | None] = [None] * len(rows)
+        encoded, positions = [], []
+        for i, row in enumerate(rows):
+            try:
+                encoded.append(self.encode_row(row))
+                positions.append(i)
+            except Exception as exc:
+                results[i] = exc
+        if encoded:
+            if isinstance(encoded[0], pd.DataFrame):
+                X = pd.concat(encoded, ignore_index=True)
+            else:
+                X = np.vstack(encoded)
+            for i, result in zip(positions, self.predict_encoded(X)):
+                results[i] = result
+        return results
 
     # ── batch prediction ──────────────────────────────────────────────────
 
-    def predict_batch(self, df_raw: pd.DataFrame) -> dict:
-        """
-        Full pipeline for a CSV batch.
-        Returns per-row predictions + aggregate summary.
+    def score_frame(
+        self, df_raw: pd.DataFrame, row_offset: int = 0
+    ) -> tuple[list, np.ndarray]:
+        """Validate, feature-engineer and score a raw frame.
+
+        Returns the row user IDs (row positions from ``row_offset`` when the
+        frame has no User_ID column) and the class-probability matrix.
         """
+        user_ids, X = self.frame_features(df_raw, row_offset)
+        return user_ids, self._predict_proba(X)
+
+    def frame_features(
+        self, df_raw: pd.DataFrame, row_offset: int = 0
+    ) -> tuple[list, pd.DataFrame]:
+        """Row user IDs and the model feature matrix for a raw frame."""
         df_feat = self._run_pipeline(df_raw)
         X = self._get_feature_matrix(df_feat)
         user_ids = (
             df_raw["User_ID"].tolist()
             if "User_ID" in df_raw.columns
-            else list(range(len(df_raw)))
+            else list(range(row_offset, row_offset + len(df_raw)))
         )
+        return user_ids, X
 
-        proba = self.model.predict_proba(X)
-        preds = np.argmax(proba, axis=1)
-        confidences = np.max(proba, axis=1) * 100
+    def _output_probabilities(
+        self, proba: np.ndarray, precision: str = "rounded", top_k: int | None = None
+    ) -> tuple[np.ndarray, np.ndarray | None]:
+        """Percent probabilities (rounded to 2 dp unless ``precision="full"``).
 
-        results = []
-        for i in range(len(df_raw)):
-            pred_label = self.class_names[int(preds[i])]
-            row_proba = {
-                cls: round(float(p) * 100, 2)
-                for cls, p in zip(self.class_names, proba[i])
+        With ``top_k`` returns the ``(n, k)`` class indices, most likely first,
+        and their probabilities; otherwise ``(None, (n, n_classes))``.
+        """
+        pct = proba.astype(np.float64) * 100
+        if precision == "rounded":
+            pct = np.round(pct, 2)
+        if top_k is None:
+            return None, pct
+        k = max(1, min(top_k, pct.shape[1]))
+        top = np.ascontiguousarray(np.argsort(-proba, axis=1, kind="stable")[:, :k])
+        return top, np.take_along_axis(pct, top, axis=1)
+
+    def prediction_rows(
+        self,
+        user_ids: list,
+        proba: np.ndarray,
+        row_offset: int = 0,
+        precision: str = "rounded",
+        top_k: int | None = None,
+    ) -> list[dict]:
+        """Per-row prediction records as returned by ``predict_batch``.
+
+        With ``top_k`` each ``class_probabilities`` holds only the ``k`` most
+        likely classes, in descending order.
+        """
+        preds = np.argmax(proba, axis=1)
+        confidences = proba[np.arange(len(proba)), preds].astype(np.float64) * 100
+        if precision == "rounded":
+            confidences = np.round(confidences, 2)
+        top, pct = self._output_probabilities(proba, precision, top_k)
+
+        names = self.class_names
+        name_arr = np.asarray(names, dtype=object)
+        labels = name_arr[preds].tolist()
+        if top is None:
+            per_row = [dict(zip(names, p)) for p in pct.tolist()]
+        else:
+            per_row = [dict(zip(n, p)) for n, p in zip(name_arr[top].tolist(), pct.tolist())]
+
+        return [
+            {
+                "row_index": row_offset + i,
+                "user_id": str(uid),
+                "predicted_bundle": label,
+                "confidence": conf,
+                "class_probabilities": probs,
             }
-            results.append({
-                "row_index": i,
-                "user_id": str(user_ids[i]),
-                "predicted_bundle": pred_label,
-                "confidence": round(float(confidences[i]), 2),
-                "class_probabilities": row_proba,
-            })
-
-        # aggregate
-        bundle_counts: dict[str, int] = {}
-        for r in results:
-            b = r["predicted_bundle"]
-            bundle_counts[b] = bundle_counts.get(b, 0) + 1
+            for i, (uid, label, conf, probs) in enumerate(
+                zip(user_ids, labels, confidences.tolist(), per_row)
+            )
+        ]
+
+    def prediction_columns(
+        self,
+        user_ids: list,
+        proba: np.ndarray,
+        row_offset: int = 0,
+        precision: str = "rounded",
+        top_k: int | None = None,
+    ) -> dict:
+        """Predictions as parallel arrays (one entry per row).
+
+        Probabilities are a ``(rows, classes)`` matrix ordered like
+        ``class_names``, or with ``top_k`` a ``(rows, k)`` pair of class
+        indices and probabilities. Arrays are left as NumPy for the encoder.
+        """
+        preds = np.argmax(proba, axis=1)
+        confidences = proba[np.arange(len(proba)), preds].astype(np.float64) * 100
+        if precision == "rounded":
+            confidences = np.round(confidences, 2)
+        top, pct = self._output_probabilities(proba, precision, top_k)
+
+        columns = {
+            "row_index": np.arange(row_offset, row_offset + len(proba)),
+            "user_id": [str(u) for u in user_ids],
+            "predicted_bundle": np.asarray(self.class_names, dtype=object)[preds].tolist(),
+            "predicted_index": preds,
+            "confidence": confidences,
+        }
+        if top is None:
+            columns["class_probabilities"] = pct
+        else:
+            columns["top_class_indices"] = top
+            columns["top_probabilities"] = pct
+        return columns
 
+    def batch_summary(self, proba: np.ndarray) -> dict:
+        """Bundle distribution and confidence stats for a probability matrix."""
+        preds = np.argmax(proba, axis=1)
+        confidences = proba[np.arange(len(proba)), preds].astype(np.float64) * 100
+        counts = np.bincount(preds, minlength=len(self.class_names))
         return {
-            "total_rows": len(results),
-            "predictions": results,
-            "summary": {
-                "bundle_distribution": bundle_counts,
-                "avg_confidence": round(float(np.mean(confidences)), 2),
-                "min_confidence": round(float(np.min(confidences)), 2),
-                "max_confidence": round(float(np.max(confidences)), 2),
+            "bundle_distribution": {
+                cls: int(n) for cls, n in zip(self.class_names, counts) if n
             },
+            "avg_confidence": round(float(np.mean(confidences)), 2),
+            "min_confidence": round(float(np.min(confidences)), 2),
+            "max_confidence": round(float(np.max(confidences)), 2),
+        }
+
+    def predict_batch(
+        self,
+        df_raw: pd.DataFrame,
+        layout: str = "rows",
+        precision: str = "rounded",
+        top_k: int | None = None,
+        explain: bool = False,
+        explain_top_k: int | None = None,
+    ) -> dict:
+        """
+        Full pipeline for a CSV batch.
+        Returns per-row predictions + aggregate summary.
+
+        ``layout="columnar"`` returns predictions as parallel arrays (see
+        ``prediction_columns``) instead of one record per row; ``precision``
+        and ``top_k`` control the probabilities emitted in either layout.
+        ``explain`` adds predicted-class SHAP values for every row (only the
+        ``explain_top_k`` largest features when set), see ``explain_batch``.
+        """
+        user_ids, X = self.frame_features(df_raw)
+        proba = self._predict_proba(X)
+        if layout == "columnar":
+            predictions = self.prediction_columns(
+                user_ids, proba, precision=precision, top_k=top_k
+            )
+        else:
+            predictions = self.prediction_rows(
+                user_ids, proba, precision=precision, top_k=top_k
+            )
+        if explain:
+            explanations = self.explain_batch(
+                X, np.argmax(proba, axis=1), layout=layout,
+                precision=precision, top_k=explain_top_k,
+            )
+            if layout == "columnar":
+                predictions["explanations"] = explanations
+            else:
+                for record, explanation in zip(predictions, explanations):
+                    record.update(explanation)
+
+        result = {
+            "total_rows": len(proba),
+            "predictions": predictions,
+            "summary": self.batch_summary(proba),
             "global_importances": self.global_importances,
         }
+        if layout == "columnar":
+            result["layout"] = "columnar"
+            result["classes"] = self.class_names
+            if explain:
+                result["features"] = self.feature_names
+        return result
 
 
 # ── Module-level singleton ────────────────────────────────────────────────────
+# The startup model version. Request handlers should use the registry's
+# active version (``app.ml_service.get_classification_service``), which
+# changes on hot reload.
 classification_service = ClassificationService()
@@ -0,0 +1,123 @@
+"""
+ml_service.py
+-------------
+Lightweight access to the classification service.
+
+Importing this module does not import the ML stack (xgboost, pandas,
+sklearn); ``app.ml_pipeline`` is imported and the model loaded either by
+the background warm-up started in ``lifespan`` or on the first request that
+needs it. The loaded model becomes the first version in ``model_registry``,
+and ``service()`` follows the registry's active version from then on.
+``status()`` backs the readiness endpoint.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from fastapi import HTTPException
+
+from app.model_registry import model_registry
+
+if TYPE_CHECKING:
+    from app.ml_pipeline import ClassificationService
+
+logger = logging.getLogger(__name__)
+
+
+class ModelLoader:
+    """Import ``app.ml_pipeline`` and load its model exactly once, off the loop."""
+
+    def __init__(self):
+        self.state = "not_loaded"      # not_loaded | loading | ready | failed
+        self.error: str | None = None
+        self.load_seconds: float | None = None
+        self.loaded_at: float | None = None
+        self._lock = threading.Lock()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def is_ready(self) -> bool:
+        return self.state == "ready"
+
+    def service(self) -> ClassificationService:
+        """The active model version's service.
+
+        Before the first load this is the (unloaded) startup service; getting
+        it imports the ML stack but does not load the model.
+        """
+        service = model_registry.active_service()
+        if service is not None:
+            return service
+        from app.ml_pipeline import classification_service
+        return classification_service
+
+    def load(self) -> ClassificationService:
+        """Blocking import + model load; later calls return immediately."""
+        with self._lock:
+            if self.state == "ready":
+                return self.service()
+            self.state, self.error = "loading", None
+            t0 = time.perf_counter()
+            try:
+                service = self.service()
+                service.load()
+            except Exception as exc:
+                self.state, self.error = "failed", str(exc)
+                logger.error("Failed to load ML model: %s", exc)
+                raise
+            self.load_seconds = round(time.perf_counter() - t0, 3)
+            model_registry.add(service, activate=True, load_seconds=self.load_seconds)
+            self.loaded_at = time.time()
+            self.state = "ready"
+            logger.info("ML classification model loaded in %.2fs.", self.load_seconds)
+            return service
+
+    def start_warm_up(self) -> asyncio.Task:
+        """Load in a worker thread without blocking startup (idempotent)."""
+        if self._task is None:
+            self._task = asyncio.create_task(asyncio.to_thread(self.load))
+            # A failure is recorded in ``state``; don't log it again as unretrieved.
+            self._task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return self._task
+
+    async def ensure_ready(self) -> ClassificationService:
+        """Wait for the model (starting a load if nobody has), or raise 503."""
+        if self.state == "ready":
+            return self.service()
+        if self.state == "failed":
+            raise HTTPException(503, "Model not loaded yet.")
+        try:
+            await asyncio.shield(self.start_warm_up())
+        except Exception:
+            raise HTTPException(503, "Model not loaded yet.")
+        return self.service()
+
+    def status(self) -> dict:
+        info = {
+            "ready": self.is_ready,
+            "state": self.state,
+            "error": self.error,
+            "load_seconds": self.load_seconds,
+            "loaded_at": self.loaded_at,
+        }
+        if self.is_ready:
+            service = self.service()
+            info["version"] = service.version
+            info["n_features"] = len(service.feature_names)
+            info["n_classes"] = len(service.class_names)
+            info["preprocessor_fitted"] = service.preprocessor is not None
+        return info
+
+
+# ── Module-level singleton ────────────────────────────────────────────────────
+model_loader = ModelLoader()
+
+
+async def get_classification_service() -> ClassificationService:
+    """FastAPI dependency: the loaded service, or 503 if the model failed."""
+    return await model_loader.ensure_ready()
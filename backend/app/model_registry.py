@@ -0,0 +1,332 @@
+"""
+model_registry.py
+-----------------
+Loaded model versions, the one serving traffic, and shadow scoring.
+
+A new version is loaded and warmed in a worker thread while the active one
+keeps serving. ``activate`` swaps the active reference in one assignment, so
+a request runs entirely on the old or entirely on the new model; the
+previously active version stays loaded for ``rollback``. A candidate can
+shadow-score a fraction of traffic on its own single-thread pool after the
+response has been produced; its predictions only feed agreement stats.
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable
+
+from app.config import settings
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from app.ml_pipeline import ClassificationService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ModelVersion:
+    version: str
+    path: str
+    service: ClassificationService
+    loaded_at: float
+    load_seconds: float
+    warmup_seconds: float = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "version": self.version,
+            "path": self.path,
+            "loaded_at": self.loaded_at,
+            "load_seconds": round(self.load_seconds, 3),
+            "warmup_seconds": round(self.warmup_seconds, 3),
+            "n_features": len(self.service.feature_names),
+            "classes": self.service.class_names,
+        }
+
+
+@dataclass
+class ShadowStats:
+    version: str
+    fraction: float
+    batches: int = 0
+    compared: int = 0
+    agreed: int = 0
+    errors: int = 0
+    dropped: int = 0
+    started_at: float = field(default_factory=time.time)
+
+    def to_dict(self) -> dict:
+        return {
+            "version": self.version,
+            "fraction": self.fraction,
+            "batches": self.batches,
+            "compared": self.compared,
+            "agreed": self.agreed,
+            "agreement_rate": round(self.agreed / self.compared, 4) if self.compared else None,
+            "errors": self.errors,
+            "dropped": self.dropped,
+            "started_at": self.started_at,
+        }
+
+
+class ModelRegistry:
+    """Versions by name, the active one, its predecessor and a shadow candidate."""
+
+    def __init__(self, max_versions: int = 3, sample_rows: int = 64, shadow_max_pending: int = 4):
+        self.max_versions = max_versions
+        self.shadow_max_pending = shadow_max_pending
+        self._versions: OrderedDict[str, ModelVersion] = OrderedDict()
+        self._active: ModelVersion | None = None
+        self._previous: str | None = None
+        self._shadow: ShadowStats | None = None
+        self._shadow_pending = 0
+        self._shadow_pool: ThreadPoolExecutor | None = None
+        # Recent successfully scored request rows, replayed to warm new versions
+        self._samples: deque[dict] = deque(maxlen=sample_rows)
+        self._loads: deque[dict] = deque(maxlen=10)
+        self._listeners: list[Callable[[ModelVersion], None]] = []
+        self._lock = threading.Lock()
+
+    # ── versions ──────────────────────────────────────────────────────────
+
+    @property
+    def active(self) -> ModelVersion | None:
+        return self._active
+
+    def active_service(self) -> ClassificationService | None:
+        active = self._active
+        return active.service if active is not None else None
+
+    def subscribe(self, listener: Callable[[ModelVersion], None]) -> None:
+        """Call ``listener(new_active)`` after every swap (e.g. to drop caches)."""
+        self._listeners.append(listener)
+
+    def get(self, version: str) -> ModelVersion:
+        try:
+            return self._versions[version]
+        except KeyError:
+            raise KeyError(f"Model version {version!r} is not loaded.") from None
+
+    def add(self, service: ClassificationService, activate: bool = False,
+            load_seconds: float = 0.0, warmup_seconds: float = 0.0) -> ModelVersion:
+        """Register an already-loaded service (e.g. the startup model)."""
+        entry = ModelVersion(
+            version=service.version, path=service.model_path, service=service,
+            loaded_at=time.time(), load_seconds=load_seconds, warmup_seconds=warmup_seconds,
+        )
+        with self._lock:
+            self._versions[entry.version] = entry
+            self._versions.move_to_end(entry.version)
+            swapped = activate and self._swap(entry)
+            self._evict(keep=entry.version)
+        if swapped:
+            self._notify(entry)
+        return entry
+
+    def load_version(self, path: str, activate: bool = False,
+                     warmup_rows: list[dict] | None = None) -> ModelVersion:
+        """Load and warm ``path`` as a new version (blocking; call off the loop).
+
+        The version is only registered when it loads and scores the warm-up
+        rows without error; a failed load leaves the registry untouched.
+        """
+        from app.ml_pipeline import ClassificationService
+
+        attempt = {"path": path, "state": "loading", "version": None,
+                   "error": None, "started_at": time.time()}
+        self._loads.appendleft(attempt)
+        try:
+            t0 = time.perf_counter()
+            service = ClassificationService()
+            service.load(path)
+            load_seconds = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            self.warm_up(service, warmup_rows)
+            warmup_seconds = time.perf_counter() - t0
+        except Exception as exc:
+            attempt.update(state="failed", error=str(exc))
+            logger.error("Loading model %s failed: %s", path, exc)
+            raise
+
+        existing = self._versions.get(service.version)
+        entry = existing or self.add(
+            service, load_seconds=load_seconds, warmup_seconds=warmup_seconds
+        )
+        attempt.update(state="loaded", version=entry.version)
+        logger.info("Model %s loaded from %s in %.2fs (warm-up %.2fs).",
+                    entry.version, path, load_seconds, warmup_seconds)
+        if activate:
+            self.activate(entry.version)
+        return entry
+
+    def warm_up(self, service: ClassificationService, rows: list[dict] | None = None) -> None:
+        """Score sample rows so the first real request pays no first-call costs.
+
+        Uses ``rows`` or else recently scored traffic; always runs one
+        booster prediction. Raises if any sample fails on this version.
+        """
+        import numpy as np
+        import pandas as pd
+
+        service.predict_encoded(np.zeros((1, len(service.feature_names)), dtype=np.float32))
+        rows = list(rows) if rows else list(self._samples)
+        if not rows:
+            return
+        for result in service.predict_many(rows):
+            if isinstance(result, Exception):
+                raise ValueError(f"Warm-up row failed on the new model: {result}")
+        service.score_frame(pd.DataFrame(rows))
+
+    def activate(self, version: str) -> ModelVersion:
+        """Make ``version`` serve traffic; the current one becomes ``previous``."""
+        with self._lock:
+            entry = self.get(version)
+            swapped = self._swap(entry)
+        if swapped:
+            logger.info("Model %s is now active.", version)
+            self._notify(entry)
+        return entry
+
+    def rollback(self) -> ModelVersion:
+        """Swap back to the previously active version."""
+        if self._previous is None:
+            raise ValueError("No previous model version to roll back to.")
+        return self.activate(self._previous)
+
+    def _swap(self, entry: ModelVersion) -> bool:
+        # Caller holds the lock. The reference assignment is the atomic switch.
+        if self._active is entry:
+            return False
+        if self._active is not None:
+            self._previous = self._active.version
+        self._active = entry
+        if self._shadow is not None and self._shadow.version == entry.version:
+            self._shadow = None
+        return True
+
+    def _notify(self, entry: ModelVersion) -> None:
+        for listener in self._listeners:
+            try:
+                listener(entry)
+            except Exception:
+                logger.exception("Model swap listener failed")
+
+    def _evict(self, keep: str | None = None) -> None:
+        # Caller holds the lock. Never evicts the active, previous or shadow
+        # version, nor ``keep`` (the version just added).
+        pinned = {self._active.version if self._active else None, self._previous,
+                  self._shadow.version if self._shadow else None, keep}
+        for version in list(self._versions):
+            if len(self._versions) <= self.max_versions:
+                break
+            if version not in pinned:
+                del self._versions[version]
+                logger.info("Model %s unloaded from the registry.", version)
+
+    # ── shadow scoring ────────────────────────────────────────────────────
+
+    def set_shadow(self, version: str, fraction: float) -> ShadowStats:
+        if not 0 < fraction <= 1:
+            raise ValueError("fraction must be in (0, 1].")
+        with self._lock:
+            self.get(version)
+            if self._active is not None and self._active.version == version:
+                raise ValueError(f"Model {version} is active; shadow a different version.")
+            self._shadow = ShadowStats(version=version, fraction=fraction)
+        return self._shadow
+
+    def clear_shadow(self) -> None:
+        with self._lock:
+            self._shadow = None
+
+    def should_shadow(self) -> bool:
+        shadow = self._shadow
+        return shadow is not None and random.random() < shadow.fraction
+
+    def record_rows(self, rows: list[dict], results: list) -> None:
+        """Keep successfully scored rows as warm-up samples; maybe shadow them."""
+        ok = [row for row, result in zip(rows, results) if not isinstance(result, Exception)]
+        if self._samples.maxlen:
+            self._samples.extend(ok[-self._samples.maxlen:])
+        if ok and self.should_shadow():
+            import pandas as pd
+
+            labels = [r["predicted_bundle"] for r in results if not isinstance(r, Exception)]
+            self.shadow_frame(pd.DataFrame(ok), labels)
+
+    def shadow_frame(self, df_raw: pd.DataFrame, primary_labels: list[str]) -> None:
+        """Queue ``df_raw`` for scoring on the shadow candidate (never blocks)."""
+        shadow = self._shadow
+        if shadow is None:
+            return
+        with self._lock:
+            if self._shadow_pending >= self.shadow_max_pending:
+                shadow.dropped += 1
+                return
+            self._shadow_pending += 1
+            if self._shadow_pool is None:
+                self._shadow_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow")
+            candidate = self._versions.get(shadow.version)
+        if candidate is None:
+            self._shadow_done()
+            return
+        self._shadow_pool.submit(self._shadow_score, shadow, candidate.service, df_raw, primary_labels)
+
+    def _shadow_done(self) -> None:
+        with self._lock:
+            self._shadow_pending -= 1
+
+    def _shadow_score(self, shadow: ShadowStats, service: ClassificationService,
+                      df_raw: pd.DataFrame, primary_labels: list[str]) -> None:
+        import numpy as np
+
+        try:
+            _, proba = service.score_frame(df_raw)
+            labels = np.asarray(service.class_names, dtype=object)[np.argmax(proba, axis=1)]
+            agreed = int(np.sum(labels == np.asarray(primary_labels, dtype=object)))
+            with self._lock:
+                shadow.batches += 1
+                shadow.compared += len(labels)
+                shadow.agreed += agreed
+        except Exception as exc:
+            logger.warning("Shadow scoring on %s failed: %s", shadow.version, exc)
+            with self._lock:
+                shadow.errors += 1
+        finally:
+            self._shadow_done()
+
+    # ── reporting / lifecycle ─────────────────────────────────────────────
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                "active": self._active.version if self._active else None,
+                "previous": self._previous,
+                "versions": [v.to_dict() for v in self._versions.values()],
+                "shadow": self._shadow.to_dict() if self._shadow else None,
+                "loads": list(self._loads),
+                "warmup_samples": len(self._samples),
+            }
+
+    def shutdown(self) -> None:
+        if self._shadow_pool is not None:
+            self._shadow_pool.shutdown(wait=False, cancel_futures=True)
+            self._shadow_pool = None
+
+
+# ── Module-level singleton ────────────────────────────────────────────────────
+model_registry = ModelRegistry(
+    max_versions=settings.MODEL_REGISTRY_MAX_VERSIONS,
+    sample_rows=settings.MODEL_WARMUP_SAMPLE_ROWS,
+    shadow_max_pending=settings.MODEL_SHADOW_MAX_PENDING,
+)
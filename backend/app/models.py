@@ -1,4 +1,7 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, Enum as SAEnum, Text
+from sqlalchemy import (
+    Column, Integer, String, Float, Boolean, Enum as SAEnum, Text, JSON, DateTime, ForeignKey,
+    Index,
+)
 from app.database import Base
 import enum
 
@@ -55,6 +58,43 @@ class Client(Base):
     policy_start_month = Column(String, nullable=True)
     purchased_coverage_bundle = Column(String, nullable=True)
 
+    # Listing filters (routers/clients.py), each ending in id so a filtered
+    # page is an index range read in keyset order. Two-filter combinations
+    # use one single-filter index and check the other column.
+    __table_args__ = (
+        Index("ix_clients_region_id", "region_code", "id"),
+        Index("ix_clients_bundle_id", "purchased_coverage_bundle", "id"),
+        Index("ix_clients_employment_id", "employment_status", "id"),
+        Index(
+            "ix_clients_region_bundle_employment_id",
+            "region_code", "purchased_coverage_bundle", "employment_status", "id",
+        ),
+    )
+
+
+# ──────────────────────────── Client Prediction Model ────────────────
+class ClientPrediction(Base):
+    """Stored model output per client, kept current by ``app.rescoring``."""
+    __tablename__ = "client_predictions"
+
+    client_id = Column(Integer, ForeignKey("clients.id", ondelete="CASCADE"), primary_key=True)
+    predicted_bundle = Column(String, nullable=False)
+    confidence = Column(Float, nullable=False)
+    class_probabilities = Column(JSON, nullable=False)  # {bundle: percent}
+    model_version = Column(String, nullable=False, index=True)
+    features_hash = Column(String, nullable=False)  # of the client fields it was scored on
+    scored_at = Column(DateTime(timezone=True), nullable=False)
+
+
+# ──────────────────────────── Dashboard Summary Model ────────────────
+class DashboardSummary(Base):
+    """Materialized dashboard aggregates (single row), see ``app.dashboard_stats``."""
+    __tablename__ = "dashboard_summary"
+
+    id = Column(Integer, primary_key=True)
+    aggregates = Column(JSON, nullable=False)
+    updated_at = Column(Float, nullable=False)  # epoch seconds
+
 
 # ──────────────────────────── Bundle Policy Model ────────────────────
 class BundlePolicy(Base):
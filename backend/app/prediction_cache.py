@@ -0,0 +1,240 @@
+"""
+prediction_cache.py
+-------------------
+Cache of ``/api/classify/single`` results keyed by client features.
+
+The key is a hash of the request's feature fields (``User_ID`` excluded, keys
+sorted) and the model version, so a result is never served for a different
+model. Entries live in an in-process LRU with a TTL; with ``disk_path`` set
+they are also written to a SQLite file that several workers can share. When
+the registry swaps the active model the in-memory entries are dropped and
+the disk file is purged of other versions.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import orjson
+
+from app.config import settings
+from app.model_registry import model_registry
+
+logger = logging.getLogger(__name__)
+
+_EXCLUDED_FIELDS = ("User_ID",)
+
+
+def canonical_key(row: dict, version: str) -> str:
+    """Stable hash of a request's feature values and the model version."""
+    features = {k: v for k, v in row.items() if k not in _EXCLUDED_FIELDS}
+    h = hashlib.blake2b(orjson.dumps(features, option=orjson.OPT_SORT_KEYS), digest_size=16)
+    h.update(version.encode())
+    return h.hexdigest()
+
+
+class PredictionCache:
+    """LRU + TTL over prediction dicts, optionally backed by a SQLite file."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float, disk_path: str = ""):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_path = disk_path
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        # Disk I/O has its own lock so it never stalls in-memory lookups on the loop
+        self._db_lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        self._puts_since_trim = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    # ── in-process LRU ───────────────────────────────────────────────────
+
+    def lookup(self, row: dict, version: str) -> dict | None:
+        """In-memory hit for ``row`` under ``version`` (cheap; safe on the loop).
+
+        A miss is not counted here: the caller goes on to ``get_many``.
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            value = self._get_memory(canonical_key(row, version))
+            if value is not None:
+                self.hits += 1
+            return value
+
+    def _get_memory(self, key: str) -> dict | None:
+        # Caller holds the lock.
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _put_memory(self, key: str, value: dict, ttl: float) -> None:
+        # Caller holds the lock.
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    # ── batch access (runs on the inference executor) ─────────────────────
+
+    def get_many(self, keys: list[str]) -> list[dict | None]:
+        """Cached result per key (memory, then disk) or ``None``."""
+        if not self.enabled:
+            return [None] * len(keys)
+        with self._lock:
+            found = [self._get_memory(k) for k in keys]
+        missing = [k for k, v in zip(keys, found) if v is None]
+        from_disk = self._disk_get(missing) if missing else {}
+        with self._lock:
+            for i, key in enumerate(keys):
+                if found[i] is not None:
+                    self.hits += 1
+                elif key in from_disk:
+                    expires_at, found[i] = from_disk[key]
+                    self._put_memory(key, found[i], expires_at - time.time())
+                    self.disk_hits += 1
+                else:
+                    self.misses += 1
+        return found
+
+    def put_many(self, items: list[tuple[str, dict]], version: str) -> None:
+        if not self.enabled or not items:
+            return
+        with self._lock:
+            for key, value in items:
+                self._put_memory(key, value, self.ttl_seconds)
+        self._disk_put(items, version)
+
+    # ── optional SQLite backing ───────────────────────────────────────────
+
+    def _connect(self) -> sqlite3.Connection | None:
+        if not self.disk_path:
+            return None
+        if self._db is None:
+            db = sqlite3.connect(self.disk_path, timeout=1.0, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS predictions ("
+                " key TEXT PRIMARY KEY, version TEXT NOT NULL,"
+                " expires_at REAL NOT NULL, value BLOB NOT NULL)"
+            )
+            self._db = db
+        return self._db
+
+    def _disk_get(self, keys: list[str]) -> dict[str, tuple[float, dict]]:
+        try:
+            with self._db_lock:
+                db = self._connect()
+                if db is None:
+                    return {}
+                placeholders = ",".join("?" * len(keys))
+                rows = db.execute(
+                    f"SELECT key, expires_at, value FROM predictions"
+                    f" WHERE key IN ({placeholders}) AND expires_at > ?",
+                    [*keys, time.time()],
+                ).fetchall()
+        except sqlite3.Error as exc:
+            logger.warning("Prediction cache read failed: %s", exc)
+            return {}
+        return {key: (expires_at, orjson.loads(value)) for key, expires_at, value in rows}
+
+    def _disk_put(self, items: list[tuple[str, dict]], version: str) -> None:
+        expires_at = time.time() + self.ttl_seconds
+        try:
+            with self._db_lock:
+                db = self._connect()
+                if db is None:
+                    return
+                with db:
+                    db.executemany(
+                        "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?)",
+                        [(k, version, expires_at, orjson.dumps(v)) for k, v in items],
+                    )
+                self._puts_since_trim += len(items)
+                if self._puts_since_trim >= 1000:
+                    self._puts_since_trim = 0
+                    self._trim_disk(db)
+        except sqlite3.Error as exc:
+            logger.warning("Prediction cache write failed: %s", exc)
+
+    def _trim_disk(self, db: sqlite3.Connection) -> None:
+        # Caller holds the disk lock. Expired rows, then the oldest beyond max_entries.
+        with db:
+            db.execute("DELETE FROM predictions WHERE expires_at <= ?", (time.time(),))
+            db.execute(
+                "DELETE FROM predictions WHERE key NOT IN"
+                " (SELECT key FROM predictions ORDER BY expires_at DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+
+    # ── invalidation / reporting ──────────────────────────────────────────
+
+    def invalidate(self, keep_version: str | None = None) -> None:
+        """Drop in-memory entries and disk entries of versions other than ``keep_version``."""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+        try:
+            with self._db_lock:
+                db = self._connect()
+                if db is not None:
+                    with db:
+                        db.execute(
+                            "DELETE FROM predictions WHERE version IS NOT ?", (keep_version,)
+                        )
+        except sqlite3.Error as exc:
+            logger.warning("Prediction cache purge failed: %s", exc)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "capacity": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "disk_path": self.disk_path or None,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def close(self) -> None:
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+# ── Module-level singleton ────────────────────────────────────────────────────
+prediction_cache = PredictionCache(
+    max_entries=settings.PREDICTION_CACHE_SIZE,
+    ttl_seconds=settings.PREDICTION_CACHE_TTL_SECONDS,
+    disk_path=settings.PREDICTION_CACHE_PATH,
+)
+model_registry.subscribe(lambda entry: prediction_cache.invalidate(entry.version))
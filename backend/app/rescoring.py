@@ -0,0 +1,196 @@
+"""
+rescoring.py
+------------
+Background, incremental rescoring of the ``client_predictions`` table.
+
+A pass walks the clients in id order, ``chunk_rows`` at a time, joined to
+their stored prediction. Only clients with no prediction, with fields that
+no longer match the stored ``features_hash``, or scored by a different
+model version are scored again, and their predictions are replaced. The
+hashing and scoring of a chunk both run on the shared inference executor,
+so a pass only does database I/O on the event loop and is subject to the
+same admission limit as request traffic: when the executor is saturated
+the pass waits and retries instead of queueing past the limit. A pass runs whenever the active model changes (including the
+startup load), when clients are loaded in this process, when an admin asks
+for one, and every ``interval_seconds`` to pick up clients written by other
+processes (such as ``app.seed_clients``); requests during a pass queue one
+more pass.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING
+
+from sqlalchemy import delete, insert, select
+
+from app.client_features import FEATURE_COLUMNS, PIPELINE_COLUMNS, features_hash
+from app.config import settings
+from app.database import async_session
+from app.executor import ExecutorSaturated, inference_executor
+from app.ml_service import model_loader
+from app.model_registry import model_registry
+from app.models import Client, ClientPrediction
+
+if TYPE_CHECKING:
+    from app.ml_pipeline import ClassificationService
+
+logger = logging.getLogger(__name__)
+
+# Wait before retrying a chunk the inference executor had no room for (seconds).
+_SATURATED_RETRY_SECONDS = 0.5
+
+
+class ClientRescorer:
+    """Keep stored client predictions in step with client data and the model."""
+
+    def __init__(self, chunk_rows: int = 5_000, interval_seconds: float = 0):
+        self.chunk_rows = chunk_rows
+        self.interval_seconds = interval_seconds
+        self.state = "idle"            # idle | running
+        self.progress: dict = {}
+        self.last_run: dict | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wake: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Start the worker task on the running loop (call from ``lifespan``)."""
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._worker())
+
+    def request(self) -> None:
+        """Ask for a pass; safe to call from any thread."""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = self._loop = self._wake = None
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval_seconds or None)
+            except asyncio.TimeoutError:
+                pass  # periodic pass
+            self._wake.clear()
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Client rescoring pass failed")
+                self.state = "idle"
+
+    async def run_once(self) -> dict | None:
+        """One incremental pass over all clients; ``None`` if no model is loaded."""
+        if not model_loader.is_ready:
+            return None
+        service = model_loader.service()
+        version = service.version
+        self.state = "running"
+        self.progress = {"model_version": version, "scanned": 0, "rescored": 0,
+                         "started_at": time.time()}
+        feature_cols = [getattr(Client, field) for field in PIPELINE_COLUMNS]
+        last_id = 0
+        while True:
+            async with async_session() as db:
+                query = (
+                    select(Client.id, *feature_cols,
+                           ClientPrediction.features_hash, ClientPrediction.model_version)
+                    .outerjoin(ClientPrediction, ClientPrediction.client_id == Client.id)
+                    .where(Client.id > last_id)
+                    .order_by(Client.id)
+                    .limit(self.chunk_rows)
+                )
+                rows = (await db.execute(query)).all()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+
+            records = await self._on_executor(self._rescore_chunk, service, rows)
+            if records:
+                async with async_session() as db:
+                    ids = [record["client_id"] for record in records]
+                    await db.execute(delete(ClientPrediction).where(ClientPrediction.client_id.in_(ids)))
+                    await db.execute(insert(ClientPrediction), records)
+                    await db.commit()
+            self.progress["scanned"] += len(rows)
+            self.progress["rescored"] += len(records)
+
+        self.last_run = dict(self.progress, finished_at=time.time())
+        self.state = "idle"
+        logger.info("Client rescoring: %d scanned, %d rescored with model %s.",
+                    self.last_run["scanned"], self.last_run["rescored"], version)
+        return self.last_run
+
+    @staticmethod
+    async def _on_executor(fn, *args):
+        """``fn(*args)`` on the inference executor, once it admits the work."""
+        while True:
+            try:
+                return await inference_executor.run(fn, *args)
+            except ExecutorSaturated:
+                await asyncio.sleep(_SATURATED_RETRY_SECONDS)
+
+    @classmethod
+    def _rescore_chunk(cls, service: ClassificationService, rows: list) -> list[dict]:
+        """Prediction rows for the stale clients among ``(id, *values,
+        stored hash, stored version)`` rows (blocking)."""
+        stale = []
+        for row in rows:
+            values = tuple(row[1:-2])
+            digest = features_hash(values)
+            if row[-1] != service.version or row[-2] != digest:
+                stale.append((row[0], values, digest))
+        return cls._score(service, stale) if stale else []
+
+    @staticmethod
+    def _score(service: ClassificationService, stale: list[tuple]) -> list[dict]:
+        """Prediction rows for ``(client_id, values, hash)`` triples, in one batch."""
+        import numpy as np
+        import pandas as pd
+
+        df = pd.DataFrame.from_records([values for _, values, _ in stale], columns=FEATURE_COLUMNS)
+        _, proba = service.score_frame(df)
+        preds = np.argmax(proba, axis=1)
+        pct = np.round(proba.astype(np.float64) * 100, 2)
+        names = service.class_names
+        scored_at = datetime.now(timezone.utc)
+        return [
+            {
+                "client_id": client_id,
+                "predicted_bundle": names[pred],
+                "confidence": float(row_pct[pred]),
+                "class_probabilities": dict(zip(names, row_pct.tolist())),
+                "model_version": service.version,
+                "features_hash": digest,
+                "scored_at": scored_at,
+            }
+            for (client_id, _, digest), pred, row_pct in zip(stale, preds.tolist(), pct)
+        ]
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "progress": self.progress if self.state == "running" else None,
+            "last_run": self.last_run,
+        }
+
+
+# ── Module-level singleton ────────────────────────────────────────────────────
+client_rescorer = ClientRescorer(
+    chunk_rows=settings.CLIENT_RESCORE_CHUNK_ROWS,
+    interval_seconds=settings.CLIENT_RESCORE_INTERVAL_SECONDS,
+)
+if settings.CLIENT_RESCORE_ON_MODEL_CHANGE:
+    model_registry.subscribe(lambda entry: client_rescorer.request())
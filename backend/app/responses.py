@@ -0,0 +1,23 @@
+"""
+responses.py
+------------
+Fast JSON response for large classification payloads.
+
+Serialises with orjson, which also encodes NumPy arrays and scalars natively,
+so columnar prediction arrays go to JSON without ``tolist()`` or FastAPI's
+``jsonable_encoder`` walking every value.
+"""
+
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class FastJSONResponse(JSONResponse):
+    """``JSONResponse`` rendered by orjson (NumPy-aware)."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
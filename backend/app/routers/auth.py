@@ -1,17 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.database import get_db
 from app.models import User, UserRole
 from app.schemas import UserCreate, UserLogin, UserOut, Token
-from app.auth import hash_password, verify_password, create_access_token, get_current_user
+from app.auth import (
+    hash_password_async, verify_password_async, create_access_token, get_current_user,
+    require_admin, user_cache, user_claims,
+)
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
 
+def _client_ip(request: Request) -> str:
+    # Behind a reverse proxy this is the proxy unless it is trusted through
+    # TRUSTED_PROXIES (or uvicorn's --forwarded-allow-ips).
+    return request.client.host if request.client else "unknown"
+
+
 @router.post("/register", response_model=Token)
-async def register(data: UserCreate, db: AsyncSession = Depends(get_db)):
+async def register(data: UserCreate, request: Request, db: AsyncSession = Depends(get_db)):
+    # Self-registration only creates brokers; admins are created with
+    # ``python -m app.create_admin``.
+    if data.role == UserRole.admin.value:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin accounts cannot be self-registered",
+        )
+
     # Check if user already exists
     result = await db.execute(select(User).where(User.email == data.email))
     if result.scalar_one_or_none():
@@ -20,18 +37,17 @@ async def register(data: UserCreate, db: AsyncSession = Depends(get_db)):
             detail="Email already registered",
         )
 
-    role = UserRole.admin if data.role == "admin" else UserRole.broker
     user = User(
         email=data.email,
         name=data.name,
-        hashed_password=hash_password(data.password),
-        role=role,
+        hashed_password=await hash_password_async(data.password, _client_ip(request)),
+        role=UserRole.broker,
     )
     db.add(user)
     await db.commit()
     await db.refresh(user)
 
-    token = create_access_token({"sub": user.id})
+    token = create_access_token(user_claims(user))
     return Token(
         access_token=token,
         user=UserOut.model_validate(user),
@@ -39,17 +55,24 @@ async def register(data: UserCreate, db: AsyncSession = Depends(get_db)):
 
 
 @router.post("/login", response_model=Token)
-async def login(data: UserLogin, db: AsyncSession = Depends(get_db)):
+async def login(data: UserLogin, request: Request, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(User).where(User.email == data.email))
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(data.password, user.hashed_password):
+    if not user or not await verify_password_async(
+        data.password, user.hashed_password, _client_ip(request)
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
         )
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Account is deactivated",
+        )
 
-    token = create_access_token({"sub": user.id})
+    token = create_access_token(user_claims(user))
     return Token(
         access_token=token,
         user=UserOut.model_validate(user),
@@ -59,3 +82,33 @@ async def login(data: UserLogin, db: AsyncSession = Depends(get_db)):
 @router.get("/me", response_model=UserOut)
 async def get_me(current_user: User = Depends(get_current_user)):
     return UserOut.model_validate(current_user)
+
+
+async def _set_active(user_id: int, active: bool, db: AsyncSession) -> UserOut:
+    user = await db.get(User, user_id)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    user.is_active = active
+    await db.commit()
+    user_cache.invalidate(user_id, active)
+    return UserOut.model_validate(user)
+
+
+@router.post("/users/{user_id}/deactivate", response_model=UserOut)
+async def deactivate_user(
+    user_id: int,
+    admin: User = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    """Block the user's login and tokens; cached copies in other workers expire
+    within AUTH_USER_CACHE_TTL_SECONDS."""
+    return await _set_active(user_id, False, db)
+
+
+@router.post("/users/{user_id}/activate", response_model=UserOut)
+async def activate_user(
+    user_id: int,
+    admin: User = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    return await _set_active(user_id, True, db)
@@ -2,22 +2,46 @@
 classification router
 ---------------------
 POST /api/classify/single   – predict one client
-POST /api/classify/batch    – upload CSV, predict all rows
+POST /api/classify/batch    – upload CSV, predict all rows (rows or columnar)
+POST /api/classify/batch/stream – upload CSV, stream NDJSON/CSV results
+GET  /api/classify/clients/{id} – predict a stored client by ID
+GET  /api/classify/clients?ids= – predict stored clients in one batch
+POST /api/classify/jobs     – upload CSV, score it in a background job
+GET  /api/classify/jobs     – the caller's recent jobs
+GET  /api/classify/jobs/{id} – job progress (rows, throughput, ETA)
+GET  /api/classify/jobs/{id}/result – download a finished job's Parquet
 GET  /api/classify/metadata – class names, feature list, model status
+GET  /api/classify/cache    – prediction cache size and hit rate
 """
 
 from __future__ import annotations
 
 import io
 import logging
-from typing import Any
+from typing import TYPE_CHECKING, Any, Literal
 
-import pandas as pd
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth import get_current_user
-from app.ml_pipeline import classification_service
+from app.batching import single_batcher
+from app.client_features import FEATURE_COLUMNS, as_record, fetch_client_features
+from app.config import settings
+from app.database import get_db
+from app.executor import ExecutorSaturated, inference_executor
+from app.jobs import job_manager
+from app.ml_service import get_classification_service
+from app.model_registry import model_registry
+from app.models import User, UserRole
+from app.prediction_cache import prediction_cache
+from app.responses import FastJSONResponse
+
+if TYPE_CHECKING:
+    from app.jobs import Job
+    from app.ml_pipeline import ClassificationService
 
 logger = logging.getLogger(__name__)
 
@@ -59,34 +83,113 @@ class SinglePredictionRequest(BaseModel):
     Existing_Policyholder: int = 0
 
 
+# ── Helpers ───────────────────────────────────────────────────────────────────
+
+def _saturated(exc: ExecutorSaturated) -> HTTPException:
+    return HTTPException(503, detail=str(exc), headers={"Retry-After": "1"})
+
+
+def _predict_csv(service: ClassificationService, contents: bytes, **options) -> dict:
+    """Parse and score an uploaded CSV (runs on the inference executor)."""
+    import pandas as pd
+
+    df = pd.read_csv(io.BytesIO(contents))
+    logger.info("Batch upload: %d rows, %d cols", *df.shape)
+    result = service.predict_batch(df, **options)
+    if model_registry.should_shadow():
+        predictions = result["predictions"]
+        labels = (
+            predictions["predicted_bundle"]
+            if isinstance(predictions, dict)
+            else [p["predicted_bundle"] for p in predictions]
+        )
+        model_registry.shadow_frame(df, labels)
+    return result
+
+
+def _predict_clients(
+    service: ClassificationService, client_ids: list[int], values: list[tuple], **options
+) -> dict:
+    """Score stored clients as one batch (runs on the inference executor)."""
+    import pandas as pd
+
+    df = pd.DataFrame.from_records(values, columns=FEATURE_COLUMNS)
+    result = service.predict_batch(df, **options)
+    predictions = result["predictions"]
+    if isinstance(predictions, dict):
+        predictions["client_id"] = client_ids
+    else:
+        for record, client_id in zip(predictions, client_ids):
+            record["client_id"] = client_id
+    return result
+
+
+def _parse_ids(ids: str) -> list[int]:
+    try:
+        parsed = list(dict.fromkeys(int(i) for i in ids.split(",") if i.strip()))
+    except ValueError:
+        raise HTTPException(422, "ids must be comma-separated integers.")
+    if not parsed:
+        raise HTTPException(422, "No client IDs given.")
+    if len(parsed) > settings.CLASSIFY_CLIENTS_MAX_IDS:
+        raise HTTPException(
+            422, f"At most {settings.CLASSIFY_CLIENTS_MAX_IDS} client IDs per request."
+        )
+    return parsed
+
+
+def _get_job(job_id: str, user: User) -> Job:
+    """The job, if ``user`` submitted it or is an admin; 404 otherwise."""
+    job = job_manager.get(job_id)
+    if job is None or (job.owner_id != user.id and user.role != UserRole.admin):
+        raise HTTPException(404, "Job not found.")
+    return job
+
+
 # ── Endpoints ─────────────────────────────────────────────────────────────────
 
 @router.get("/metadata")
-async def get_metadata(user=Depends(get_current_user)):
+async def get_metadata(
+    user=Depends(get_current_user),
+    service=Depends(get_classification_service),
+):
     """Return model status, class names, required columns, and global importances."""
-    if not classification_service.is_ready:
-        raise HTTPException(503, "Model not loaded yet.")
     return {
         "ready": True,
-        "classes": classification_service.class_names,
-        "n_classes": len(classification_service.class_names),
-        "global_importances": classification_service.global_importances,
+        "version": service.version,
+        "classes": service.class_names,
+        "n_classes": len(service.class_names),
+        "preprocessor_fitted": service.preprocessor is not None,
+        "global_importances": service.global_importances,
     }
 
 
+@router.get("/cache")
+async def get_cache_stats(user=Depends(get_current_user)):
+    """Prediction cache size, hit rate, evictions and invalidations."""
+    return prediction_cache.stats()
+
+
 @router.post("/single")
 async def classify_single(
     req: SinglePredictionRequest,
     user=Depends(get_current_user),
+    service=Depends(get_classification_service),
 ):
-    """Predict coverage bundle for a single client."""
-    if not classification_service.is_ready:
-        raise HTTPException(503, "Model not loaded yet.")
+    """Predict coverage bundle for a single client.
 
+    Repeat requests for the same client features on the same model version
+    are answered from the prediction cache.
+    """
     try:
         row = req.model_dump()
-        result = classification_service.predict_single(row)
+        cached = prediction_cache.lookup(row, service.version)
+        if cached is not None:
+            return cached
+        result = await single_batcher.submit(row)
         return result
+    except ExecutorSaturated as exc:
+        raise _saturated(exc)
     except ValueError as exc:
         raise HTTPException(422, detail=str(exc))
     except Exception as exc:
@@ -94,26 +197,198 @@ async def classify_single(
         raise HTTPException(500, detail=str(exc))
 
 
-@router.post("/batch")
+@router.post("/batch", response_class=FastJSONResponse)
 async def classify_batch(
     file: UploadFile = File(...),
+    layout: Literal["rows", "columnar"] = "rows",
+    precision: Literal["rounded", "full"] = "rounded",
+    top_k: int | None = Query(None, ge=1),
+    explain: bool = False,
+    explain_top_k: int | None = Query(None, ge=1),
     user=Depends(get_current_user),
+    service=Depends(get_classification_service),
 ):
-    """Upload a CSV and predict bundles for every row."""
-    if not classification_service.is_ready:
-        raise HTTPException(503, "Model not loaded yet.")
+    """Upload a CSV and predict bundles for every row.
 
+    ``layout=columnar`` returns predictions as parallel arrays with a
+    rows × classes probability matrix; ``precision=full`` skips rounding and
+    ``top_k`` keeps only each row's k most likely classes. ``explain`` adds
+    predicted-class SHAP values per row (the ``explain_top_k`` largest only).
+    """
     if not file.filename or not file.filename.endswith(".csv"):
         raise HTTPException(422, "Only .csv files are accepted.")
 
     try:
         contents = await file.read()
-        df = pd.read_csv(io.BytesIO(contents))
-        logger.info("Batch upload: %d rows, %d cols", *df.shape)
-        result = classification_service.predict_batch(df)
-        return result
+        result = await inference_executor.run(
+            _predict_csv, service, contents, layout=layout, precision=precision, top_k=top_k,
+            explain=explain, explain_top_k=explain_top_k,
+        )
+        return FastJSONResponse(result)
+    except ExecutorSaturated as exc:
+        raise _saturated(exc)
     except ValueError as exc:
         raise HTTPException(422, detail=str(exc))
     except Exception as exc:
         logger.exception("Batch prediction failed")
         raise HTTPException(500, detail=str(exc))
+
+
+@router.get("/clients/{client_id}")
+async def classify_client(
+    client_id: int,
+    user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    service=Depends(get_classification_service),
+):
+    """Predict a stored client's bundle from its ``Client`` row.
+
+    Same result as ``/single`` for the client's raw fields (and shares its
+    cache and micro-batching), plus ``client_id`` and ``user_id``.
+    """
+    found, values = await fetch_client_features(db, [client_id])
+    if not found:
+        raise HTTPException(404, "Client not found.")
+    row = as_record(values[0])
+    try:
+        result = prediction_cache.lookup(row, service.version)
+        if result is None:
+            result = await single_batcher.submit(row)
+    except ExecutorSaturated as exc:
+        raise _saturated(exc)
+    except ValueError as exc:
+        raise HTTPException(422, detail=str(exc))
+    except Exception as exc:
+        logger.exception("Client prediction failed")
+        raise HTTPException(500, detail=str(exc))
+    return {"client_id": client_id, "user_id": row["User_ID"], **result}
+
+
+@router.get("/clients", response_class=FastJSONResponse)
+async def classify_clients(
+    ids: str = Query(..., description="Comma-separated client IDs"),
+    layout: Literal["rows", "columnar"] = "rows",
+    precision: Literal["rounded", "full"] = "rounded",
+    top_k: int | None = Query(None, ge=1),
+    explain: bool = False,
+    explain_top_k: int | None = Query(None, ge=1),
+    user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    service=Depends(get_classification_service),
+):
+    """Predict stored clients in one vectorized batch.
+
+    Rows are fetched in one query and scored like a ``/batch`` upload (same
+    options and response), in the order of ``ids``, each with its
+    ``client_id``. IDs with no client are listed in ``missing_ids``.
+    """
+    client_ids = _parse_ids(ids)
+    found, values = await fetch_client_features(db, client_ids)
+    if not found:
+        raise HTTPException(404, "No clients found.")
+    try:
+        result = await inference_executor.run(
+            _predict_clients, service, found, values, layout=layout, precision=precision,
+            top_k=top_k, explain=explain, explain_top_k=explain_top_k,
+        )
+    except ExecutorSaturated as exc:
+        raise _saturated(exc)
+    except ValueError as exc:
+        raise HTTPException(422, detail=str(exc))
+    except Exception as exc:
+        logger.exception("Client batch prediction failed")
+        raise HTTPException(500, detail=str(exc))
+    found_set = set(found)
+    result["missing_ids"] = [i for i in client_ids if i not in found_set]
+    return FastJSONResponse(result)
+
+
+@router.post("/batch/stream")
+async def classify_batch_stream(
+    file: UploadFile = File(...),
+    format: Literal["ndjson", "csv"] = "ndjson",
+    user=Depends(get_current_user),
+    service=Depends(get_classification_service),
+):
+    """Upload a CSV and stream predictions back chunk by chunk.
+
+    Rows are emitted in ``predict_batch`` row format (NDJSON) or as CSV with
+    one probability column per class, followed by a trailing summary record.
+    """
+    from app.streaming import start_stream
+
+    if not file.filename or not file.filename.endswith(".csv"):
+        raise HTTPException(422, "Only .csv files are accepted.")
+
+    # The first chunk is scored before responding so that schema errors and
+    # saturation still surface as proper status codes.
+    try:
+        stream, first = await inference_executor.run(
+            start_stream, service, file.file,
+            fmt=format, chunk_rows=settings.CLASSIFY_STREAM_CHUNK_ROWS,
+        )
+    except ExecutorSaturated as exc:
+        raise _saturated(exc)
+    except ValueError as exc:
+        raise HTTPException(422, detail=str(exc))
+    except Exception as exc:
+        logger.exception("Streaming batch prediction failed")
+        raise HTTPException(500, detail=str(exc))
+
+    async def body():
+        chunk = first
+        while chunk is not None:
+            yield chunk
+            try:
+                chunk = await inference_executor.run_admitted(stream.next_chunk)
+            except Exception as exc:
+                logger.exception("Streaming batch prediction failed mid-stream")
+                yield stream.error_bytes(exc)
+                return
+        yield stream.summary_bytes()
+
+    return StreamingResponse(body(), media_type=stream.media_type)
+
+
+@router.post("/jobs", status_code=202)
+async def create_job(
+    file: UploadFile = File(...),
+    user=Depends(get_current_user),
+    service=Depends(get_classification_service),
+):
+    """Upload a CSV and score it in the background; poll the returned job."""
+    if not file.filename or not file.filename.endswith(".csv"):
+        raise HTTPException(422, "Only .csv files are accepted.")
+
+    job = await run_in_threadpool(job_manager.submit_csv, file.file, file.filename, user.id)
+    return job.to_dict()
+
+
+@router.get("/jobs")
+async def list_jobs(limit: int = 50, user=Depends(get_current_user)):
+    """The caller's most recent batch jobs (everyone's for admins), newest first."""
+    owner_id = None if user.role == UserRole.admin else user.id
+    jobs = await run_in_threadpool(job_manager.recent, limit, owner_id)
+    return [job.to_dict() for job in jobs]
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str, user=Depends(get_current_user)):
+    """Progress of a batch job: rows processed, throughput and ETA."""
+    return _get_job(job_id, user).to_dict()
+
+
+@router.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str, user=Depends(get_current_user)):
+    """Download a completed job's predictions as Parquet."""
+    job = _get_job(job_id, user)
+    if job.status == "failed":
+        raise HTTPException(409, detail=f"Job failed: {job.error}")
+    if job.status != "completed":
+        raise HTTPException(409, detail=f"Job is {job.status}.")
+    stem = job.filename.rsplit(".", 1)[0]
+    return FileResponse(
+        job_manager.result_path(job.id),
+        media_type="application/vnd.apache.parquet",
+        filename=f"{stem}_predictions.parquet",
+    )
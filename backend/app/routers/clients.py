@@ -1,56 +1,133 @@
-from fastapi import APIRouter, Depends, Query
+import base64
+import binascii
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 
 from app.database import get_db
-from app.models import Client, User
-from app.schemas import ClientOut
+from app.models import Client, ClientPrediction, User
+from app.schemas import ClientPredictionOut, ClientWithPredictionOut
 from app.auth import get_current_user
 
 router = APIRouter(prefix="/api/clients", tags=["clients"])
 
 
-@router.get("", response_model=list[ClientOut])
+def _with_prediction(client: Client, prediction: ClientPrediction | None) -> ClientWithPredictionOut:
+    out = ClientWithPredictionOut.model_validate(client)
+    out.prediction = ClientPredictionOut.model_validate(prediction) if prediction else None
+    return out
+
+
+def _filters(region: str | None, bundle: str | None, employment: str | None) -> list:
+    conditions = []
+    if region:
+        conditions.append(Client.region_code == region)
+    if bundle:
+        conditions.append(Client.purchased_coverage_bundle == bundle)
+    if employment:
+        conditions.append(Client.employment_status == employment)
+    return conditions
+
+
+def _encode_cursor(last_id: int) -> str:
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> int:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        return int(raw.decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=422, detail="Invalid cursor")
+
+
+@router.get(
+    "", response_model=list[ClientWithPredictionOut], response_model_exclude_unset=True
+)
 async def get_clients(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: str | None = None,
     region: str | None = None,
     bundle: str | None = None,
     employment: str | None = None,
+    include_prediction: bool = False,
+    include_count: bool = False,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
+    """Clients in id order, optionally with their stored prediction (see ``app.rescoring``).
+
+    A full page sets ``X-Next-Cursor``; passing it back as ``cursor`` reads
+    the next page from the id index instead of skipping rows, so deep pages
+    cost the same as the first. ``include_count`` adds the filtered total as
+    ``X-Total-Count``.
+    """
+    if cursor is not None and skip:
+        raise HTTPException(status_code=422, detail="Use either skip or cursor, not both")
+    conditions = _filters(region, bundle, employment)
+
     query = select(Client)
-    if region:
-        query = query.where(Client.region_code == region)
-    if bundle:
-        query = query.where(Client.purchased_coverage_bundle == bundle)
-    if employment:
-        query = query.where(Client.employment_status == employment)
-    query = query.offset(skip).limit(limit)
+    if include_prediction:
+        query = select(Client, ClientPrediction).outerjoin(
+            ClientPrediction, ClientPrediction.client_id == Client.id
+        )
+    query = query.where(*conditions)
+    if cursor is not None:
+        query = query.where(Client.id > _decode_cursor(cursor))
+    else:
+        query = query.offset(skip)
+    query = query.order_by(Client.id).limit(limit)
 
     result = await db.execute(query)
-    return result.scalars().all()
+    if include_prediction:
+        clients = [_with_prediction(client, prediction) for client, prediction in result.all()]
+    else:
+        clients = result.scalars().all()
+
+    if len(clients) == limit:
+        response.headers["X-Next-Cursor"] = _encode_cursor(clients[-1].id)
+    if include_count:
+        count = await db.execute(select(func.count()).select_from(Client).where(*conditions))
+        response.headers["X-Total-Count"] = str(count.scalar())
+    return clients
 
 
 @router.get("/count")
 async def get_clients_count(
+    region: str | None = None,
+    bundle: str | None = None,
+    employment: str | None = None,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(select(func.count(Client.id)))
+    """Number of clients matching the listing filters (all clients without filters)."""
+    query = select(func.count()).select_from(Client).where(*_filters(region, bundle, employment))
+    result = await db.execute(query)
     return {"count": result.scalar()}
 
 
-@router.get("/{client_id}", response_model=ClientOut)
+@router.get(
+    "/{client_id}", response_model=ClientWithPredictionOut, response_model_exclude_unset=True
+)
 async def get_client(
     client_id: int,
+    include_prediction: bool = False,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(select(Client).where(Client.id == client_id))
-    client = result.scalar_one_or_none()
-    if not client:
-        from fastapi import HTTPException, status
+    query = select(Client)
+    if include_prediction:
+        query = select(Client, ClientPrediction).outerjoin(
+            ClientPrediction, ClientPrediction.client_id == Client.id
+        )
+    result = await db.execute(query.where(Client.id == client_id))
+    row = result.one_or_none()
+    if not row:
+        from fastapi import status
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Client not found")
-    return client
+    if include_prediction:
+        return _with_prediction(*row)
+    return row[0]
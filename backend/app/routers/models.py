@@ -0,0 +1,139 @@
+"""
+models router (admin only)
+--------------------------
+GET    /api/models                   – versions, active/previous, shadow stats, recent loads
+POST   /api/models/load              – load + warm a model file in the background
+POST   /api/models/{version}/activate – swap a loaded version into service
+POST   /api/models/rollback          – swap back to the previous version
+PUT    /api/models/shadow            – shadow-score a fraction of traffic on a version
+DELETE /api/models/shadow            – stop shadow scoring
+GET    /api/models/rescore           – stored client prediction refresh status
+POST   /api/models/rescore           – refresh stale stored client predictions
+"""
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from pydantic import BaseModel, Field
+
+from app.auth import require_admin
+from app.config import settings
+from app.ml_service import get_classification_service
+from app.model_registry import model_registry
+from app.rescoring import client_rescorer
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/models", tags=["models"])
+
+
+# ── Pydantic models ──────────────────────────────────────────────────────────
+
+class LoadModelRequest(BaseModel):
+    """A ``.ubj`` booster or joblib model under ``MODEL_DIR``."""
+    path: str
+    activate: bool = False
+    # Raw client rows to warm with; defaults to recently scored requests
+    warmup_rows: list[dict] | None = None
+
+
+class ShadowRequest(BaseModel):
+    version: str
+    fraction: float = Field(0.1, gt=0, le=1)
+
+
+# ── Helpers ───────────────────────────────────────────────────────────────────
+
+def _model_path(path: str) -> str:
+    """Resolve ``path`` against MODEL_DIR; joblib files are unpickled, so
+    nothing outside that directory (including via symlinks) is accepted."""
+    root = Path(settings.MODEL_DIR).resolve()
+    resolved = (root / path).resolve()
+    if not resolved.is_relative_to(root):
+        raise HTTPException(422, detail="Model path must be inside the model directory.")
+    return str(resolved)
+
+
+def _load_in_background(req: LoadModelRequest) -> None:
+    try:
+        model_registry.load_version(req.path, activate=req.activate, warmup_rows=req.warmup_rows)
+    except Exception:
+        pass  # recorded in the registry's load history and logged there
+
+
+# ── Endpoints ─────────────────────────────────────────────────────────────────
+
+@router.get("")
+async def registry_status(user=Depends(require_admin)):
+    """Loaded versions, which one serves traffic, shadow stats and recent loads."""
+    return model_registry.status()
+
+
+@router.post("/load", status_code=202)
+async def load_model(
+    req: LoadModelRequest,
+    background_tasks: BackgroundTasks,
+    user=Depends(require_admin),
+    service=Depends(get_classification_service),
+):
+    """Load and warm a model version without interrupting traffic.
+
+    Poll ``GET /api/models`` for the outcome; with ``activate`` the version
+    replaces the active one once it has loaded and warmed successfully.
+    """
+    req.path = _model_path(req.path)
+    background_tasks.add_task(_load_in_background, req)
+    return {"status": "loading", "path": req.path, "active": service.version}
+
+
+@router.post("/{version}/activate")
+async def activate_model(version: str, user=Depends(require_admin)):
+    """Make a loaded version the active one; the current one is kept for rollback."""
+    try:
+        return model_registry.activate(version).to_dict()
+    except KeyError as exc:
+        raise HTTPException(404, detail=exc.args[0])
+
+
+@router.post("/rollback")
+async def rollback_model(user=Depends(require_admin)):
+    """Swap the previously active version back in."""
+    try:
+        return model_registry.rollback().to_dict()
+    except ValueError as exc:
+        raise HTTPException(409, detail=str(exc))
+
+
+@router.put("/shadow")
+async def start_shadow(req: ShadowRequest, user=Depends(require_admin)):
+    """Score ``fraction`` of classification calls on ``version`` in the background."""
+    try:
+        return model_registry.set_shadow(req.version, req.fraction).to_dict()
+    except KeyError as exc:
+        raise HTTPException(404, detail=exc.args[0])
+    except ValueError as exc:
+        raise HTTPException(409, detail=str(exc))
+
+
+@router.delete("/shadow", status_code=204)
+async def stop_shadow(user=Depends(require_admin)):
+    model_registry.clear_shadow()
+
+
+@router.get("/rescore")
+async def rescore_status(user=Depends(require_admin)):
+    """Progress of the running client rescoring pass and the last finished one."""
+    return client_rescorer.status()
+
+
+@router.post("/rescore", status_code=202)
+async def rescore_clients(
+    user=Depends(require_admin),
+    service=Depends(get_classification_service),
+):
+    """Rescore clients whose fields changed or whose prediction is from another model."""
+    client_rescorer.request()
+    return client_rescorer.status()
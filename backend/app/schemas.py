@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from pydantic import BaseModel
 
 
@@ -65,6 +67,21 @@ class ClientOut(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class ClientPredictionOut(BaseModel):
+    predicted_bundle: str
+    confidence: float
+    class_probabilities: dict[str, float]
+    model_version: str
+    scored_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class ClientWithPredictionOut(ClientOut):
+    # Only present when requested with include_prediction; null = not scored yet
+    prediction: ClientPredictionOut | None = None
+
+
 # ── Dashboard ───────────────────────────────────────────────────────
 class DashboardStats(BaseModel):
     total_clients: int
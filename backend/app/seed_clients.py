@@ -1,12 +1,28 @@
-"""Seed the clients table from train.csv."""
+"""Seed the clients table from train.csv.
 
+The CSV is parsed in one multithreaded pass (pyarrow) into typed columns and
+written with Core ``executemany`` batches inside a single transaction, with
+SQLite's durability pragmas relaxed for the duration of the load.
+
+Usage
+-----
+  python -m app.seed_clients                 # only into an empty table
+  python -m app.seed_clients --upsert        # insert new user_ids, update changed ones
+  python -m app.seed_clients --benchmark     # rows/s into a scratch database
+"""
+
+import argparse
 import asyncio
-import csv
-import math
+import tempfile
+import time
+from contextlib import asynccontextmanager
 from pathlib import Path
 
-from sqlalchemy import select, func
-from app.database import engine, Base, async_session
+from sqlalchemy import bindparam, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+from app.dashboard_stats import dashboard_stats
+from app.database import engine, Base, async_session, make_engine
 from app.models import Client
 
 CSV_PATH = Path(__file__).resolve().parents[2] / "front-end" / "data" / "train.csv"
@@ -60,59 +76,199 @@ FLOAT_FIELDS = {
 }
 
 
-def _parse_value(field: str, raw: str):
-    """Convert a raw CSV string to the correct Python type."""
-    if raw == "" or raw is None:
-        return None
-    if field in INT_FIELDS:
-        try:
-            return int(float(raw))
-        except (ValueError, TypeError):
-            return None
-    if field in FLOAT_FIELDS:
-        try:
-            v = float(raw)
-            return None if math.isnan(v) else v
-        except (ValueError, TypeError):
-            return None
-    return raw  # string fields
-
-
-async def seed_clients():
+# Relaxed for the load and restored afterwards: an OS crash mid-load can
+# lose the load, which is simply rerun.
+BULK_LOAD_PRAGMAS = {
+    "synchronous": "OFF",
+    "temp_store": "MEMORY",
+    "cache_size": "-262144",   # KiB, i.e. 256 MiB
+}
+
+BATCH_ROWS = 20_000
+
+
+def read_clients_csv(path: Path = CSV_PATH) -> list[dict]:
+    """Client rows (model field → value) parsed from ``path``.
+
+    Every column is read as text and converted per column: integer fields
+    are truncated like ``int(float(raw))``, and empty or unparsable values
+    become ``None``. A ``user_id`` repeated in the file keeps its last row.
+    """
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    from pyarrow import csv as pa_csv
+
+    table = pa_csv.read_csv(
+        path,
+        convert_options=pa_csv.ConvertOptions(
+            column_types={column: pa.string() for column in COLUMN_MAP},
+            include_columns=list(COLUMN_MAP),
+            include_missing_columns=True,
+            null_values=[""],
+            strings_can_be_null=True,
+        ),
+    )
+    user_ids = table.column("User_ID").to_pandas()
+    table = table.filter(pa.array(user_ids.isna() | ~user_ids.duplicated(keep="last")))
+
+    columns = {}
+    for csv_col, field in COLUMN_MAP.items():
+        col = table.column(csv_col)
+        if field in INT_FIELDS or field in FLOAT_FIELDS:
+            try:
+                col = col.cast(pa.float64())
+            except pa.ArrowInvalid:
+                # Some values are not numbers: parse them one by one as None
+                col = pa.array(pd.to_numeric(col.to_pandas(), errors="coerce"), pa.float64())
+            col = pc.if_else(pc.is_nan(col), None, col)
+            if field in INT_FIELDS:
+                col = pc.trunc(col).cast(pa.int64())
+        columns[field] = col.to_pylist()
+    return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+
+@asynccontextmanager
+async def _bulk_load_pragmas(conn: AsyncConnection):
+    """Apply ``BULK_LOAD_PRAGMAS`` on ``conn`` (SQLite only), then restore them."""
+    if conn.dialect.name != "sqlite":
+        yield
+        return
+    saved = {}
+    for name, value in BULK_LOAD_PRAGMAS.items():
+        saved[name] = (await conn.exec_driver_sql(f"PRAGMA {name}")).scalar()
+        await conn.exec_driver_sql(f"PRAGMA {name} = {value}")
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            await conn.exec_driver_sql(f"PRAGMA {name} = {value}")
+
+
+async def load_clients(
+    db_engine: AsyncEngine,
+    rows: list[dict],
+    upsert: bool = False,
+    batch_rows: int = BATCH_ROWS,
+) -> dict:
+    """Write ``rows`` in one transaction; returns inserted/updated/unchanged counts.
+
+    Without ``upsert`` every row is inserted. With it, rows are matched to
+    stored clients by ``user_id``: unknown ones are inserted and only those
+    whose values differ are updated. Inserted rows are folded into the
+    dashboard summary in the same transaction. In the API process, written
+    rows get their stored predictions from an immediate rescoring pass;
+    elsewhere the server's periodic pass picks them up.
+    """
+    table = Client.__table__
+    fields = list(COLUMN_MAP.values())
+    new, changed = rows, []
+    async with db_engine.connect() as conn:
+        async with _bulk_load_pragmas(conn):
+            if upsert:
+                query = select(table.c.id, *(table.c[f] for f in fields))
+                stored = {
+                    row[1]: (row[0], tuple(row[1:]))
+                    for row in (await conn.execute(query)).all()
+                }
+                new = []
+                for row in rows:
+                    current = stored.get(row["user_id"]) if row["user_id"] is not None else None
+                    if current is None:
+                        new.append(row)
+                    elif current[1] != tuple(row[f] for f in fields):
+                        changed.append({"b_id": current[0], **row})
+
+            for i in range(0, len(new), batch_rows):
+                await conn.execute(insert(table), new[i:i + batch_rows])
+            if changed:
+                stmt = update(table).where(table.c.id == bindparam("b_id"))
+                for i in range(0, len(changed), batch_rows):
+                    await conn.execute(stmt, changed[i:i + batch_rows])
+
+            # The session joins the connection's transaction instead of committing
+            async with AsyncSession(bind=conn) as session:
+                await dashboard_stats.record_inserts(session, new)
+                await session.flush()
+            await conn.commit()
+    if new or changed:
+        from app.rescoring import client_rescorer  # lazy: app.rescoring imports this module
+        client_rescorer.request()
+    return {"inserted": len(new), "updated": len(changed),
+            "unchanged": len(rows) - len(new) - len(changed)}
+
+
+async def seed_clients(path: Path = CSV_PATH, upsert: bool = False, batch_rows: int = BATCH_ROWS):
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
     async with async_session() as session:
         count = (await session.execute(select(func.count(Client.id)))).scalar()
-        if count and count > 0:
-            print(f"Clients table already has {count} rows – skipping.")
+        if count and not upsert:
+            print(f"Clients table already has {count} rows – skipping (use --upsert).")
             return
+        if not count:
+            # The table is empty: start the dashboard summary from zero; the
+            # load folds its rows into it.
+            await dashboard_stats.refresh(session)
+
+    t0 = time.perf_counter()
+    rows = read_clients_csv(path)
+    parsed = time.perf_counter()
+    counts = await load_clients(engine, rows, upsert=upsert, batch_rows=batch_rows)
+    elapsed = time.perf_counter() - t0
+    if counts["updated"]:
+        async with async_session() as session:
+            await dashboard_stats.refresh(session)
+    print(
+        f"{counts['inserted']} inserted, {counts['updated']} updated, "
+        f"{counts['unchanged']} unchanged from {path.name} in {elapsed:.2f}s "
+        f"(parse {parsed - t0:.2f}s, {len(rows) / elapsed:,.0f} rows/s)."
+    )
 
-        with open(CSV_PATH, newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            batch: list[Client] = []
-            total = 0
 
-            for row in reader:
-                kwargs = {}
-                for csv_col, model_field in COLUMN_MAP.items():
-                    kwargs[model_field] = _parse_value(model_field, row.get(csv_col, ""))
-                batch.append(Client(**kwargs))
-                total += 1
+async def benchmark(path: Path = CSV_PATH, batch_rows: int = BATCH_ROWS) -> dict:
+    """Rows/s of parsing, a full load and a no-change upsert into a scratch SQLite file."""
+    t0 = time.perf_counter()
+    rows = read_clients_csv(path)
+    parse_s = time.perf_counter() - t0
+    with tempfile.TemporaryDirectory() as tmp:
+        scratch = make_engine(f"sqlite+aiosqlite:///{tmp}/bench.db")
+        async with scratch.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        t0 = time.perf_counter()
+        await load_clients(scratch, rows, batch_rows=batch_rows)
+        load_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        await load_clients(scratch, rows, upsert=True, batch_rows=batch_rows)
+        upsert_s = time.perf_counter() - t0
+        await scratch.dispose()
+    result = {
+        "rows": len(rows),
+        "parse_rows_per_s": round(len(rows) / parse_s),
+        "load_rows_per_s": round(len(rows) / load_s),
+        "upsert_unchanged_rows_per_s": round(len(rows) / upsert_s),
+    }
+    print(result)
+    return result
 
-                # flush every 5 000 rows to keep memory low
-                if len(batch) >= 5000:
-                    session.add_all(batch)
-                    await session.flush()
-                    batch.clear()
-                    print(f"  ... flushed {total} rows")
 
-            if batch:
-                session.add_all(batch)
+def main():
+    parser = argparse.ArgumentParser(description="Seed the clients table from train.csv.")
+    parser.add_argument("--csv", type=Path, default=CSV_PATH, help="CSV in the train.csv layout")
+    parser.add_argument("--upsert", action="store_true",
+                        help="Insert new user_ids and update changed rows of a non-empty table")
+    parser.add_argument("--batch-rows", type=int, default=BATCH_ROWS,
+                        help="Rows per executemany batch")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Time parsing and loading into a scratch database instead")
+    args = parser.parse_args()
 
-            await session.commit()
-            print(f"Seeded {total} clients from train.csv.")
+    if args.benchmark:
+        asyncio.run(benchmark(args.csv, args.batch_rows))
+    else:
+        asyncio.run(seed_clients(args.csv, args.upsert, args.batch_rows))
 
 
 if __name__ == "__main__":
-    asyncio.run(seed_clients())
+    main()
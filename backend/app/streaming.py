@@ -0,0 +1,131 @@
+"""
+streaming.py
+------------
+Chunked scoring of an uploaded CSV for the streaming batch endpoint.
+
+``BatchStream`` parses the upload ``chunk_rows`` at a time, scores each
+chunk and encodes its results as NDJSON or CSV bytes, keeping only running
+aggregates between chunks so memory stays flat regardless of file size.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import logging
+from typing import BinaryIO
+
+import numpy as np
+import pandas as pd
+
+from app.ml_pipeline import ClassificationService
+
+logger = logging.getLogger(__name__)
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+class BatchStream:
+    """Score a CSV file object chunk by chunk (blocking; run on the executor)."""
+
+    def __init__(
+        self,
+        service: ClassificationService,
+        fileobj: BinaryIO,
+        fmt: str = "ndjson",
+        chunk_rows: int = 10_000,
+    ):
+        if fmt not in MEDIA_TYPES:
+            raise ValueError(f"Unsupported stream format: {fmt}")
+        self.service = service
+        self.fmt = fmt
+        self._reader = pd.read_csv(fileobj, chunksize=chunk_rows)
+        self.rows = 0
+        self._counts = np.zeros(len(service.class_names), dtype=np.int64)
+        self._conf_sum = 0.0
+        self._conf_min = np.inf
+        self._conf_max = -np.inf
+
+    @property
+    def media_type(self) -> str:
+        return MEDIA_TYPES[self.fmt]
+
+    def next_chunk(self) -> bytes | None:
+        """Parse, score and encode the next chunk; ``None`` once exhausted."""
+        try:
+            df = next(self._reader)
+            while df.empty:  # a header-only upload yields one empty chunk
+                df = next(self._reader)
+        except StopIteration:
+            if self.rows == 0:
+                raise ValueError("Data validation failed: uploaded CSV has no rows.")
+            return None
+
+        offset = self.rows
+        user_ids, proba = self.service.score_frame(df, row_offset=offset)
+        preds = np.argmax(proba, axis=1)
+        confidences = np.max(proba, axis=1) * 100
+
+        self._counts += np.bincount(preds, minlength=len(self._counts))
+        self._conf_sum += float(confidences.sum())
+        self._conf_min = min(self._conf_min, float(confidences.min()))
+        self._conf_max = max(self._conf_max, float(confidences.max()))
+        self.rows += len(df)
+        logger.info("Streamed chunk | rows=%d total=%d", len(df), self.rows)
+
+        if self.fmt == "csv":
+            return self._encode_csv(user_ids, proba, preds, confidences, offset)
+        rows = self.service.prediction_rows(user_ids, proba, row_offset=offset)
+        return "".join(json.dumps(r) + "\n" for r in rows).encode()
+
+    def _encode_csv(self, user_ids, proba, preds, confidences, offset) -> bytes:
+        out = pd.DataFrame({
+            "row_index": np.arange(offset, offset + len(proba)),
+            "user_id": [str(u) for u in user_ids],
+            "predicted_bundle": np.asarray(self.service.class_names)[preds],
+            "confidence": np.round(confidences, 2),
+        })
+        probs = pd.DataFrame(np.round(proba * 100, 2), columns=self.service.class_names)
+        buf = io.StringIO()
+        pd.concat([out, probs], axis=1).to_csv(buf, index=False, header=offset == 0)
+        return buf.getvalue().encode()
+
+    def summary(self) -> dict:
+        """Aggregates over every row streamed so far (``predict_batch`` shape)."""
+        return {
+            "total_rows": self.rows,
+            "bundle_distribution": {
+                cls: int(n) for cls, n in zip(self.service.class_names, self._counts) if n
+            },
+            "avg_confidence": round(self._conf_sum / self.rows, 2) if self.rows else 0.0,
+            "min_confidence": round(self._conf_min, 2) if self.rows else 0.0,
+            "max_confidence": round(self._conf_max, 2) if self.rows else 0.0,
+        }
+
+    def summary_bytes(self) -> bytes:
+        """Trailing record: an NDJSON line, or a ``#``-comment line for CSV."""
+        line = json.dumps({"summary": self.summary()})
+        return (f"# {line}\n" if self.fmt == "csv" else f"{line}\n").encode()
+
+    def error_bytes(self, exc: Exception) -> bytes:
+        """Trailing record reporting a failure after streaming had started."""
+        line = json.dumps({"error": str(exc), "rows_completed": self.rows})
+        return (f"# {line}\n" if self.fmt == "csv" else f"{line}\n").encode()
+
+
+def start_stream(
+    service: ClassificationService,
+    fileobj: BinaryIO,
+    fmt: str = "ndjson",
+    chunk_rows: int = 10_000,
+) -> tuple[BatchStream, bytes | None]:
+    """Open a ``BatchStream`` and score its first chunk (blocking; run on the executor).
+
+    Creating the reader already parses from the upload, so it belongs off the
+    event loop together with the first chunk.
+    """
+    stream = BatchStream(service, fileobj, fmt=fmt, chunk_rows=chunk_rows)
+    return stream, stream.next_chunk()
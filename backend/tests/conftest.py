@@ -0,0 +1,100 @@
+"""
+conftest.py
+-----------
+Shared fixtures: a throwaway SQLite database and a TestClient whose
+database sessions use it.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Importing the models registers their tables on Base.
+from app import models  # noqa: E402,F401
+from app.database import Base  # noqa: E402
+
+
+async def _create_all(engine) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Session factory on a fresh SQLite file with every table created.
+
+    NullPool, because TestClient runs each request on its own event loop
+    and aiosqlite connections cannot move between loops.
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/test.db", poolclass=NullPool)
+    asyncio.run(_create_all(engine))
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    asyncio.run(engine.dispose())
+
+
+@pytest.fixture
+def api(db):
+    """TestClient with ``get_db`` and ``get_read_db`` on the ``db`` database."""
+    from app.database import get_db, get_read_db
+    from app.main import app
+
+    async def session():
+        async with db() as s:
+            yield s
+
+    app.dependency_overrides[get_db] = session
+    app.dependency_overrides[get_read_db] = session
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+RAW_CLIENT = {
+    "User_ID": "T1", "Estimated_Annual_Income": 52000, "Adult_Dependents": 2,
+    "Child_Dependents": 1.0, "Infant_Dependents": 0, "Previous_Policy_Duration_Months": 12,
+    "Days_Since_Quote": 10, "Grace_Period_Extensions": 0, "Custom_Riders_Requested": 1,
+    "Vehicles_on_Policy": 1, "Policy_Amendments_Count": 0, "Previous_Claims_Filed": 0,
+    "Years_Without_Claims": 3, "Underwriting_Processing_Days": 4, "Region_Code": "USA",
+    "Broker_Agency_Type": "Urban_Boutique", "Deductible_Tier": "Tier_2_Mid_Ded",
+    "Acquisition_Channel": "Direct_Website", "Payment_Schedule": "Monthly_EFT",
+    "Employment_Status": "Employed_FullTime", "Policy_Start_Month": "March",
+    "Broker_ID": 9.0, "Employer_ID": None, "Policy_Cancelled_Post_Purchase": 0,
+    "Policy_Start_Year": 2024, "Policy_Start_Week": 10, "Policy_Start_Day": 5,
+    "Existing_Policyholder": 0, "Purchased_Coverage_Bundle": "Basic_Health",
+}
+
+
+@pytest.fixture
+def raw_client():
+    """Factory for raw (train.csv-style) client records: ``raw_client(i, **overrides)``."""
+    def make(i: int = 1, **overrides) -> dict:
+        return {**RAW_CLIENT, "User_ID": f"T{i}", **overrides}
+    return make
+
+
+@pytest.fixture
+def add_clients(db):
+    """Insert raw client records into ``db`` with ``load_clients``; returns
+    ``(ids, counts)`` with the ids of all stored clients in id order."""
+    from sqlalchemy import select
+
+    from app.models import Client
+    from app.seed_clients import COLUMN_MAP, load_clients
+
+    def add(records: list[dict], upsert: bool = False):
+        rows = [{COLUMN_MAP[k]: v for k, v in r.items()} for r in records]
+
+        async def run():
+            counts = await load_clients(db.kw["bind"], rows, upsert=upsert)
+            async with db() as session:
+                ids = (await session.execute(select(Client.id).order_by(Client.id))).scalars().all()
+            return list(ids), counts
+
+        return asyncio.run(run())
+    return add
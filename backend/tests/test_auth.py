@@ -0,0 +1,110 @@
+"""
+test_auth.py
+------------
+Per-worker user cache and token-claim users of get_current_user, and the
+roles self-registration may create.
+Run with: pytest tests/test_auth.py -v
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+from sqlalchemy import func, select
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.auth import UserCache, user_claims  # noqa: E402
+from app.models import User, UserRole  # noqa: E402
+
+
+def make_user(user_id=1):
+    return User(id=user_id, email="a@b.c", name="A", role=UserRole.broker, is_active=True)
+
+
+class TestUserCache:
+    def test_hit_after_put(self):
+        cache = UserCache(ttl_seconds=60)
+        user = make_user()
+        assert cache.get(1) is None
+        cache.put(user)
+        assert cache.get(1) is user
+
+    def test_ttl_expiry(self):
+        cache = UserCache(ttl_seconds=0.05)
+        cache.put(make_user())
+        time.sleep(0.1)
+        assert cache.get(1) is None
+
+    def test_disabled(self):
+        cache = UserCache(ttl_seconds=0)
+        cache.put(make_user())
+        assert cache.get(1) is None
+
+    def test_bounded(self):
+        cache = UserCache(ttl_seconds=60, max_entries=2)
+        for user_id in (1, 2, 3):
+            cache.put(make_user(user_id))
+        assert [cache.get(i) is not None for i in (1, 2, 3)] == [False, True, True]
+
+    def test_invalidate(self):
+        cache = UserCache(ttl_seconds=60)
+        cache.put(make_user())
+        cache.invalidate(1, active=False)
+        assert cache.get(1) is None
+
+
+class TestClaims:
+    def test_user_from_claims(self):
+        cache = UserCache(ttl_seconds=60)
+        user = cache.from_claims(1, user_claims(make_user()))
+        assert (user.id, user.email, user.role) == (1, "a@b.c", UserRole.broker)
+
+    def test_token_without_claims(self):
+        assert UserCache().from_claims(1, {"sub": "1"}) is None
+        assert UserCache().from_claims(1, {"sub": "1", "email": "a", "name": "A", "role": "x"}) is None
+
+    def test_deactivated_user_is_looked_up(self):
+        cache = UserCache(ttl_seconds=60)
+        claims = user_claims(make_user())
+        cache.invalidate(1, active=False)
+        assert cache.from_claims(1, claims) is None
+        cache.invalidate(1, active=True)
+        assert cache.from_claims(1, claims) is not None
+
+
+class TestRegister:
+    def register(self, api, **extra):
+        body = {"email": "new@b.c", "name": "New", "password": "pw-123456", **extra}
+        return api.post("/api/auth/register", json=body)
+
+    def count_users(self, db):
+        async def run():
+            async with db() as session:
+                return (await session.execute(select(func.count(User.id)))).scalar()
+        return asyncio.run(run())
+
+    def test_registers_broker(self, api):
+        response = self.register(api)
+        assert response.status_code == 200
+        assert response.json()["user"]["role"] == "broker"
+
+    def test_admin_role_refused(self, api, db):
+        response = self.register(api, role="admin")
+        assert response.status_code == 403
+        assert self.count_users(db) == 0
+
+    def test_unknown_role_is_broker(self, api):
+        assert self.register(api, role="root").json()["user"]["role"] == "broker"
+
+    def test_create_admin_promotes_existing_user(self, api, db, monkeypatch):
+        from app import create_admin
+
+        monkeypatch.setattr(create_admin, "engine", db.kw["bind"])
+        monkeypatch.setattr(create_admin, "async_session", db)
+        self.register(api)
+        asyncio.run(create_admin.create_admin("new@b.c", None, None))
+        login = api.post("/api/auth/login", json={"email": "new@b.c", "password": "pw-123456"})
+        assert login.json()["user"]["role"] == "admin"
+        assert self.count_users(db) == 1
@@ -0,0 +1,88 @@
+"""
+test_batching.py
+----------------
+Coalescing, early flush and per-caller fan-out of the micro-batcher.
+Run with: pytest tests/test_batching.py -v
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.batching import MicroBatcher  # noqa: E402
+from app.executor import InferenceExecutor  # noqa: E402
+
+
+class StubService:
+    """Scores a row as its ``x`` doubled; rows without ``x`` fail alone."""
+
+    def __init__(self):
+        self.calls: list[int] = []
+
+    def predict_many(self, rows: list[dict]) -> list:
+        self.calls.append(len(rows))
+        return [
+            {"score": row["x"] * 2} if "x" in row else ValueError("missing x")
+            for row in rows
+        ]
+
+
+@pytest.fixture
+def executor():
+    ex = InferenceExecutor(max_workers=1, max_queue=16, name="test")
+    yield ex
+    ex.shutdown()
+
+
+def make_batcher(executor, service, max_batch_size=8, max_wait_ms=20):
+    return MicroBatcher(service.predict_many, executor, max_batch_size, max_wait_ms)
+
+
+def submit_all(batcher, rows):
+    async def run():
+        return await asyncio.gather(*(batcher.submit(row) for row in rows), return_exceptions=True)
+    return asyncio.run(run())
+
+
+class TestMicroBatcher:
+    def test_window_coalesces_into_one_call(self, executor):
+        service = StubService()
+        results = submit_all(make_batcher(executor, service), [{"x": i} for i in range(5)])
+        assert service.calls == [5]
+        # Each caller gets its own row's result
+        assert results == [{"score": i * 2} for i in range(5)]
+
+    def test_max_size_flushes_early(self, executor):
+        service = StubService()
+        batcher = make_batcher(executor, service, max_batch_size=2, max_wait_ms=10_000)
+        results = submit_all(batcher, [{"x": i} for i in range(4)])
+        assert service.calls == [2, 2]
+        assert results == [{"score": i * 2} for i in range(4)]
+
+    def test_bad_row_fails_only_its_caller(self, executor):
+        service = StubService()
+        results = submit_all(make_batcher(executor, service), [{"x": 1}, {}, {"x": 3}])
+        assert service.calls == [3]
+        assert results[0] == {"score": 2} and results[2] == {"score": 6}
+        assert isinstance(results[1], ValueError)
+
+    def test_handler_error_fails_whole_batch(self, executor):
+        def broken(rows):
+            raise RuntimeError("model down")
+
+        batcher = MicroBatcher(broken, executor, max_batch_size=8, max_wait_ms=20)
+        results = submit_all(batcher, [{"x": 1}, {"x": 2}])
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    @pytest.mark.parametrize("window", [0, -1])
+    def test_window_disables_batching(self, executor, window):
+        service = StubService()
+        batcher = make_batcher(executor, service, max_wait_ms=window)
+        assert not batcher.enabled
+        results = submit_all(batcher, [{"x": i} for i in range(3)])
+        assert service.calls == [1, 1, 1]
+        assert results == [{"score": i * 2} for i in range(3)]
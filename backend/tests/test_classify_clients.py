@@ -0,0 +1,114 @@
+"""
+test_classify_clients.py
+------------------------
+Scoring stored clients by ID: unknown IDs, missing and repeated IDs in the
+bulk variant, the per-request ID limit, and parity with ``/single`` and
+``/batch``.
+Run with: pytest tests/test_classify_clients.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+MODEL_DIR = BACKEND_DIR.parent / "front-end" / "src"
+
+
+@pytest.fixture(scope="module")
+def model():
+    if not (MODEL_DIR / "model.ubj").exists():
+        pytest.skip("trained model not available")
+    # Loaded directly rather than through ``model_loader``, whose readiness
+    # state other tests check; micro-batched calls fall back to this service.
+    from app.ml_pipeline import classification_service
+    if classification_service.version is None:
+        classification_service.load()
+    return classification_service
+
+
+@pytest.fixture
+def client(model, api, add_clients, raw_client):
+    """API client with three stored clients of different incomes (ids 1-3)."""
+    from app import auth
+    from app.main import app
+    from app.ml_service import get_classification_service
+
+    app.dependency_overrides[auth.get_current_user] = lambda: None
+    app.dependency_overrides[get_classification_service] = lambda: model
+    records = [raw_client(i, Estimated_Annual_Income=income)
+               for i, income in enumerate((20000, 52000, 150000), start=1)]
+    ids, _ = add_clients(records)
+    assert ids == [1, 2, 3]
+    return api, records
+
+
+def single(api, record):
+    body = {k: v for k, v in record.items() if k != "Purchased_Coverage_Bundle"}
+    response = api.post("/api/classify/single", json=body)
+    assert response.status_code == 200
+    return response.json()
+
+
+class TestClassifyClient:
+    def test_matches_single(self, client):
+        api, records = client
+        response = api.get("/api/classify/clients/2")
+        assert response.status_code == 200
+        body = response.json()
+        assert body.pop("client_id") == 2
+        assert body == {**single(api, records[1]), "user_id": "T2"}
+
+    def test_unknown_id(self, client):
+        api, _ = client
+        assert api.get("/api/classify/clients/999").status_code == 404
+
+
+class TestClassifyClients:
+    def test_order_missing_and_duplicate_ids(self, client):
+        api, _ = client
+        response = api.get("/api/classify/clients", params={"ids": "3,999,1,3"})
+        assert response.status_code == 200
+        body = response.json()
+        assert [p["client_id"] for p in body["predictions"]] == [3, 1]
+        assert body["missing_ids"] == [999]
+
+    def test_matches_batch_upload(self, client):
+        # Same rows, same vectorized path: identical to uploading them as a CSV.
+        api, records = client
+        header = [k for k in records[0] if k != "Purchased_Coverage_Bundle"]
+        csv = ",".join(header) + "\n" + "".join(
+            ",".join("" if r[k] is None else str(r[k]) for k in header) + "\n" for r in records
+        )
+        uploaded = api.post(
+            "/api/classify/batch", files={"file": ("c.csv", csv.encode(), "text/csv")}
+        ).json()["predictions"]
+        stored = api.get("/api/classify/clients", params={"ids": "1,2,3"}).json()["predictions"]
+        assert [p.pop("client_id") for p in stored] == [1, 2, 3]
+        assert stored == uploaded
+
+    def test_columnar_layout(self, client):
+        api, _ = client
+        body = api.get("/api/classify/clients", params={"ids": "2,1", "layout": "columnar"}).json()
+        assert body["predictions"]["client_id"] == [2, 1]
+
+    def test_all_missing(self, client):
+        api, _ = client
+        assert api.get("/api/classify/clients", params={"ids": "998,999"}).status_code == 404
+
+    @pytest.mark.parametrize("ids", ["", " , ", "1,x", "1.5"])
+    def test_bad_ids(self, client, ids):
+        api, _ = client
+        assert api.get("/api/classify/clients", params={"ids": ids}).status_code == 422
+
+    def test_max_ids(self, client, monkeypatch):
+        from app.config import settings
+
+        api, _ = client
+        monkeypatch.setattr(settings, "CLASSIFY_CLIENTS_MAX_IDS", 2)
+        assert api.get("/api/classify/clients", params={"ids": "1,2,3"}).status_code == 422
+        # Duplicates are collapsed before the limit is applied.
+        assert api.get("/api/classify/clients", params={"ids": "1,2,1,2"}).status_code == 200
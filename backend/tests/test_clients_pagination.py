@@ -0,0 +1,178 @@
+"""
+test_clients_pagination.py
+--------------------------
+Keyset cursors of the clients listing: the cursor codec, walking every
+page under each filter, and the listing indexes on an existing database.
+Run with: pytest tests/test_clients_pagination.py -v
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import inspect, text
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import create_missing_indexes  # noqa: E402
+from app.models import Client  # noqa: E402
+from app.routers.clients import _decode_cursor, _encode_cursor  # noqa: E402
+
+REGIONS = ["R1", "R2", "R3"]
+BUNDLES = ["Basic_Health", "Home_Premium"]
+EMPLOYMENT = ["Employed", "Self_Employed", "Retired", "Student"]
+
+
+class TestCursor:
+    @pytest.mark.parametrize("last_id", [0, 1, 99, 123_456_789])
+    def test_round_trip(self, last_id):
+        cursor = _encode_cursor(last_id)
+        assert "=" not in cursor
+        assert _decode_cursor(cursor) == last_id
+
+    @pytest.mark.parametrize("cursor", ["@@@", "", "YWJj"])
+    def test_invalid(self, cursor):
+        with pytest.raises(HTTPException) as exc:
+            _decode_cursor(cursor)
+        assert exc.value.status_code == 422
+
+
+@pytest.fixture
+def listing(api, add_clients, raw_client):
+    """23 stored clients cycling through regions, bundles and employment."""
+    from app import auth
+    from app.main import app
+
+    app.dependency_overrides[auth.get_current_user] = lambda: None
+    records = [
+        raw_client(i, Region_Code=REGIONS[i % 3], Purchased_Coverage_Bundle=BUNDLES[i % 2],
+                   Employment_Status=EMPLOYMENT[i % 4])
+        for i in range(23)
+    ]
+    ids, _ = add_clients(records)
+    return api, {client_id: record for client_id, record in zip(ids, records)}
+
+
+def walk(api, limit, **params):
+    """Follow X-Next-Cursor from the first page; returns the pages' ids and headers."""
+    pages = []
+    query = {"limit": limit, "include_count": True, **params}
+    while True:
+        response = api.get("/api/clients", params=query)
+        assert response.status_code == 200
+        pages.append(([c["id"] for c in response.json()], response.headers))
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+        query["cursor"] = cursor
+
+
+FILTERS = [
+    {},
+    {"region": "R2"},
+    {"bundle": "Home_Premium"},
+    {"employment": "Retired"},
+    {"region": "R1", "bundle": "Basic_Health", "employment": "Employed"},
+    {"region": "nowhere"},
+]
+FILTER_COLUMNS = {
+    "region": "Region_Code", "bundle": "Purchased_Coverage_Bundle",
+    "employment": "Employment_Status",
+}
+
+
+class TestCursorWalk:
+    @pytest.mark.parametrize("params", FILTERS)
+    @pytest.mark.parametrize("limit", [1, 4, 23, 100])
+    def test_every_client_once_in_id_order(self, listing, params, limit):
+        api, clients = listing
+        expected = [
+            client_id for client_id, record in sorted(clients.items())
+            if all(record[FILTER_COLUMNS[k]] == v for k, v in params.items())
+        ]
+        pages = walk(api, limit, **params)
+        ids = [i for page, _ in pages for i in page]
+        assert ids == expected
+
+        for page, headers in pages:
+            assert headers["X-Total-Count"] == str(len(expected))
+            assert len(page) <= limit
+        # A cursor is only handed out with a full page; the last page has none.
+        assert all(len(page) == limit for page, _ in pages[:-1])
+        assert "X-Next-Cursor" not in pages[-1][1]
+
+    def test_with_predictions(self, listing):
+        api, clients = listing
+        pages = walk(api, 5, include_prediction=True)
+        assert [i for page, _ in pages for i in page] == sorted(clients)
+
+    def test_cursor_matches_skip(self, listing):
+        api, _ = listing
+        first = api.get("/api/clients", params={"limit": 5})
+        by_cursor = api.get(
+            "/api/clients", params={"limit": 5, "cursor": first.headers["X-Next-Cursor"]}
+        )
+        by_skip = api.get("/api/clients", params={"limit": 5, "skip": 5})
+        assert by_cursor.json() == by_skip.json()
+
+    def test_count_header_only_on_request(self, listing):
+        api, _ = listing
+        assert "X-Total-Count" not in api.get("/api/clients", params={"limit": 5}).headers
+
+    def test_count_endpoint_filters(self, listing):
+        api, clients = listing
+        expected = sum(r["Region_Code"] == "R3" for r in clients.values())
+        assert api.get("/api/clients/count", params={"region": "R3"}).json() == {"count": expected}
+
+    def test_skip_and_cursor_rejected(self, listing):
+        api, _ = listing
+        cursor = _encode_cursor(3)
+        response = api.get("/api/clients", params={"skip": 5, "cursor": cursor})
+        assert response.status_code == 422
+
+    def test_invalid_cursor_rejected(self, listing):
+        api, _ = listing
+        assert api.get("/api/clients", params={"cursor": "@@@"}).status_code == 422
+
+
+class TestListingIndexes:
+    INDEXES = {index.name for index in Client.__table__.indexes if index.name.startswith("ix_clients_")}
+
+    async def index_names(self, engine) -> set[str]:
+        async with engine.connect() as conn:
+            return await conn.run_sync(
+                lambda sync: {i["name"] for i in inspect(sync).get_indexes("clients")}
+            )
+
+    def test_created_on_existing_database(self, db):
+        engine = db.kw["bind"]
+
+        async def run():
+            async with engine.begin() as conn:
+                # A database created before the indexes were declared
+                for name in self.INDEXES:
+                    await conn.execute(text(f"DROP INDEX {name}"))
+            before = await self.index_names(engine)
+            for _ in range(2):  # idempotent
+                async with engine.begin() as conn:
+                    await conn.run_sync(create_missing_indexes)
+            return before, await self.index_names(engine)
+
+        before, after = asyncio.run(run())
+        assert not before & self.INDEXES
+        assert self.INDEXES <= after
+
+    def test_filtered_page_uses_index(self, db):
+        async def run():
+            async with db.kw["bind"].connect() as conn:
+                rows = await conn.execute(text(
+                    "EXPLAIN QUERY PLAN SELECT * FROM clients "
+                    "WHERE region_code = 'R1' AND id > 10 ORDER BY id LIMIT 5"
+                ))
+                return " ".join(str(row[-1]) for row in rows)
+
+        plan = asyncio.run(run())
+        assert "ix_clients_region_id" in plan
+        assert "TEMP B-TREE" not in plan
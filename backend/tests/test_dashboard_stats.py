@@ -0,0 +1,301 @@
+"""
+test_dashboard_stats.py
+-----------------------
+Additive dashboard aggregates used by the materialized summary, the
+per-dimension grouped query against plain per-distribution queries, and the
+summary's staleness handling. The PostgreSQL parity test runs against
+TEST_POSTGRES_URL when it is set and asyncpg is installed.
+Run with: pytest tests/test_dashboard_stats.py -v
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+from dataclasses import asdict
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import func, insert, select
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app import dashboard_stats as module  # noqa: E402
+from app.dashboard_stats import (  # noqa: E402
+    DIMENSIONS, Aggregates, DashboardStatsCache, aggregate_records, compute_aggregates,
+)
+from app.models import Client, DashboardSummary  # noqa: E402
+
+
+def record(bundle="Basic_Health", region="R1", cancelled=0, income=50_000.0):
+    return {
+        "purchased_coverage_bundle": bundle,
+        "region_code": region,
+        "employment_status": "Employed",
+        "broker_agency_type": "Independent",
+        "policy_start_month": "March",
+        "acquisition_channel": "Online",
+        "deductible_tier": "Tier_1",
+        "policy_cancelled": cancelled,
+        "estimated_annual_income": income,
+    }
+
+
+RECORDS = [
+    record(),
+    record(bundle="Home_Premium", cancelled=1, income=150_000.0),
+    record(region=None, income=None),
+    record(bundle=None, region="", cancelled=1),
+]
+
+
+class TestAggregates:
+    def test_stats(self):
+        stats = aggregate_records(RECORDS).to_stats()
+        assert stats["total_clients"] == 4
+        assert stats["total_cancelled"] == 2
+        assert stats["total_active"] == 2
+        assert stats["cancellation_rate"] == 50.0
+        # Missing income is excluded from the average, like SQL AVG
+        assert stats["avg_income"] == round(250_000 / 3, 2)
+        assert stats["bundle_distribution"] == {"Basic_Health": 2, "Home_Premium": 1, "Unknown": 1}
+        # NULL and empty values share the Unknown bucket
+        assert stats["region_distribution"] == {"R1": 2, "Unknown": 2}
+
+    def test_merge_matches_combined(self):
+        merged = aggregate_records(RECORDS[:2])
+        merged.merge(aggregate_records(RECORDS[2:]))
+        assert asdict(merged) == asdict(aggregate_records(RECORDS))
+
+    def test_round_trip(self):
+        agg = aggregate_records(RECORDS)
+        assert Aggregates.from_dict(asdict(agg)).to_stats() == agg.to_stats()
+
+    def test_empty(self):
+        stats = Aggregates().to_stats()
+        assert stats["total_clients"] == 0
+        assert stats["cancellation_rate"] == 0 and stats["avg_income"] == 0
+
+
+# ── Grouped query ─────────────────────────────────────────────────────────────
+
+def client_records(n=60, seed=0):
+    """Client rows with NULL, empty and repeated dimension values."""
+    rng = random.Random(seed)
+    pick = lambda *values: rng.choice(values)  # noqa: E731
+    return [
+        {
+            "user_id": f"U{i}",
+            "purchased_coverage_bundle": pick("Basic_Health", "Home_Premium", None),
+            "region_code": pick("R1", "R2", "R3", "", None),
+            "employment_status": pick("Employed", "Self_Employed"),
+            "broker_agency_type": pick("Independent", "Urban_Boutique", None),
+            "policy_start_month": pick("January", "March", "June"),
+            "acquisition_channel": pick("Online", "Agent"),
+            "deductible_tier": pick("Tier_1", "Tier_2", ""),
+            "policy_cancelled": pick(0, 1),
+            "estimated_annual_income": pick(25_000.0, 60_000.0, 150_000.0, None),
+        }
+        for i in range(n)
+    ]
+
+
+async def reference_stats(db) -> dict:
+    """Dashboard stats from one query per total and per distribution."""
+    total = (await db.execute(select(func.count(Client.id)))).scalar()
+    cancelled = (await db.execute(
+        select(func.count(Client.id)).where(Client.policy_cancelled == 1)
+    )).scalar()
+    avg_income = (await db.execute(select(func.avg(Client.estimated_annual_income)))).scalar()
+    stats = {
+        "total_clients": total,
+        "total_cancelled": cancelled,
+        "total_active": total - cancelled,
+        "cancellation_rate": round(cancelled / total * 100, 2) if total else 0,
+        "avg_income": round(avg_income or 0, 2),
+    }
+    for name, column in DIMENSIONS.items():
+        col = getattr(Client, column)
+        dist = {}
+        for value, n in (await db.execute(select(col, func.count(Client.id)).group_by(col))).all():
+            dist[value or "Unknown"] = dist.get(value or "Unknown", 0) + n
+        stats[name] = dist
+    return stats
+
+
+async def compare(session_factory, records):
+    async with session_factory() as db:
+        if records:
+            await db.execute(insert(Client), records)
+            await db.commit()
+        return (await compute_aggregates(db)).to_stats(), await reference_stats(db)
+
+
+class TestComputeAggregates:
+    def test_matches_per_dimension_queries(self, db):
+        actual, expected = asyncio.run(compare(db, client_records()))
+        assert actual == expected
+        assert actual["total_clients"] == 60
+
+    def test_empty_table(self, db):
+        actual, expected = asyncio.run(compare(db, []))
+        assert actual == expected == Aggregates().to_stats()
+
+    def test_postgres_grouping_sets_rows(self):
+        """Rows shaped like PostgreSQL GROUPING SETS output decode per dimension."""
+        records = client_records()
+        columns = list(DIMENSIONS.values())
+        n = len(columns)
+        rows = []
+        for i, column in enumerate(columns):
+            for value in {r[column] for r in records}:
+                group = [r for r in records if r[column] == value]
+                incomes = [r["estimated_annual_income"] for r in group
+                           if r["estimated_annual_income"] is not None]
+                rows.append((
+                    ((1 << n) - 1) ^ (1 << (n - 1 - i)),
+                    *(value if j == i else None for j in range(n)),
+                    len(group), sum(r["policy_cancelled"] for r in group),
+                    sum(incomes) if incomes else None, len(incomes),
+                ))
+        random.Random(1).shuffle(rows)
+
+        class PostgresSession:
+            async def connection(self):
+                return SimpleNamespace(dialect=SimpleNamespace(name="postgresql"))
+
+            async def execute(self, query):
+                assert "GROUPING SETS" in str(query)
+                return SimpleNamespace(all=lambda: rows)
+
+        actual = asyncio.run(compute_aggregates(PostgresSession()))
+        expected = aggregate_records(records)
+        assert actual.to_stats() == expected.to_stats()
+
+    @pytest.mark.skipif(not os.environ.get("TEST_POSTGRES_URL"), reason="TEST_POSTGRES_URL not set")
+    def test_postgres(self):
+        pytest.importorskip("asyncpg")
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        from app.database import Base, make_engine
+
+        async def run():
+            engine = make_engine(os.environ["TEST_POSTGRES_URL"])
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.drop_all, tables=[Client.__table__])
+                await conn.run_sync(Base.metadata.create_all, tables=[Client.__table__])
+            try:
+                return await compare(async_sessionmaker(engine), client_records())
+            finally:
+                async with engine.begin() as conn:
+                    await conn.run_sync(Base.metadata.drop_all, tables=[Client.__table__])
+                await engine.dispose()
+
+        actual, expected = asyncio.run(run())
+        assert actual == expected
+
+
+# ── Summary staleness ─────────────────────────────────────────────────────────
+
+class TestDashboardStatsCache:
+    @pytest.fixture
+    def cache(self, db, monkeypatch):
+        monkeypatch.setattr(module, "async_session", db)
+        monkeypatch.setattr(module, "read_session", db)
+        return DashboardStatsCache(max_age=60)
+
+    async def add(self, db, records):
+        async with db() as session:
+            await session.execute(insert(Client), records)
+            await session.commit()
+
+    async def summary(self, db):
+        async with db() as session:
+            return await session.get(DashboardSummary, module.SUMMARY_ID)
+
+    def test_first_read_builds_and_stores_summary(self, cache, db):
+        async def run():
+            await self.add(db, client_records(10))
+            async with db() as session:
+                stats = await cache.get(session)
+            return stats, await self.summary(db)
+
+        stats, summary = asyncio.run(run())
+        assert stats["total_clients"] == 10
+        assert summary.aggregates["clients"] == 10
+
+    def test_fresh_copy_served_without_reading(self, cache, db):
+        async def run():
+            async with db() as session:
+                first = await cache.get(session)
+                await self.add(db, client_records(5))
+                return first, await cache.get(session)
+
+        first, second = asyncio.run(run())
+        assert second is first and second["total_clients"] == 0
+
+    def test_stale_summary_served_while_refreshing(self, cache, db):
+        async def run():
+            async with db() as session:
+                await cache.get(session)
+                await self.add(db, client_records(7))
+                # Age both this worker's copy and the stored summary.
+                cache.invalidate()
+                summary = await session.get(DashboardSummary, module.SUMMARY_ID)
+                summary.updated_at = time.time() - 3600
+                await session.commit()
+
+                stale = await cache.get(session)
+                task = cache._refresh_task
+                await task
+                return stale, task, await cache.get(session), await self.summary(db)
+
+        stale, task, fresh, summary = asyncio.run(run())
+        assert stale["total_clients"] == 0  # answered before the rescan
+        assert task is not None and task.done()
+        assert fresh["total_clients"] == 7
+        assert summary.aggregates["clients"] == 7
+        assert time.time() - summary.updated_at < 60
+
+    def test_one_background_refresh_at_a_time(self, cache, db):
+        async def run():
+            async with db() as session:
+                await cache.get(session)
+                summary = await session.get(DashboardSummary, module.SUMMARY_ID)
+                summary.updated_at = time.time() - 3600
+                await session.commit()
+
+                release, calls = asyncio.Event(), []
+
+                async def slow_rebuild(read_db):
+                    calls.append(1)
+                    await release.wait()
+                    return Aggregates()
+
+                cache._rebuild = slow_rebuild
+                for _ in range(3):
+                    cache.invalidate()
+                    await cache.get(session)
+                    await asyncio.sleep(0)
+                release.set()
+                await cache._refresh_task
+                return len(calls)
+
+        assert asyncio.run(run()) == 1
+
+    def test_record_inserts_updates_summary_without_rescan(self, cache, db):
+        records = client_records(4)
+
+        async def run():
+            async with db() as session:
+                await cache.get(session)
+                await session.execute(insert(Client), records)
+                await cache.record_inserts(session, records)
+                await session.commit()
+                return await cache.get(session)
+
+        stats = asyncio.run(run())
+        assert stats["total_clients"] == 4
+        assert stats == aggregate_records(records).to_stats()
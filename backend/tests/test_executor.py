@@ -0,0 +1,75 @@
+"""
+test_executor.py
+----------------
+Queue-depth limits of the bounded inference executor.
+Run with: pytest tests/test_executor.py -v
+"""
+
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.executor import ExecutorSaturated, InferenceExecutor  # noqa: E402
+
+
+@pytest.fixture
+def executor():
+    ex = InferenceExecutor(max_workers=2, max_queue=1, name="test")
+    yield ex
+    ex.shutdown()
+
+
+def _fill(executor, release: threading.Event):
+    """Tasks occupying every worker and queue slot until ``release`` is set."""
+    return [asyncio.ensure_future(executor.run(release.wait)) for _ in range(executor.capacity)]
+
+
+class TestCapacity:
+    def test_saturated_at_capacity(self, executor):
+        async def run():
+            release = threading.Event()
+            tasks = _fill(executor, release)
+            await asyncio.sleep(0)
+            assert executor.in_flight == executor.capacity == 3
+            with pytest.raises(ExecutorSaturated):
+                await executor.run(lambda: None)
+            release.set()
+            await asyncio.gather(*tasks)
+            return executor.in_flight
+
+        assert asyncio.run(run()) == 0
+
+    def test_in_flight_released_after_exception(self, executor):
+        def boom():
+            raise RuntimeError("boom")
+
+        async def run():
+            results = await asyncio.gather(
+                *(executor.run(boom) for _ in range(executor.capacity)), return_exceptions=True
+            )
+            assert all(isinstance(r, RuntimeError) for r in results)
+            # Slots are free again
+            assert await executor.run(lambda: 42) == 42
+            return executor.in_flight
+
+        assert asyncio.run(run()) == 0
+
+    def test_run_admitted_bypasses_limit(self, executor):
+        async def run():
+            release = threading.Event()
+            tasks = _fill(executor, release)
+            await asyncio.sleep(0)
+            admitted = asyncio.ensure_future(executor.run_admitted(lambda: "ok"))
+            await asyncio.sleep(0)
+            assert executor.in_flight == executor.capacity + 1
+            release.set()
+            await asyncio.gather(*tasks)
+            assert await admitted == "ok"
+            return executor.in_flight
+
+        assert asyncio.run(run()) == 0
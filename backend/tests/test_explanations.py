@@ -0,0 +1,122 @@
+"""
+test_explanations.py
+--------------------
+Cached batch SHAP explanations: agreement with the booster, cache hits and
+misses, cache keys, LRU bounds and ``top_features`` ordering.
+Run with: pytest tests/test_explanations.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+import xgboost as xgb
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.explanations import ShapExplainer, top_features  # noqa: E402
+
+FEATURES = ["a", "b", "c", "d"]
+
+
+@pytest.fixture(scope="module")
+def booster():
+    rng = np.random.default_rng(0)
+    X = rng.random((300, len(FEATURES))).astype(np.float32)
+    y = (X[:, 0] * 3).astype(int)
+    dtrain = xgb.DMatrix(X, label=y, feature_names=FEATURES)
+    params = {"objective": "multi:softprob", "num_class": 3, "max_depth": 2}
+    return xgb.train(params, dtrain, num_boost_round=5)
+
+
+@pytest.fixture
+def explainer(booster):
+    return ShapExplainer(booster, FEATURES, n_classes=3, cache_size=100)
+
+
+def rows(n, seed=1):
+    return np.random.default_rng(seed).random((n, len(FEATURES))).astype(np.float32)
+
+
+class TestExplain:
+    def test_matches_booster_contributions(self, booster, explainer):
+        X = rows(5)
+        classes = np.array([0, 1, 2, 1, 0])
+        values, base = explainer.explain(X, classes)
+
+        full = booster.predict(xgb.DMatrix(X, feature_names=FEATURES), pred_contribs=True)
+        full = full.reshape(5, 3, len(FEATURES) + 1)[np.arange(5), classes]
+        assert values.dtype == np.float32 and values.shape == (5, len(FEATURES))
+        np.testing.assert_allclose(values, full[:, :-1], rtol=1e-5)
+        np.testing.assert_allclose(base, full[:, -1], rtol=1e-5)
+
+    def test_second_call_hits_cache(self, explainer):
+        X, classes = rows(4), np.array([0, 1, 2, 0])
+        first = explainer.explain(X, classes)
+        assert explainer.stats()["misses"] == 4 and explainer.hits == 0
+
+        second = explainer.explain(X, classes)
+        assert explainer.hits == 4 and explainer.misses == 4
+        np.testing.assert_array_equal(first[0], second[0])
+        np.testing.assert_array_equal(first[1], second[1])
+
+    def test_repeated_rows_in_a_batch_computed_once(self, explainer):
+        X = np.repeat(rows(1), 3, axis=0)
+        values, _ = explainer.explain(X, np.zeros(3, dtype=int))
+        assert explainer.misses == 1
+        np.testing.assert_array_equal(values[0], values[2])
+
+    def test_key_depends_on_row_bytes_and_class(self):
+        row = rows(1)[0]
+        other = row.copy()
+        other[2] = np.nextafter(other[2], np.float32(2))
+        key = ShapExplainer._key(row, 0)
+        assert key == ShapExplainer._key(row.copy(), 0)
+        assert key != ShapExplainer._key(row, 1)
+        assert key != ShapExplainer._key(other, 0)
+
+    def test_same_row_other_class_is_a_miss(self, explainer):
+        X = rows(1)
+        a, _ = explainer.explain(X, np.array([0]))
+        b, _ = explainer.explain(X, np.array([2]))
+        assert explainer.misses == 2 and explainer.hits == 0
+        assert not np.array_equal(a, b)
+
+    def test_lru_bound_and_eviction_order(self, booster):
+        explainer = ShapExplainer(booster, FEATURES, n_classes=3, cache_size=2)
+        X = rows(3)
+        zero = np.array([0])
+        explainer.explain(X[0:1], zero)
+        explainer.explain(X[1:2], zero)
+        explainer.explain(X[0:1], zero)      # refresh row 0
+        explainer.explain(X[2:3], zero)      # evicts row 1, the least recent
+        assert explainer.stats()["size"] == 2
+
+        hits = explainer.hits
+        explainer.explain(X[0:1], zero)
+        assert explainer.hits == hits + 1
+        explainer.explain(X[1:2], zero)
+        assert explainer.hits == hits + 1
+
+    def test_clear(self, explainer):
+        explainer.explain(rows(2), np.array([0, 1]))
+        explainer.clear()
+        assert explainer.stats()["size"] == 0
+
+
+class TestTopFeatures:
+    def test_orders_by_magnitude(self):
+        values = np.array([[0.1, -0.5, 0.3, 0.0], [2.0, 1.0, -3.0, 0.5]])
+        idx, top = top_features(values, 2)
+        np.testing.assert_array_equal(idx, [[1, 2], [2, 0]])
+        np.testing.assert_array_equal(top, [[-0.5, 0.3], [-3.0, 2.0]])
+
+    def test_ties_keep_feature_order(self):
+        idx, _ = top_features(np.array([[1.0, -1.0, 1.0]]), 3)
+        np.testing.assert_array_equal(idx, [[0, 1, 2]])
+
+    def test_k_is_clamped(self):
+        values = np.array([[1.0, 2.0]])
+        assert top_features(values, 10)[0].shape == (1, 2)
+        assert top_features(values, 0)[0].shape == (1, 1)
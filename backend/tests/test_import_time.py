@@ -0,0 +1,72 @@
+"""
+test_import_time.py
+-------------------
+Cold-start guard: importing the API must not pull in the ML stack.
+Run with: pytest tests/test_import_time.py -v
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+# Generous for slow CI machines; the ML stack alone adds ~2 s on top.
+IMPORT_BUDGET_SECONDS = 2.0
+
+HEAVY_MODULES = ["app.ml_pipeline", "xgboost", "sklearn", "scipy", "pandas", "shap"]
+
+PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - t0
+print(json.dumps({
+    "seconds": elapsed,
+    "loaded": [m for m in %r if m in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def _probe() -> dict:
+    """Import ``app.main`` in a fresh interpreter (best of three runs)."""
+    runs = []
+    for _ in range(3):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        )
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return min(runs, key=lambda r: r["seconds"])
+
+
+@pytest.fixture(scope="module")
+def probe():
+    return _probe()
+
+
+class TestColdStart:
+    def test_ml_stack_not_imported(self, probe):
+        assert probe["loaded"] == []
+
+    def test_import_within_budget(self, probe):
+        assert probe["seconds"] < IMPORT_BUDGET_SECONDS, (
+            f"import app.main took {probe['seconds']:.2f}s "
+            f"(budget {IMPORT_BUDGET_SECONDS}s)"
+        )
+
+
+class TestReadiness:
+    def test_not_ready_before_load(self):
+        from fastapi.testclient import TestClient
+
+        from app.main import app
+
+        # No lifespan (no ``with``), so no warm-up has been started.
+        response = TestClient(app).get("/ready")
+        assert response.status_code == 503
+        assert response.json()["state"] == "not_loaded"
@@ -0,0 +1,271 @@
+"""
+test_jobs.py
+------------
+Background batch jobs: Parquet results, row counts, failure on an empty
+upload, the model version and owner recorded per job, jobs left unfinished
+by a shutdown or a stopped process, the derived progress/ETA fields, and
+job visibility through the API.
+Run with: pytest tests/test_jobs.py -v
+"""
+
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from dataclasses import asdict
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pyarrow.parquet as pq
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.jobs import (  # noqa: E402
+    INPUT_NAME, RESULT_NAME, STATUS_NAME, Job, JobManager, _count_rows,
+)
+from app.models import UserRole  # noqa: E402
+
+CLASSES = ["A", "B", "C"]
+
+
+class StubService:
+    """Predicts class ``x % 3`` at 80%."""
+
+    class_names = CLASSES
+
+    def __init__(self, version="stub-v1"):
+        self.version = version
+        self.frames = 0
+
+    def score_frame(self, df, row_offset=0):
+        self.frames += 1
+        x = df["x"].to_numpy()
+        proba = np.full((len(x), 3), 0.1)
+        proba[np.arange(len(x)), x % 3] = 0.8
+        return df["User_ID"].tolist(), proba
+
+
+def csv_bytes(xs):
+    return ("User_ID,x\n" + "".join(f"u{i},{x}\n" for i, x in enumerate(xs))).encode()
+
+
+def wait(manager, job, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not job.done:
+        assert time.monotonic() < deadline, "job did not finish"
+        time.sleep(0.01)
+    manager.shutdown()
+    return job
+
+
+class TestJobManager:
+    def test_completed_job_writes_parquet(self, tmp_path):
+        service = StubService()
+        manager = JobManager(tmp_path, chunk_rows=4, service=service)
+        xs = list(range(10))
+        job = wait(manager, manager.submit_csv(io.BytesIO(csv_bytes(xs)), "in.csv"))
+
+        assert job.status == "completed", job.error
+        assert job.rows_processed == job.total_rows == 10
+        assert service.frames == 3  # chunks of 4, 4, 2
+
+        table = pq.read_table(manager.result_path(job.id)).to_pydict()
+        assert table["row_index"] == list(range(10))
+        assert table["user_id"] == [f"u{i}" for i in xs]
+        assert table["predicted_bundle"] == [CLASSES[x % 3] for x in xs]
+        assert np.allclose(table["confidence"], 80.0)
+        assert np.allclose(table["prob_A"], [80.0 if x % 3 == 0 else 10.0 for x in xs])
+        assert not (manager.job_dir(job.id) / "input.csv").exists()
+
+    def test_total_rows_counts_multiline_fields(self, tmp_path):
+        data = b'User_ID,x,note\nu0,1,"two\nlines"\n\nu1,2,plain\nu2,3,"a\n\nb"'
+        path = tmp_path / "multi.csv"
+        path.write_bytes(data)
+        assert _count_rows(path, chunk_rows=2) == 3  # the total reported while running
+
+        manager = JobManager(tmp_path / "jobs", chunk_rows=2, service=StubService())
+        job = wait(manager, manager.submit_csv(io.BytesIO(data), "in.csv"))
+        assert job.status == "completed", job.error
+        assert job.total_rows == job.rows_processed == 3
+
+    def test_status_file_records_model_version(self, tmp_path):
+        manager = JobManager(tmp_path, chunk_rows=4, service=StubService("v42"))
+        job = wait(manager, manager.submit_csv(io.BytesIO(csv_bytes([1, 2, 3])), "in.csv"))
+
+        status = json.loads((manager.job_dir(job.id) / STATUS_NAME).read_text())
+        assert status["model_version"] == "v42"
+        assert status["status"] == "completed"
+
+        # Another process sees the same job through status.json.
+        other = JobManager(tmp_path)
+        assert other.get(job.id).model_version == "v42"
+
+    def test_empty_csv_fails(self, tmp_path):
+        manager = JobManager(tmp_path, service=StubService())
+        job = wait(manager, manager.submit_csv(io.BytesIO(b"User_ID,x\n"), "empty.csv"))
+
+        assert job.status == "failed"
+        assert "no rows" in job.error
+        assert not manager.result_path(job.id).exists()
+        assert list(manager.job_dir(job.id).glob("*.part")) == []
+
+    def test_owner_recorded_and_filtered(self, tmp_path):
+        manager = JobManager(tmp_path, service=StubService())
+        mine = wait(manager, manager.submit_csv(io.BytesIO(csv_bytes([1])), "a.csv", owner_id=1))
+        theirs = wait(manager, manager.submit_csv(io.BytesIO(csv_bytes([2])), "b.csv", owner_id=2))
+
+        status = json.loads((manager.job_dir(mine.id) / STATUS_NAME).read_text())
+        assert status["owner_id"] == 1
+        other = JobManager(tmp_path)
+        assert [j.id for j in other.recent(owner_id=1)] == [mine.id]
+        assert {j.id for j in other.recent()} == {mine.id, theirs.id}
+
+    def test_unknown_job_ids(self, tmp_path):
+        manager = JobManager(tmp_path, service=StubService())
+        assert manager.get("0" * 32) is None
+        assert manager.get("../etc") is None
+
+
+class BlockingService(StubService):
+    """Scores only once ``release`` is set."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def score_frame(self, df, row_offset=0):
+        assert self.release.wait(10)
+        return super().score_frame(df, row_offset)
+
+
+class TestUnfinishedJobs:
+    def write_job(self, manager, worker, status="running"):
+        job = Job(id=uuid.uuid4().hex, filename="f.csv", status=status, worker=worker)
+        job_dir = manager.job_dir(job.id)
+        job_dir.mkdir(parents=True)
+        (job_dir / STATUS_NAME).write_text(json.dumps(asdict(job)))
+        (job_dir / INPUT_NAME).write_text("User_ID,x\n")
+        (job_dir / f"{RESULT_NAME}.part").write_bytes(b"")
+        return job.id
+
+    def status(self, manager, job_id):
+        return json.loads((manager.job_dir(job_id) / STATUS_NAME).read_text())
+
+    def test_recover_fails_jobs_of_stopped_processes(self, tmp_path):
+        manager = JobManager(tmp_path, service=StubService())
+        host = socket.gethostname()
+        dead = subprocess.Popen([sys.executable, "-c", "pass"])
+        dead.wait()
+        orphan = self.write_job(manager, f"{host}:{dead.pid}")
+        live = self.write_job(manager, f"{host}:{os.getppid()}")
+        remote = self.write_job(manager, f"{host}-other:{dead.pid}", status="queued")
+
+        assert manager.recover() == 1
+        status = self.status(manager, orphan)
+        assert status["status"] == "failed" and "Interrupted" in status["error"]
+        assert sorted(p.name for p in manager.job_dir(orphan).iterdir()) == [STATUS_NAME]
+        assert self.status(manager, live)["status"] == "running"
+        assert self.status(manager, remote)["status"] == "queued"
+        assert (manager.job_dir(live) / INPUT_NAME).exists()
+
+    def test_shutdown_fails_queued_jobs(self, tmp_path):
+        service = BlockingService()
+        manager = JobManager(tmp_path, max_workers=1, service=service)
+        running = manager.submit_csv(io.BytesIO(csv_bytes([1])), "a.csv")
+        queued = manager.submit_csv(io.BytesIO(csv_bytes([2])), "b.csv")
+        deadline = time.monotonic() + 10
+        while running.status != "running":
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+        manager.shutdown()
+        assert queued.status == "failed" and "shut down" in queued.error
+        assert self.status(manager, queued.id)["status"] == "failed"
+        assert not (manager.job_dir(queued.id) / INPUT_NAME).exists()
+
+        # The running job is not interrupted.
+        service.release.set()
+        wait(manager, running)
+        assert running.status == "completed"
+        assert service.frames == 1
+
+    def test_worker_not_in_status_payload(self):
+        assert "worker" not in Job(id="j", filename="f", worker="h:1").to_dict()
+
+
+class TestJobProgress:
+    def test_running_job_reports_throughput_and_eta(self):
+        now = time.time()
+        job = Job(id="j", filename="f", status="running", total_rows=1000,
+                  rows_processed=250, started_at=now - 5.0)
+        data = job.to_dict()
+        assert data["throughput_rows_per_sec"] == pytest.approx(50.0, rel=0.05)
+        assert data["eta_seconds"] == pytest.approx(15.0, rel=0.05)
+
+    def test_queued_job_has_no_estimate(self):
+        data = Job(id="j", filename="f").to_dict()
+        assert data["throughput_rows_per_sec"] is None
+        assert data["eta_seconds"] is None
+
+    def test_completed_job_eta_is_zero(self):
+        job = Job(id="j", filename="f", status="completed", total_rows=100,
+                  rows_processed=100, started_at=100.0, finished_at=102.0)
+        data = job.to_dict()
+        assert data["throughput_rows_per_sec"] == 50.0
+        assert data["eta_seconds"] == 0.0
+
+
+
+class TestJobEndpoints:
+    @pytest.fixture
+    def as_user(self, api, tmp_path, monkeypatch):
+        """Switch the calling user: ``as_user(id, role="broker")``."""
+        from app import auth
+        from app.main import app
+        from app.ml_service import get_classification_service
+        from app.routers import classification
+
+        manager = JobManager(tmp_path, service=StubService())
+        monkeypatch.setattr(classification, "job_manager", manager)
+        app.dependency_overrides[get_classification_service] = lambda: None
+
+        def switch(user_id, role="broker"):
+            user = SimpleNamespace(id=user_id, role=UserRole(role))
+            app.dependency_overrides[auth.get_current_user] = lambda: user
+            return api
+        yield switch
+        manager.shutdown()
+
+    def submit(self, api, name="in.csv"):
+        files = {"file": (name, csv_bytes([1, 2]), "text/csv")}
+        response = api.post("/api/classify/jobs", files=files)
+        assert response.status_code == 202
+        job_id = response.json()["id"]
+        deadline = time.monotonic() + 10
+        while api.get(f"/api/classify/jobs/{job_id}").json()["status"] != "completed":
+            assert time.monotonic() < deadline, "job did not finish"
+            time.sleep(0.01)
+        return job_id
+
+    def test_jobs_visible_to_owner_only(self, as_user):
+        mine = self.submit(as_user(1), "mine.csv")
+        theirs = self.submit(as_user(2), "theirs.csv")
+
+        api = as_user(1)
+        assert [j["id"] for j in api.get("/api/classify/jobs").json()] == [mine]
+        assert api.get(f"/api/classify/jobs/{mine}/result").status_code == 200
+        assert api.get(f"/api/classify/jobs/{theirs}").status_code == 404
+        assert api.get(f"/api/classify/jobs/{theirs}/result").status_code == 404
+
+    def test_admin_sees_every_job(self, as_user):
+        mine = self.submit(as_user(1))
+        api = as_user(9, role="admin")
+        assert [j["id"] for j in api.get("/api/classify/jobs").json()] == [mine]
+        assert api.get(f"/api/classify/jobs/{mine}/result").status_code == 200
@@ -0,0 +1,196 @@
+"""
+test_model_registry.py
+----------------------
+Loading, swapping, rolling back and shadow-scoring model versions, and
+loading without a fitted preprocessor.
+Run with: pytest tests/test_model_registry.py -v
+"""
+
+import shutil
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+MODEL_DIR = BACKEND_DIR.parent / "front-end" / "src"
+
+from app.model_registry import ModelRegistry  # noqa: E402
+
+ROW = {
+    "User_ID": "T1", "Estimated_Annual_Income": 52000, "Adult_Dependents": 2,
+    "Child_Dependents": 1.0, "Infant_Dependents": 0, "Previous_Policy_Duration_Months": 12,
+    "Days_Since_Quote": 10, "Grace_Period_Extensions": 0, "Custom_Riders_Requested": 1,
+    "Vehicles_on_Policy": 1, "Policy_Amendments_Count": 0, "Previous_Claims_Filed": 0,
+    "Years_Without_Claims": 3, "Underwriting_Processing_Days": 4, "Region_Code": "USA",
+    "Broker_Agency_Type": "Urban_Boutique", "Deductible_Tier": "Tier_2_Mid_Ded",
+    "Acquisition_Channel": "Direct_Website", "Payment_Schedule": "Monthly_EFT",
+    "Employment_Status": "Employed_FullTime", "Policy_Start_Month": "March",
+    "Broker_ID": 9.0, "Employer_ID": None, "Policy_Cancelled_Post_Purchase": 0,
+    "Policy_Start_Year": 2024, "Policy_Start_Week": 10, "Policy_Start_Day": 5,
+    "Existing_Policyholder": 0,
+}
+
+
+@pytest.fixture(scope="module")
+def model_paths(tmp_path_factory):
+    """Two distinct artifacts of the same model: the UBJSON booster and a joblib copy."""
+    if not (MODEL_DIR / "model.ubj").exists():
+        pytest.skip("exported model not available")
+    alt = tmp_path_factory.mktemp("alt") / "model.joblib"
+    shutil.copy(MODEL_DIR / "model.joblib", alt)
+    return str(MODEL_DIR / "model.ubj"), str(alt)
+
+
+@pytest.fixture
+def registry():
+    reg = ModelRegistry(max_versions=2)
+    yield reg
+    reg.shutdown()
+
+
+class TestVersions:
+    def test_activate_and_rollback(self, registry, model_paths):
+        first = registry.load_version(model_paths[0], activate=True)
+        second = registry.load_version(model_paths[1], warmup_rows=[ROW])
+        assert registry.active is first
+
+        registry.activate(second.version)
+        assert registry.active_service() is second.service
+        assert registry.status()["previous"] == first.version
+
+        assert registry.rollback() is first
+        assert registry.status()["previous"] == second.version
+
+    def test_same_artifact_is_one_version(self, registry, model_paths):
+        a = registry.load_version(model_paths[0])
+        b = registry.load_version(model_paths[0])
+        assert a is b and len(registry.status()["versions"]) == 1
+
+    def test_failed_load_leaves_registry_untouched(self, registry, model_paths, tmp_path):
+        registry.load_version(model_paths[0], activate=True)
+        with pytest.raises(FileNotFoundError):
+            registry.load_version(str(tmp_path / "missing.ubj"), activate=True)
+        status = registry.status()
+        assert len(status["versions"]) == 1
+        assert status["loads"][0]["state"] == "failed"
+
+    def test_rollback_without_previous(self, registry, model_paths):
+        registry.load_version(model_paths[0], activate=True)
+        with pytest.raises(ValueError):
+            registry.rollback()
+
+
+class TestPreprocessor:
+    def test_missing_preprocessor_is_reported(self, registry, model_paths, monkeypatch, caplog):
+        monkeypatch.delenv("PREPROCESSOR_PATH", raising=False)
+        with caplog.at_level("WARNING", logger="app.ml_pipeline"):
+            entry = registry.load_version(model_paths[1])
+        assert entry.service.preprocessor is None
+        assert "fit_preprocessor" in caplog.text
+
+    def test_required_preprocessor_fails_the_load(self, registry, model_paths, monkeypatch):
+        from app.config import settings
+
+        monkeypatch.delenv("PREPROCESSOR_PATH", raising=False)
+        monkeypatch.setattr(settings, "REQUIRE_PREPROCESSOR", True)
+        with pytest.raises(FileNotFoundError, match="fit_preprocessor"):
+            registry.load_version(model_paths[1])
+        assert registry.status()["versions"] == []
+
+
+class TestShadow:
+    def test_shadow_agreement(self, registry, model_paths):
+        active = registry.load_version(model_paths[0], activate=True)
+        candidate = registry.load_version(model_paths[1])
+        registry.set_shadow(candidate.version, 1.0)
+
+        rows = [ROW, dict(ROW, Estimated_Annual_Income=150000)]
+        results = active.service.predict_many(rows)
+        registry.record_rows(rows, results)
+
+        deadline = time.time() + 10
+        while registry.status()["shadow"]["batches"] == 0 and time.time() < deadline:
+            time.sleep(0.05)
+        shadow = registry.status()["shadow"]
+        assert shadow["compared"] == 2
+        assert shadow["agreement_rate"] == 1.0
+        assert registry.status()["warmup_samples"] == 2
+
+    def test_cannot_shadow_active(self, registry, model_paths):
+        active = registry.load_version(model_paths[0], activate=True)
+        with pytest.raises(ValueError):
+            registry.set_shadow(active.version, 0.5)
+
+
+class StubService:
+    feature_names = ["a", "b"]
+    class_names = ["x", "y"]
+
+    def __init__(self, version):
+        self.version = version
+        self.model_path = f"/models/{version}.ubj"
+
+
+class TestEviction:
+    def test_new_version_survives_when_others_are_pinned(self, registry):
+        registry.add(StubService("a"), activate=True)
+        registry.add(StubService("b"))
+        registry.set_shadow("b", 0.5)
+
+        entry = registry.add(StubService("c"))
+        assert registry.get("c") is entry
+        loaded = [v["version"] for v in registry.status()["versions"]]
+        assert loaded == ["a", "b", "c"]  # every version is pinned, so none goes
+
+    def test_evicts_oldest_unpinned_version(self, registry):
+        registry.add(StubService("a"), activate=True)
+        registry.add(StubService("b"))
+        registry.add(StubService("c"))
+        loaded = [v["version"] for v in registry.status()["versions"]]
+        assert loaded == ["a", "c"]
+        with pytest.raises(KeyError):
+            registry.get("b")
+
+
+class TestLoadEndpoint:
+    @pytest.fixture
+    def client(self, monkeypatch, tmp_path):
+        from fastapi.testclient import TestClient
+
+        from app import auth
+        from app.config import settings
+        from app.main import app
+        from app.ml_service import get_classification_service
+        from app.routers import models
+
+        loads = []
+        monkeypatch.setattr(settings, "MODEL_DIR", str(tmp_path / "models"))
+        monkeypatch.setattr(models, "_load_in_background", lambda req: loads.append(req.path))
+        app.dependency_overrides[auth.require_admin] = lambda: None
+        app.dependency_overrides[get_classification_service] = lambda: StubService("active")
+        yield TestClient(app), loads
+        app.dependency_overrides.clear()
+
+    @pytest.mark.parametrize("path", ["/etc/passwd", "../outside.joblib", "a/../../x.ubj"])
+    def test_paths_outside_model_dir_rejected(self, client, path):
+        api, loads = client
+        response = api.post("/api/models/load", json={"path": path})
+        assert response.status_code == 422
+        assert loads == []
+
+    def test_relative_path_resolved_in_model_dir(self, client, tmp_path):
+        api, loads = client
+        response = api.post("/api/models/load", json={"path": "v2/model.ubj"})
+        assert response.status_code == 202
+        expected = str((tmp_path / "models" / "v2" / "model.ubj").resolve())
+        assert loads == [expected] and response.json()["path"] == expected
+
+    def test_symlink_out_of_model_dir_rejected(self, client, tmp_path):
+        api, loads = client
+        (tmp_path / "models").mkdir()
+        (tmp_path / "models" / "link.joblib").symlink_to(tmp_path / "elsewhere.joblib")
+        assert api.post("/api/models/load", json={"path": "link.joblib"}).status_code == 422
@@ -0,0 +1,135 @@
+"""
+test_password_hashing.py
+------------------------
+bcrypt runs off the event loop: a login burst must not stall other requests,
+one client IP cannot occupy the whole hashing pool, and behind a trusted
+proxy that IP comes from X-Forwarded-For. The latency benchmark only runs
+with RUN_BENCHMARKS set.
+Run with: RUN_BENCHMARKS=1 pytest tests/test_password_hashing.py -v -s   (-s prints the benchmark)
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+
+BACKEND = Path(__file__).parent.parent
+sys.path.insert(0, str(BACKEND))
+
+from app import auth  # noqa: E402
+
+# Logins from distinct IPs run concurrently while GET / is requested every 10 ms;
+# reports ping latency percentiles and login throughput as JSON.
+_BENCHMARK = f"""
+import asyncio, json, sys, time
+sys.path.insert(0, {str(BACKEND)!r})
+import httpx
+from app.database import Base, engine
+from app.main import app
+
+LOGINS = 8
+USER = {{"email": "a@b.c", "password": "pw"}}
+
+def client(ip):
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app, client=(ip, 1234)),
+                             base_url="http://test")
+
+async def main():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with client("10.0.0.1") as c:
+        await c.post("/api/auth/register", json={{**USER, "name": "A"}})
+        pings, done = [], asyncio.Event()
+
+        async def ping():
+            while not done.is_set():
+                # Includes any delay in waking up, i.e. time the loop was blocked
+                t0 = time.perf_counter()
+                await asyncio.sleep(0.01)
+                await c.get("/")
+                pings.append(time.perf_counter() - t0 - 0.01)
+
+        async def login(i):
+            async with client(f"10.1.0.{{i}}") as lc:
+                assert (await lc.post("/api/auth/login", json=USER)).status_code == 200
+
+        pinger = asyncio.create_task(ping())
+        t0 = time.perf_counter()
+        await asyncio.gather(*(login(i) for i in range(LOGINS)))
+        elapsed = time.perf_counter() - t0
+        done.set()
+        await pinger
+    pings.sort()
+    ms = lambda q: round(pings[min(len(pings) - 1, int(q * len(pings)))] * 1000, 1)
+    print(json.dumps({{"logins_per_s": round(LOGINS / elapsed, 2), "pings": len(pings),
+                      "ping_p50_ms": ms(0.5), "ping_p99_ms": ms(0.99),
+                      "ping_max_ms": round(pings[-1] * 1000, 1)}}))
+
+asyncio.run(main())
+"""
+
+
+@pytest.mark.skipif(not os.environ.get("RUN_BENCHMARKS"), reason="RUN_BENCHMARKS not set")
+def test_login_burst_keeps_other_requests_fast():
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DATABASE_URL=f"sqlite+aiosqlite:///{tmp}/t.db", MODEL_WARMUP="false")
+        out = subprocess.run(
+            [sys.executable, "-c", _BENCHMARK], env=env, capture_output=True, text=True, check=True
+        )
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    print(result)
+    # A single bcrypt verification takes ~250 ms; run inline it would show up here
+    assert result["ping_p99_ms"] < 100
+
+
+def test_per_ip_limit(monkeypatch):
+    monkeypatch.setattr(auth.settings, "PASSWORD_HASH_MAX_PER_IP", 2)
+
+    async def burst():
+        calls = [auth._run_hashing("10.0.0.9", time.sleep, 0.2) for _ in range(3)]
+        return await asyncio.gather(*calls, return_exceptions=True)
+
+    results = asyncio.run(burst())
+    rejected = [r for r in results if isinstance(r, HTTPException)]
+    assert len(rejected) == 1 and rejected[0].status_code == 429
+    assert auth._hashing_per_client == {}
+
+
+# Reports the client IP the auth router sees for a request from proxy 10.0.0.1.
+_CLIENT_IP = f"""
+import json, sys
+sys.path.insert(0, {str(BACKEND)!r})
+from fastapi import Request
+from fastapi.testclient import TestClient
+from app.main import app
+from app.routers.auth import _client_ip
+
+@app.get("/_ip")
+def ip(request: Request):
+    return _client_ip(request)
+
+client = TestClient(app, client=("10.0.0.1", 1234))
+print(json.dumps(client.get("/_ip", headers={{"X-Forwarded-For": "203.0.113.7"}}).json()))
+"""
+
+
+@pytest.mark.parametrize("trusted, expected", [
+    ("", "10.0.0.1"),
+    ("10.0.0.1", "203.0.113.7"),
+    ("10.0.0.0/8", "203.0.113.7"),
+    ("192.168.0.1", "10.0.0.1"),
+])
+def test_client_ip_behind_proxy(trusted, expected):
+    env = dict(os.environ, TRUSTED_PROXIES=trusted, MODEL_WARMUP="false")
+    out = subprocess.run(
+        [sys.executable, "-c", _CLIENT_IP], env=env, capture_output=True, text=True, check=True,
+        cwd=BACKEND,
+    )
+    assert json.loads(out.stdout.strip().splitlines()[-1]) == expected
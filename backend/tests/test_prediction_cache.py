@@ -0,0 +1,91 @@
+"""
+test_prediction_cache.py
+------------------------
+Keying, eviction, TTL and disk backing of the prediction cache.
+Run with: pytest tests/test_prediction_cache.py -v
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.prediction_cache import PredictionCache, canonical_key  # noqa: E402
+
+ROW = {"User_ID": "A", "Estimated_Annual_Income": 50000.0, "Region_Code": "USA"}
+RESULT = {"predicted_bundle": "Basic_Health", "confidence": 80.5}
+
+
+class TestCanonicalKey:
+    def test_ignores_user_id_and_key_order(self):
+        other = {"Region_Code": "USA", "Estimated_Annual_Income": 50000.0, "User_ID": "B"}
+        assert canonical_key(ROW, "v1") == canonical_key(other, "v1")
+
+    def test_depends_on_features_and_version(self):
+        assert canonical_key(ROW, "v1") != canonical_key(ROW, "v2")
+        assert canonical_key(ROW, "v1") != canonical_key(dict(ROW, Region_Code="EU"), "v1")
+
+
+class TestMemoryCache:
+    def test_hit_after_put(self):
+        cache = PredictionCache(max_entries=10, ttl_seconds=60)
+        key = canonical_key(ROW, "v1")
+        assert cache.get_many([key]) == [None]
+        cache.put_many([(key, RESULT)], "v1")
+        assert cache.lookup(ROW, "v1") == RESULT
+        assert cache.lookup(ROW, "v2") is None
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+    def test_lru_eviction(self):
+        cache = PredictionCache(max_entries=2, ttl_seconds=60)
+        cache.put_many([("a", RESULT), ("b", RESULT)], "v1")
+        cache.get_many(["a"])  # refresh "a"
+        cache.put_many([("c", RESULT)], "v1")
+        assert cache.get_many(["a", "b", "c"]) == [RESULT, None, RESULT]
+        assert cache.stats()["evictions"] == 1
+
+    def test_ttl_expiry(self):
+        cache = PredictionCache(max_entries=10, ttl_seconds=0.05)
+        cache.put_many([("a", RESULT)], "v1")
+        time.sleep(0.1)
+        assert cache.get_many(["a"]) == [None]
+
+    def test_disabled(self):
+        cache = PredictionCache(max_entries=0, ttl_seconds=60)
+        cache.put_many([("a", RESULT)], "v1")
+        assert cache.get_many(["a"]) == [None]
+        assert cache.lookup(ROW, "v1") is None
+
+    def test_invalidate(self):
+        cache = PredictionCache(max_entries=10, ttl_seconds=60)
+        cache.put_many([("a", RESULT)], "v1")
+        cache.invalidate("v2")
+        assert cache.stats()["size"] == 0
+
+
+class TestDiskBacking:
+    @pytest.fixture
+    def path(self, tmp_path):
+        return str(tmp_path / "cache.db")
+
+    def test_shared_between_instances(self, path):
+        writer = PredictionCache(max_entries=10, ttl_seconds=60, disk_path=path)
+        writer.put_many([("a", RESULT)], "v1")
+        reader = PredictionCache(max_entries=10, ttl_seconds=60, disk_path=path)
+        assert reader.get_many(["a", "b"]) == [RESULT, None]
+        assert reader.stats()["disk_hits"] == 1
+        # Promoted into memory
+        assert reader.get_many(["a"]) == [RESULT] and reader.stats()["hits"] == 1
+        writer.close(), reader.close()
+
+    def test_invalidate_keeps_active_version(self, path):
+        cache = PredictionCache(max_entries=10, ttl_seconds=60, disk_path=path)
+        cache.put_many([("old", RESULT)], "v1")
+        cache.put_many([("new", RESULT)], "v2")
+        cache.invalidate("v2")
+        assert cache.get_many(["old", "new"]) == [None, RESULT]
+        cache.close()
@@ -0,0 +1,211 @@
+"""
+test_rescoring.py
+-----------------
+Incremental rescoring of stored client predictions: the keyset scan, the
+features-hash and model-version staleness checks, prediction replacement,
+admission through the inference executor, and the triggers that start a
+pass.
+Run with: pytest tests/test_rescoring.py -v
+"""
+
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+from sqlalchemy import select
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app import rescoring  # noqa: E402
+from app.models import ClientPrediction  # noqa: E402
+from app.rescoring import ClientRescorer  # noqa: E402
+
+CLASSES = ["A", "B", "C"]
+
+
+class StubService:
+    """Predicts class ``income % 3`` at 80%; records how many rows it scored."""
+
+    class_names = CLASSES
+
+    def __init__(self, version="v1"):
+        self.version = version
+        self.scored = []
+        self.batches = []
+
+    def score_frame(self, df, row_offset=0):
+        income = df["Estimated_Annual_Income"].to_numpy().astype(int)
+        self.scored.extend(df["User_ID"])
+        self.batches.append(len(df))
+        proba = np.full((len(income), 3), 0.1)
+        proba[np.arange(len(income)), income % 3] = 0.8
+        return df["User_ID"].tolist(), proba
+
+
+class StubLoader:
+    def __init__(self, service):
+        self.is_ready = True
+        self._service = service
+
+    def service(self):
+        return self._service
+
+
+@pytest.fixture
+def setup(db, add_clients, raw_client, monkeypatch):
+    """Five stored clients, a stub model and a rescorer reading 2 rows per step."""
+    service = StubService()
+    loader = StubLoader(service)
+    monkeypatch.setattr(rescoring, "async_session", db)
+    monkeypatch.setattr(rescoring, "model_loader", loader)
+    add_clients([raw_client(i, Estimated_Annual_Income=1000 + i) for i in range(1, 6)])
+    return ClientRescorer(chunk_rows=2), loader, service
+
+
+def predictions(db) -> dict:
+    async def run():
+        async with db() as session:
+            rows = (await session.execute(select(ClientPrediction))).scalars().all()
+            return {p.client_id: p for p in rows}
+    return asyncio.run(run())
+
+
+class TestRunOnce:
+    def test_scores_every_client_in_keyset_chunks(self, setup, db):
+        rescorer, _, service = setup
+        result = asyncio.run(rescorer.run_once())
+        assert (result["scanned"], result["rescored"]) == (5, 5)
+        assert service.scored == [f"T{i}" for i in range(1, 6)]
+        assert service.batches == [2, 2, 1]
+
+        stored = predictions(db)
+        assert sorted(stored) == [1, 2, 3, 4, 5]
+        assert stored[1].predicted_bundle == CLASSES[1001 % 3]
+        assert stored[1].confidence == 80.0 and stored[1].model_version == "v1"
+
+    def test_second_pass_scores_nothing(self, setup):
+        rescorer, _, service = setup
+        asyncio.run(rescorer.run_once())
+        result = asyncio.run(rescorer.run_once())
+        assert (result["scanned"], result["rescored"]) == (5, 0)
+        assert len(service.scored) == 5
+
+    def test_changed_client_is_replaced(self, setup, db, add_clients, raw_client):
+        rescorer, _, service = setup
+        asyncio.run(rescorer.run_once())
+        before = predictions(db)[3]
+
+        add_clients([raw_client(3, Estimated_Annual_Income=1004)], upsert=True)
+        result = asyncio.run(rescorer.run_once())
+        assert result["rescored"] == 1 and service.scored[-1] == "T3"
+
+        after = predictions(db)
+        assert len(after) == 5  # replaced, not duplicated
+        assert after[3].features_hash != before.features_hash
+        assert after[3].predicted_bundle == CLASSES[1004 % 3]
+
+    def test_new_clients_are_scored(self, setup, add_clients, raw_client):
+        rescorer, _, _ = setup
+        asyncio.run(rescorer.run_once())
+        add_clients([raw_client(6)], upsert=True)
+        assert asyncio.run(rescorer.run_once())["rescored"] == 1
+
+    def test_model_change_rescores_everything(self, setup, db):
+        rescorer, loader, _ = setup
+        asyncio.run(rescorer.run_once())
+        loader._service = StubService("v2")
+        assert asyncio.run(rescorer.run_once())["rescored"] == 5
+        assert {p.model_version for p in predictions(db).values()} == {"v2"}
+
+    def test_hashing_and_scoring_off_the_event_loop(self, setup, monkeypatch):
+        rescorer, _, service = setup
+        threads = []
+        real_hash, real_score = rescoring.features_hash, service.score_frame
+
+        def spy_hash(values):
+            threads.append(threading.current_thread())
+            return real_hash(values)
+
+        def spy_score(df, row_offset=0):
+            threads.append(threading.current_thread())
+            return real_score(df, row_offset)
+
+        monkeypatch.setattr(rescoring, "features_hash", spy_hash)
+        service.score_frame = spy_score
+        asyncio.run(rescorer.run_once())
+        asyncio.run(rescorer.run_once())  # nothing to score; still hashes every row
+        assert len(threads) == 5 + 3 + 5
+        assert threading.main_thread() not in threads
+
+    def test_waits_for_executor_capacity(self, setup, monkeypatch):
+        from app.executor import InferenceExecutor
+
+        rescorer, _, service = setup
+        executor = InferenceExecutor(max_workers=1, max_queue=0)
+        monkeypatch.setattr(rescoring, "inference_executor", executor)
+        monkeypatch.setattr(rescoring, "_SATURATED_RETRY_SECONDS", 0.01)
+
+        async def run():
+            executor._in_flight = executor.capacity  # taken by request traffic
+            task = asyncio.create_task(rescorer.run_once())
+            await asyncio.sleep(0.05)
+            assert not task.done() and service.scored == []
+            executor._in_flight = 0
+            return await task
+
+        assert asyncio.run(run())["rescored"] == 5
+        executor.shutdown()
+
+    def test_no_model_loaded(self, setup):
+        rescorer, loader, _ = setup
+        loader.is_ready = False
+        assert asyncio.run(rescorer.run_once()) is None
+
+
+class TestTriggers:
+    def run_worker(self, rescorer, body):
+        async def run():
+            rescorer.start()
+            try:
+                await body()
+            finally:
+                await rescorer.stop()
+        asyncio.run(run())
+
+    async def wait_for_pass(self, rescorer, timeout=5.0):
+        deadline = asyncio.get_running_loop().time() + timeout
+        while rescorer.last_run is None:
+            assert asyncio.get_running_loop().time() < deadline, "no pass ran"
+            await asyncio.sleep(0.01)
+
+    def test_periodic_pass(self, setup):
+        rescorer, _, _ = setup
+        rescorer.interval_seconds = 0.05
+        self.run_worker(rescorer, lambda: self.wait_for_pass(rescorer))
+        assert rescorer.last_run["rescored"] == 5
+
+    def test_load_clients_requests_a_pass(self, setup, db, raw_client, monkeypatch):
+        from app.seed_clients import COLUMN_MAP, load_clients
+
+        rescorer, _, _ = setup
+        monkeypatch.setattr(rescoring, "client_rescorer", rescorer)
+        row = {COLUMN_MAP[k]: v for k, v in raw_client(9).items()}
+
+        async def body():
+            await load_clients(db.kw["bind"], [row], upsert=True)
+            await self.wait_for_pass(rescorer)
+
+        self.run_worker(rescorer, body)
+        assert rescorer.last_run["rescored"] == 6
+
+    def test_no_pass_without_a_trigger(self, setup):
+        rescorer, _, _ = setup
+
+        async def body():
+            await asyncio.sleep(0.1)
+
+        self.run_worker(rescorer, body)
+        assert rescorer.last_run is None
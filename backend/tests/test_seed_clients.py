@@ -0,0 +1,80 @@
+"""
+test_seed_clients.py
+--------------------
+Vectorized CSV parsing and bulk/upsert loading of the clients table.
+Run with: pytest tests/test_seed_clients.py -v
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import Base  # noqa: E402
+from app.models import Client  # noqa: E402
+from app.seed_clients import load_clients, read_clients_csv  # noqa: E402
+
+CSV = (
+    "User_ID,Adult_Dependents,Child_Dependents,Region_Code,Estimated_Annual_Income\n"
+    "A,2.9,1,NA,50000\n"
+    "B,x,nan,,\n"
+    "A,-1.5,1e2,R1,60000\n"
+)
+
+
+def write_csv(tmp_path, text=CSV):
+    path = tmp_path / "train.csv"
+    path.write_text(text)
+    return path
+
+
+class TestReadClientsCsv:
+    def test_types(self, tmp_path):
+        rows = read_clients_csv(write_csv(tmp_path))
+        b, a = rows
+        # Repeated user_id keeps the last row
+        assert [a["user_id"], b["user_id"]] == ["A", "B"]
+        # Integers truncate like int(float(raw)); floats stay floats
+        assert a["adult_dependents"] == -1 and isinstance(a["adult_dependents"], int)
+        assert a["child_dependents"] == 100.0
+        assert a["estimated_annual_income"] == 60000.0
+        assert isinstance(a["estimated_annual_income"], float)
+        # Empty, NaN and unparsable values become None; other text is kept
+        assert b["adult_dependents"] is None and b["child_dependents"] is None
+        assert b["region_code"] is None and b["estimated_annual_income"] is None
+        # Columns absent from the file are None
+        assert a["policy_start_year"] is None
+
+    def test_text_kept_verbatim(self, tmp_path):
+        rows = read_clients_csv(write_csv(tmp_path, "User_ID,Region_Code\n001,NA\n"))
+        assert rows[0]["user_id"] == "001" and rows[0]["region_code"] == "NA"
+
+
+class TestLoadClients:
+    def test_upsert(self, tmp_path):
+        async def run():
+            engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/t.db")
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            rows = read_clients_csv(write_csv(tmp_path))
+            first = await load_clients(engine, rows)
+
+            rows[0] = {**rows[0], "region_code": "R9"}
+            rows.append({**rows[1], "user_id": "C"})
+            second = await load_clients(engine, rows, upsert=True)
+            async with engine.connect() as conn:
+                n = (await conn.execute(select(func.count(Client.id)))).scalar()
+                region = (await conn.execute(
+                    select(Client.region_code).where(Client.user_id == "B")
+                )).scalar()
+            await engine.dispose()
+            return first, second, n, region
+
+        first, second, n, region = asyncio.run(run())
+        assert first == {"inserted": 2, "updated": 0, "unchanged": 0}
+        assert second == {"inserted": 1, "updated": 1, "unchanged": 1}
+        assert n == 3 and region == "R9"
@@ -0,0 +1,140 @@
+"""
+test_streaming.py
+-----------------
+NDJSON/CSV framing, trailing summary and mid-stream error record of the
+streaming batch endpoint.
+Run with: pytest tests/test_streaming.py -v
+"""
+
+import io
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.streaming import BatchStream, start_stream  # noqa: E402
+
+CLASSES = ["A", "B", "C"]
+
+
+class StubService:
+    """Predicts class ``x % 3`` at 80%; a negative ``x`` fails its chunk."""
+
+    class_names = CLASSES
+    version = "stub"
+
+    def score_frame(self, df, row_offset=0):
+        x = df["x"].to_numpy()
+        if (x < 0).any():
+            raise RuntimeError("bad chunk")
+        proba = np.full((len(x), 3), 0.1)
+        proba[np.arange(len(x)), x % 3] = 0.8
+        return df["User_ID"].tolist(), proba
+
+    def prediction_rows(self, user_ids, proba, row_offset=0):
+        preds = np.argmax(proba, axis=1)
+        return [
+            {"row_index": row_offset + i, "user_id": str(u), "predicted_bundle": CLASSES[p]}
+            for i, (u, p) in enumerate(zip(user_ids, preds))
+        ]
+
+
+def csv_bytes(xs):
+    return ("User_ID,x\n" + "".join(f"u{i},{x}\n" for i, x in enumerate(xs))).encode()
+
+
+def drain(stream, first):
+    chunks, chunk = [], first
+    while chunk is not None:
+        chunks.append(chunk)
+        chunk = stream.next_chunk()
+    return chunks
+
+
+class TestBatchStream:
+    def test_ndjson_framing_and_summary(self):
+        stream, first = start_stream(StubService(), io.BytesIO(csv_bytes([0, 1, 2, 1, 1])), chunk_rows=2)
+        chunks = drain(stream, first)
+        assert len(chunks) == 3
+        lines = [json.loads(line) for c in chunks for line in c.decode().splitlines()]
+        assert [r["row_index"] for r in lines] == [0, 1, 2, 3, 4]
+        assert [r["predicted_bundle"] for r in lines] == ["A", "B", "C", "B", "B"]
+        summary = json.loads(stream.summary_bytes())["summary"]
+        assert summary["total_rows"] == 5
+        assert summary["bundle_distribution"] == {"A": 1, "B": 3, "C": 1}
+        assert summary["avg_confidence"] == 80.0
+
+    def test_csv_header_only_on_first_chunk(self):
+        stream, first = start_stream(
+            StubService(), io.BytesIO(csv_bytes([0, 1, 2])), fmt="csv", chunk_rows=2
+        )
+        text = b"".join(drain(stream, first)).decode()
+        lines = text.splitlines()
+        assert lines[0].startswith("row_index,user_id,predicted_bundle,confidence,A,B,C")
+        assert len(lines) == 4 and sum(line.startswith("row_index") for line in lines) == 1
+        assert lines[3].split(",")[:3] == ["2", "u2", "C"]
+        assert stream.summary_bytes().startswith(b"# {")
+
+    def test_error_record(self):
+        stream = BatchStream(StubService(), io.BytesIO(csv_bytes([0])), chunk_rows=2)
+        stream.next_chunk()
+        record = json.loads(stream.error_bytes(RuntimeError("bad chunk")))
+        assert record == {"error": "bad chunk", "rows_completed": 1}
+        csv_stream = BatchStream(StubService(), io.BytesIO(csv_bytes([0])), fmt="csv")
+        assert csv_stream.error_bytes(RuntimeError("x")).startswith(b"# {")
+
+    def test_empty_upload(self):
+        with pytest.raises(ValueError):
+            start_stream(StubService(), io.BytesIO(b"User_ID,x\n"))
+
+
+@pytest.fixture
+def client(monkeypatch):
+    from app import auth
+    from app.config import settings
+    from app.main import app
+    from app.ml_service import get_classification_service
+
+    monkeypatch.setattr(settings, "CLASSIFY_STREAM_CHUNK_ROWS", 2)
+    app.dependency_overrides[auth.get_current_user] = lambda: None
+    app.dependency_overrides[get_classification_service] = StubService
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+class TestEndpoint:
+    def post(self, client, xs, fmt="ndjson"):
+        return client.post(
+            f"/api/classify/batch/stream?format={fmt}",
+            files={"file": ("b.csv", csv_bytes(xs), "text/csv")},
+        )
+
+    def test_ndjson(self, client):
+        response = self.post(client, [0, 1, 2])
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert len(lines) == 4 and lines[-1]["summary"]["total_rows"] == 3
+
+    def test_csv(self, client):
+        response = self.post(client, [0, 1, 2], fmt="csv")
+        assert response.headers["content-type"].startswith("text/csv")
+        assert response.text.splitlines()[-1].startswith("# ")
+
+    def test_first_chunk_error_is_a_status(self, client):
+        assert self.post(client, [-1, 0]).status_code == 500
+        assert client.post(
+            "/api/classify/batch/stream", files={"file": ("b.csv", b"User_ID,x\n", "text/csv")}
+        ).status_code == 422
+
+    def test_mid_stream_error_record(self, client):
+        response = self.post(client, [0, 1, -1, 2])
+        assert response.status_code == 200
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert lines[-1] == {"error": "bad chunk", "rows_completed": 2}
+        assert not any("summary" in line for line in lines)
@@ -1,8 +1,13 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from types import MappingProxyType
+from typing import NamedTuple
 import pandas as pd
-import math
+import hashlib
+import json
 import os
+import threading
 
 app = FastAPI()
 
@@ -13,42 +18,161 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Total-Count"],
 )
 
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
 
+# Query parameters that are not column filters
+PAGINATION_PARAMS = {"skip", "limit"}
+
+
 def clean_data(df):
     """Convert float NaN to None for JSON serialization compatibility."""
     # Replace NaN with explicitly None
     df = df.replace({float("nan"): None})
     return df.to_dict(orient="records")
 
-@app.get("/api/clients")
-def get_clients():
-    file_path = os.path.join(DATA_DIR, "CLIENTS.csv")
+
+def _serialize(value) -> bytes:
+    # Same encoding as FastAPI's JSONResponse
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def _etag(*parts: bytes) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part)
+    return f'"{digest.hexdigest()}"'
+
+
+class Snapshot(NamedTuple):
+    version: tuple[int, int]           # (mtime_ns, size) of the file it was read from
+    records: tuple[MappingProxyType, ...]
+    encoded: tuple[bytes, ...]         # each record serialized once
+    body: bytes                        # the whole table
+    etag: str
+
+
+class CsvDataset:
+    """A CSV file held in memory as read-only records, re-read when the file changes."""
+
+    def __init__(self, filename: str):
+        self.path = os.path.join(DATA_DIR, filename)
+        self._snapshot: Snapshot | None = None
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> Snapshot:
+        st = os.stat(self.path)
+        version = (st.st_mtime_ns, st.st_size)
+        snap = self._snapshot
+        if snap is None or snap.version != version:
+            with self._lock:
+                snap = self._snapshot
+                if snap is None or snap.version != version:
+                    snap = self._snapshot = self._load(version)
+        return snap
+
+    def _load(self, version: tuple[int, int]) -> Snapshot:
+        records = clean_data(pd.read_csv(self.path))
+        encoded = tuple(_serialize(record) for record in records)
+        body = b"[" + b",".join(encoded) + b"]"
+        return Snapshot(
+            version=version,
+            records=tuple(MappingProxyType(record) for record in records),
+            encoded=encoded,
+            body=body,
+            etag=_etag(body),
+        )
+
+
+DATASETS = {
+    "clients": CsvDataset("CLIENTS.csv"),
+    "policies": CsvDataset("POLICIES.csv"),
+    "insurance_companies": CsvDataset("INSURANCE_COMPANIES.csv"),
+}
+
+
+def _equals(value, wanted: str) -> bool:
+    if isinstance(value, bool):
+        return str(value).lower() == wanted.lower()
+    if isinstance(value, (int, float)):
+        try:
+            return float(wanted) == value
+        except ValueError:
+            return False
+    return value == wanted
+
+
+def _matches(record, filters: dict[str, list[str]]) -> bool:
+    """Every filtered column equals one of its wanted values."""
+    return all(
+        any(_equals(record[column], wanted) for wanted in values)
+        for column, values in filters.items()
+    )
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in tags or etag in tags
+
+
+def serve_dataset(name: str, request: Request, skip: int, limit: int | None) -> Response:
+    """Rows of a dataset, filtered by ``column=value`` query parameters
+    (a repeated column matches any of its values).
+
+    Bodies are assembled from pre-serialized records and carry an ETag;
+    a matching If-None-Match gets 304. With ``limit``, X-Total-Count holds
+    the number of matching rows.
+    """
     try:
-        df = pd.read_csv(file_path)
-        return clean_data(df)
+        snap = DATASETS[name].snapshot()
     except Exception as e:
-        return {"error": str(e)}
+        return JSONResponse({"error": str(e)})
+
+    filters: dict[str, list[str]] = {}
+    for k, v in request.query_params.multi_items():
+        if k not in PAGINATION_PARAMS:
+            filters.setdefault(k, []).append(v)
+    columns = snap.records[0].keys() if snap.records else ()
+    unknown = sorted(set(filters) - set(columns))
+    if unknown:
+        raise HTTPException(422, detail=f"Unknown filter column(s): {', '.join(unknown)}")
+
+    headers = {}
+    rows = None
+    etag = snap.etag
+    if filters or skip or limit is not None:
+        if filters:
+            rows = [i for i, record in enumerate(snap.records) if _matches(record, filters)]
+        else:
+            rows = range(len(snap.records))
+        if limit is not None:
+            headers["X-Total-Count"] = str(len(rows))
+        rows = rows[skip:] if limit is None else rows[skip:skip + limit]
+        etag = _etag(etag.encode(), str(sorted(request.query_params.multi_items())).encode())
+
+    headers["ETag"] = etag
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    body = snap.body if rows is None else b"[" + b",".join(snap.encoded[i] for i in rows) + b"]"
+    return Response(body, media_type="application/json", headers=headers)
+
+
+@app.get("/api/clients")
+def get_clients(request: Request, skip: int = Query(0, ge=0), limit: int | None = Query(None, ge=1)):
+    return serve_dataset("clients", request, skip, limit)
 
 @app.get("/api/policies")
-def get_policies():
-    file_path = os.path.join(DATA_DIR, "POLICIES.csv")
-    try:
-        df = pd.read_csv(file_path)
-        return clean_data(df)
-    except Exception as e:
-        return {"error": str(e)}
+def get_policies(request: Request, skip: int = Query(0, ge=0), limit: int | None = Query(None, ge=1)):
+    return serve_dataset("policies", request, skip, limit)
 
 @app.get("/api/insurance-companies")
-def get_insurance_companies():
-    file_path = os.path.join(DATA_DIR, "INSURANCE_COMPANIES.csv")
-    try:
-        df = pd.read_csv(file_path)
-        return clean_data(df)
-    except Exception as e:
-        return {"error": str(e)}
+def get_insurance_companies(request: Request, skip: int = Query(0, ge=0), limit: int | None = Query(None, ge=1)):
+    return serve_dataset("insurance_companies", request, skip, limit)
 
 if __name__ == "__main__":
     import uvicorn
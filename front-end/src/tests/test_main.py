@@ -0,0 +1,134 @@
+"""
+test_main.py
+------------
+The CSV data API: column filters (typed and repeated), ETags and 304
+responses, and skip/limit with X-Total-Count.
+Run with: pytest tests/test_main.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import main  # noqa: E402
+
+CSV = """client_id,full_name,city,age,active
+1,Ana,Lisboa,30,True
+2,Bruno,Porto,41,False
+3,Carla,Lisboa,30,True
+4,Duarte,Faro,55,True
+5,Eva,Porto,30,False
+"""
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    """TestClient serving a five-row CSV as the clients dataset."""
+    path = tmp_path / "CLIENTS.csv"
+    path.write_text(CSV)
+    dataset = main.CsvDataset("CLIENTS.csv")
+    dataset.path = str(path)
+    monkeypatch.setitem(main.DATASETS, "clients", dataset)
+    return TestClient(main.app)
+
+
+def ids(response):
+    assert response.status_code == 200
+    return [row["client_id"] for row in response.json()]
+
+
+class TestFilters:
+    def test_no_filters_returns_every_row(self, api):
+        assert ids(api.get("/api/clients")) == [1, 2, 3, 4, 5]
+
+    def test_string_filter(self, api):
+        assert ids(api.get("/api/clients", params={"city": "Lisboa"})) == [1, 3]
+
+    def test_numeric_and_bool_filters(self, api):
+        assert ids(api.get("/api/clients", params={"age": "30.0"})) == [1, 3, 5]
+        assert ids(api.get("/api/clients", params={"active": "false"})) == [2, 5]
+        assert ids(api.get("/api/clients", params={"age": "thirty"})) == []
+
+    def test_filters_on_different_columns_are_anded(self, api):
+        assert ids(api.get("/api/clients", params={"city": "Porto", "age": "30"})) == [5]
+
+    def test_repeated_column_matches_any_value(self, api):
+        response = api.get("/api/clients", params=[("city", "Faro"), ("city", "Porto")])
+        assert ids(response) == [2, 4, 5]
+        response = api.get("/api/clients", params=[("city", "Porto"), ("age", "30"), ("age", "41")])
+        assert ids(response) == [2, 5]
+
+    def test_unknown_column(self, api):
+        response = api.get("/api/clients", params={"town": "Lisboa"})
+        assert response.status_code == 422
+        assert "town" in response.json()["detail"]
+
+
+class TestPagination:
+    def test_skip_and_limit(self, api):
+        response = api.get("/api/clients", params={"skip": 1, "limit": 2})
+        assert ids(response) == [2, 3]
+        assert response.headers["X-Total-Count"] == "5"
+
+    def test_total_counts_matching_rows(self, api):
+        response = api.get("/api/clients", params={"city": "Lisboa", "limit": 1})
+        assert ids(response) == [1]
+        assert response.headers["X-Total-Count"] == "2"
+
+    def test_no_total_without_limit(self, api):
+        response = api.get("/api/clients", params={"skip": 3})
+        assert ids(response) == [4, 5]
+        assert "X-Total-Count" not in response.headers
+
+    @pytest.mark.parametrize("params", [{"skip": -1}, {"limit": 0}])
+    def test_bad_values(self, api, params):
+        assert api.get("/api/clients", params=params).status_code == 422
+
+
+class TestETag:
+    def test_matching_etag_gets_304(self, api):
+        first = api.get("/api/clients")
+        etag = first.headers["ETag"]
+        second = api.get("/api/clients", headers={"If-None-Match": etag})
+        assert second.status_code == 304
+        assert second.headers["ETag"] == etag and second.content == b""
+
+    def test_weak_list_and_wildcard(self, api):
+        etag = api.get("/api/clients").headers["ETag"]
+        header = f'"other", W/{etag}'
+        assert api.get("/api/clients", headers={"If-None-Match": header}).status_code == 304
+        assert api.get("/api/clients", headers={"If-None-Match": "*"}).status_code == 304
+        assert api.get("/api/clients", headers={"If-None-Match": '"other"'}).status_code == 200
+
+    def test_etag_depends_on_query(self, api):
+        full = api.get("/api/clients").headers["ETag"]
+        page = api.get("/api/clients", params={"limit": 2})
+        assert page.headers["ETag"] != full
+        assert api.get("/api/clients", params={"limit": 2},
+                       headers={"If-None-Match": full}).status_code == 200
+
+        # Filter order does not matter; filter values do.
+        a = api.get("/api/clients", params=[("city", "Faro"), ("city", "Porto")]).headers["ETag"]
+        b = api.get("/api/clients", params=[("city", "Porto"), ("city", "Faro")]).headers["ETag"]
+        c = api.get("/api/clients", params=[("city", "Porto")]).headers["ETag"]
+        assert a == b != c
+
+    def test_304_keeps_total_count(self, api):
+        page = api.get("/api/clients", params={"limit": 2})
+        again = api.get("/api/clients", params={"limit": 2},
+                        headers={"If-None-Match": page.headers["ETag"]})
+        assert again.status_code == 304
+        assert again.headers["X-Total-Count"] == "5"
+
+    def test_file_change_changes_etag(self, api):
+        etag = api.get("/api/clients").headers["ETag"]
+        path = Path(main.DATASETS["clients"].path)
+        path.write_text(CSV + "6,Filipa,Braga,22,True\n")
+        response = api.get("/api/clients", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        assert ids(response)[-1] == 6
@@ -9,22 +9,42 @@ Usage
   python pipelines/batch_pipeline.py \
       --input  data/raw/large_test.csv \
       --output data/predictions/batch_output.csv \
-      --chunk-size 50000
+      --chunk-size 50000 \
+      --workers 4
+
+With ``--workers N`` (N > 1) chunks are parsed, feature-engineered and
+scored in a pool of N processes while the parent only splits the input into
+line blocks and appends finished chunks to the output in input order.
+Parallel mode assumes one record per line (no quoted newlines in fields).
+
+Input and output may also be Parquet or Arrow IPC (chosen by suffix);
+columnar inputs are read with column projection and compact dtypes.
 """
 
 import argparse
+import io
 import logging
 import sys
 import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
 from pathlib import Path
+from typing import Iterator, Union
 
 import pandas as pd
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from src.data.columnar_io import (
+    PredictionWriter,
+    detect_format,
+    encode_predictions,
+    iter_input,
+)
 from src.preprocessing.validation import validate
-from src.preprocessing.feature_engineering import preprocess
-from src.model.predictor import load_model, predict
+from src.preprocessing.fused_engine import preprocess_fused
+from src.model.predictor import load_model, load_preprocessor, predict
 
 logging.basicConfig(
     level=logging.INFO,
@@ -33,39 +53,138 @@ logging.basicConfig(
 logger = logging.getLogger("batch_pipeline")
 
 
+# ── Process-pool workers ──────────────────────────────────────────────────────
+
+# Per-process model and preprocessing state, set by ``_init_worker``.
+_worker_state: dict = {}
+
+
+def _init_worker(
+    model_path: str | None, preprocessor_path: str | None, top_k: int | None
+) -> None:
+    """Load the model once per worker process."""
+    model = load_model(model_path)
+    # Parallelism comes from the processes: one predict thread each.
+    if hasattr(model, "get_booster"):
+        model.n_jobs = 1
+        model.get_booster().set_param({"nthread": 1})
+    _worker_state["model"] = model
+    _worker_state["fitted"] = load_preprocessor(preprocessor_path, model_path=model_path)
+    _worker_state["top_k"] = top_k
+
+
+def _score_block(
+    block: Union[bytes, pd.DataFrame], validate_schema: bool, header: bool, out_fmt: str
+) -> tuple:
+    """Parse, feature-engineer, score and encode one block in a worker.
+
+    ``block`` is raw CSV bytes or an already-decoded columnar chunk. Returns
+    the row count and the ``encode_predictions`` payload for ``out_fmt``.
+    """
+    chunk = pd.read_csv(io.BytesIO(block)) if isinstance(block, bytes) else block
+    if validate_schema:
+        validate(chunk, raise_on_error=True)
+    features = preprocess_fused(chunk, fitted=_worker_state["fitted"])
+    preds = predict(features, _worker_state["model"], top_k=_worker_state["top_k"])
+    return len(preds), encode_predictions(preds, out_fmt, header=header)
+
+
+def _iter_blocks(input_path: str, chunk_size: int) -> Iterator[Union[bytes, pd.DataFrame]]:
+    """CSV: the header line plus ``chunk_size`` data lines at a time.
+    Columnar formats: decoded chunks (decoding is cheap next to CSV parsing)."""
+    if detect_format(input_path) != "csv":
+        yield from iter_input(input_path, chunk_size)
+        return
+    with open(input_path, "rb") as fh:
+        header = fh.readline()
+        while lines := list(islice(fh, chunk_size)):
+            yield header + b"".join(lines)
+
+
+def _run_parallel(
+    input_path: str,
+    out: Path,
+    model_path: str | None,
+    chunk_size: int,
+    preprocessor_path: str | None,
+    workers: int,
+    max_in_flight: int,
+    top_k: int | None,
+) -> int:
+    """Score chunks on a process pool; write results in input order."""
+    pending: deque[Future] = deque()
+
+    def write_oldest(writer: PredictionWriter) -> None:
+        n_rows, payload = pending.popleft().result()
+        writer.write_encoded(payload, n_rows)
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(model_path, preprocessor_path, top_k),
+    ) as pool, PredictionWriter(out) as writer:
+        for chunk_idx, block in enumerate(_iter_blocks(input_path, chunk_size)):
+            if len(pending) >= max_in_flight:
+                write_oldest(writer)
+            first = chunk_idx == 0
+            pending.append(pool.submit(_score_block, block, first, first, writer.fmt))
+            logger.info("Submitted chunk %d | in_flight=%d", chunk_idx + 1, len(pending))
+        while pending:
+            write_oldest(writer)
+    return writer.rows
+
+
 def run_batch(
     input_path: str,
     output_path: str,
     model_path: str | None = None,
     chunk_size: int = 50_000,
+    preprocessor_path: str | None = None,
+    workers: int = 1,
+    max_in_flight: int | None = None,
+    top_k: int | None = None,
 ) -> None:
-    """Process a large CSV in chunks and write predictions incrementally."""
-    t0 = time.time()
-    logger.info("=== Batch Pipeline Start | chunk_size=%d ===", chunk_size)
+    """Process a large file in chunks and write predictions incrementally.
 
-    model = load_model(model_path)
+    ``workers > 1`` overlaps parsing, feature engineering and prediction across
+    a process pool; at most ``max_in_flight`` chunks (default ``2 * workers``)
+    are held in memory at once.
+    """
+    t0 = time.time()
+    logger.info("=== Batch Pipeline Start | chunk_size=%d workers=%d ===", chunk_size, workers)
 
     out = Path(output_path)
     out.parent.mkdir(parents=True, exist_ok=True)
 
-    header_written = False
-    total_rows = 0
-    chunk_idx = 0
+    if workers > 1:
+        total_rows = _run_parallel(
+            input_path, out, model_path, chunk_size, preprocessor_path,
+            workers, max_in_flight or 2 * workers, top_k,
+        )
+        elapsed = time.time() - t0
+        logger.info(
+            "=== Batch Pipeline Complete | total_rows=%d | %.2fs ===", total_rows, elapsed
+        )
+        return
+
+    model = load_model(model_path)
+    fitted = load_preprocessor(preprocessor_path, model_path=model_path)
 
-    for chunk in pd.read_csv(input_path, chunksize=chunk_size):
-        chunk_idx += 1
-        logger.info("Processing chunk %d | rows=%d", chunk_idx, len(chunk))
+    chunk_idx = 0
 
-        # Validate first chunk only (schema check, not full stats)
-        if chunk_idx == 1:
-            validate(chunk, raise_on_error=True)
+    with PredictionWriter(out) as writer:
+        for chunk in iter_input(input_path, chunk_size):
+            chunk_idx += 1
+            logger.info("Processing chunk %d | rows=%d", chunk_idx, len(chunk))
 
-        features = preprocess(chunk)
-        preds = predict(features, model)
+            # Validate first chunk only (schema check, not full stats)
+            if chunk_idx == 1:
+                validate(chunk, raise_on_error=True)
 
-        preds.to_csv(out, mode="a", header=not header_written, index=False)
-        header_written = True
-        total_rows += len(preds)
+            features = preprocess_fused(chunk, fitted=fitted)
+            preds = predict(features, model, top_k=top_k)
+            writer.write(preds)
+    total_rows = writer.rows
 
     elapsed = time.time() - t0
     logger.info(
@@ -79,6 +198,13 @@ def main():
     parser.add_argument("--output",     required=True)
     parser.add_argument("--model",      default=None)
     parser.add_argument("--chunk-size", type=int, default=50_000)
+    parser.add_argument("--preprocessor", default=None)
+    parser.add_argument("--workers",    type=int, default=1,
+                        help="Worker processes (1 = sequential, in-process)")
+    parser.add_argument("--max-in-flight", type=int, default=None,
+                        help="Chunks queued or buffered at once (default: 2 x workers)")
+    parser.add_argument("--top-k",      type=int, default=None,
+                        help="Only output the k most likely classes per row")
     args = parser.parse_args()
 
     run_batch(
@@ -86,6 +212,10 @@ def main():
         output_path=args.output,
         model_path=args.model,
         chunk_size=args.chunk_size,
+        preprocessor_path=args.preprocessor,
+        workers=args.workers,
+        max_in_flight=args.max_in_flight,
+        top_k=args.top_k,
     )
 
 
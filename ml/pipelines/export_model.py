@@ -0,0 +1,121 @@
+"""
+export_model.py
+---------------
+Export the pickled sklearn model to XGBoost's native UBJSON format plus a
+metadata sidecar (feature names, classes, importances), and optionally
+benchmark cold-start load time of both artifacts.
+
+Usage
+-----
+  python pipelines/export_model.py \
+      --model  ../front-end/src/model.joblib \
+      --output ../front-end/src/model.ubj \
+      --benchmark
+"""
+
+import argparse
+import logging
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.model.artifact import default_booster_path, export_model
+from src.model.predictor import load_model
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(name)s - %(message)s",
+)
+logger = logging.getLogger("export_model")
+
+_ML_ROOT = str(Path(__file__).parent.parent)
+
+# Each benchmark run is a fresh interpreter, like a new API worker. The
+# import phase (xgboost, and sklearn for the pickle) and the load phase are
+# timed separately from inside the process.
+_LOAD_SNIPPETS = {
+    "joblib": (
+        "import sys, time, warnings; warnings.simplefilter('ignore'); t0 = time.perf_counter(); "
+        "import joblib, xgboost; t1 = time.perf_counter(); "
+        "joblib.load({path!r}); print(t1 - t0, time.perf_counter() - t1)"
+    ),
+    "ubj": (
+        "import sys, time; t0 = time.perf_counter(); "
+        "sys.path.insert(0, {root!r}); from src.model.artifact import load_booster; "
+        "t1 = time.perf_counter(); "
+        "load_booster({path!r}); print(t1 - t0, time.perf_counter() - t1)"
+    ),
+}
+
+
+def benchmark_load(kind: str, path: str, repeats: int = 5) -> dict:
+    """Median import and load seconds for a fresh process loading ``path``."""
+    code = _LOAD_SNIPPETS[kind].format(root=_ML_ROOT, path=path)
+    imports, loads = [], []
+    for _ in range(repeats):
+        out = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        t_import, t_load = map(float, out.stdout.strip().splitlines()[-1].split())
+        imports.append(t_import)
+        loads.append(t_load)
+    return {
+        f"{kind}_import_s": round(statistics.median(imports), 4),
+        f"{kind}_load_s": round(statistics.median(loads), 4),
+    }
+
+
+def run_export(
+    model_path: str | None = None,
+    output_path: str | None = None,
+    class_names: list[str] | None = None,
+    benchmark: bool = False,
+    repeats: int = 5,
+) -> dict:
+    """Export the booster + metadata; return the metadata (with timings)."""
+    model = load_model(model_path)
+    out = output_path or default_booster_path(model_path)
+    meta = export_model(model, out, class_names=class_names)
+
+    if benchmark:
+        joblib_path = model_path or str(Path(out).with_suffix(".joblib"))
+        timings = {
+            **benchmark_load("joblib", joblib_path, repeats),
+            **benchmark_load("ubj", out, repeats),
+        }
+        for kind in ("joblib", "ubj"):
+            logger.info(
+                "Cold start %-6s (median of %d): imports %.3fs + load %.3fs",
+                kind, repeats, timings[f"{kind}_import_s"], timings[f"{kind}_load_s"],
+            )
+        meta = {**meta, **timings}
+    return meta
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the model as native XGBoost UBJSON.")
+    parser.add_argument("--model",  default=None, help="Path to model.joblib")
+    parser.add_argument("--output", default=None,
+                        help="Where to write the booster (default: model.ubj next to the model)")
+    parser.add_argument("--class-names", default=None,
+                        help="Comma-separated label per class index, stored in the metadata")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Time cold-start loading of the joblib and UBJSON artifacts")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    run_export(
+        model_path=args.model,
+        output_path=args.output,
+        class_names=args.class_names.split(",") if args.class_names else None,
+        benchmark=args.benchmark,
+        repeats=args.repeats,
+    )
+
+
+if __name__ == "__main__":
+    main()
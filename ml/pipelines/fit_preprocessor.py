@@ -0,0 +1,65 @@
+"""
+fit_preprocessor.py
+-------------------
+Fit the population-dependent preprocessing statistics (encoder vocabularies,
+income decile edges, underwriting median, ID frequency tables) once on the
+training set and save them next to the model.
+
+Usage
+-----
+  python pipelines/fit_preprocessor.py \
+      --input  ../front-end/data/train.csv \
+      --output ../front-end/src/preprocessor.joblib
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.preprocessing.validation import validate
+from src.preprocessing.feature_engineering import FittedPreprocessor
+from src.model.predictor import default_preprocessor_path
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(name)s - %(message)s",
+)
+logger = logging.getLogger("fit_preprocessor")
+
+
+def run_fit(input_path: str, output_path: str | None = None) -> FittedPreprocessor:
+    """Fit a ``FittedPreprocessor`` on the training CSV and save it."""
+    t0 = time.time()
+    out = Path(output_path or default_preprocessor_path())
+
+    logger.info("Loading training data from %s", input_path)
+    df_train = pd.read_csv(input_path)
+    validate(df_train, raise_on_error=True)
+
+    fitted = FittedPreprocessor.fit(df_train)
+
+    out.parent.mkdir(parents=True, exist_ok=True)
+    fitted.save(str(out))
+
+    logger.info("=== Preprocessor fit complete | %.2fs ===", time.time() - t0)
+    return fitted
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit and save preprocessing state.")
+    parser.add_argument("--input",  required=True, help="Path to training CSV")
+    parser.add_argument("--output", default=None,
+                        help="Where to save the preprocessor (default: next to the model)")
+    args = parser.parse_args()
+
+    run_fit(input_path=args.input, output_path=args.output)
+
+
+if __name__ == "__main__":
+    main()
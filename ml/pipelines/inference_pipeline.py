@@ -2,6 +2,7 @@
 inference_pipeline.py
 ---------------------
 End-to-end pipeline: raw CSV → validated → features → predictions → output CSV.
+Parquet / Arrow IPC input and output are picked by file suffix.
 
 Usage
 -----
@@ -22,9 +23,10 @@ import pandas as pd
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from src.data.columnar_io import read_input, write_predictions
 from src.preprocessing.validation import validate
 from src.preprocessing.feature_engineering import preprocess
-from src.model.predictor import load_model, predict
+from src.model.predictor import load_model, load_preprocessor, predict
 
 logging.basicConfig(
     level=logging.INFO,
@@ -38,16 +40,20 @@ def run_inference(
     output_path: str,
     model_path: str | None = None,
     skip_validation: bool = False,
+    preprocessor_path: str | None = None,
+    top_k: int | None = None,
 ) -> pd.DataFrame:
     """
     Full inference pipeline.
 
     Parameters
     ----------
-    input_path       : path to raw input CSV
-    output_path      : where to write prediction CSV
+    input_path       : path to raw input (.csv, .parquet or .arrow/.feather)
+    output_path      : where to write predictions (format from the suffix)
     model_path       : path to model.joblib (falls back to env / default)
     skip_validation  : bypass schema checks (not recommended in production)
+    preprocessor_path: fitted preprocessing state (falls back to env / next to model)
+    top_k            : emit only the k most likely classes per row
 
     Returns
     -------
@@ -58,7 +64,7 @@ def run_inference(
 
     # 1. Load raw data
     logger.info("Loading input data from %s", input_path)
-    df_raw = pd.read_csv(input_path)
+    df_raw = read_input(input_path)
     logger.info("Loaded %d rows, %d columns", *df_raw.shape)
 
     # 2. Validate
@@ -70,19 +76,20 @@ def run_inference(
 
     # 3. Feature engineering
     logger.info("Running feature engineering...")
-    df_features = preprocess(df_raw)
+    fitted = load_preprocessor(preprocessor_path, model_path=model_path)
+    df_features = preprocess(df_raw, fitted=fitted)
 
     # 4. Load model
     model = load_model(model_path)
 
     # 5. Predict
     logger.info("Running inference...")
-    predictions = predict(df_features, model)
+    predictions = predict(df_features, model, top_k=top_k)
 
     # 6. Save output
     out = Path(output_path)
     out.parent.mkdir(parents=True, exist_ok=True)
-    predictions.to_csv(out, index=False)
+    write_predictions(predictions, out)
     logger.info("Predictions saved to %s", out)
 
     elapsed = time.time() - t0
@@ -92,11 +99,15 @@ def run_inference(
 
 def main():
     parser = argparse.ArgumentParser(description="Run the coverage bundle inference pipeline.")
-    parser.add_argument("--input",  required=True, help="Path to raw input CSV")
-    parser.add_argument("--output", required=True, help="Path for output predictions CSV")
+    parser.add_argument("--input",  required=True, help="Path to raw input (CSV, Parquet or Arrow)")
+    parser.add_argument("--output", required=True, help="Path for output predictions (CSV, Parquet or Arrow)")
     parser.add_argument("--model",  default=None,  help="Path to model.joblib")
     parser.add_argument("--skip-validation", action="store_true",
                         help="Skip data validation (not recommended)")
+    parser.add_argument("--preprocessor", default=None,
+                        help="Path to preprocessor.joblib (default: next to the model)")
+    parser.add_argument("--top-k", type=int, default=None,
+                        help="Only output the k most likely classes per row")
     args = parser.parse_args()
 
     run_inference(
@@ -104,6 +115,8 @@ def main():
         output_path=args.output,
         model_path=args.model,
         skip_validation=args.skip_validation,
+        preprocessor_path=args.preprocessor,
+        top_k=args.top_k,
     )
 
 
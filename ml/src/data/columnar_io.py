@@ -0,0 +1,251 @@
+"""
+columnar_io.py
+--------------
+Format-aware reading of raw client data and writing of predictions.
+
+CSV, Parquet and Arrow IPC (Feather v2) are chosen by file suffix. Columnar
+inputs are read with column projection to the pipeline's input columns and
+cast to compact dtypes; columnar prediction outputs store confidence and
+class probabilities as float32.
+"""
+
+import logging
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from src.preprocessing.validation import REQUIRED_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+
+# ── Schema ────────────────────────────────────────────────────────────────────
+
+FORMATS = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".ipc": "arrow",
+}
+
+# Raw columns the model consumes as-is, besides the validated ones.
+PASSTHROUGH_COLUMNS = [
+    "Policy_Cancelled_Post_Purchase",
+    "Policy_Start_Year",
+    "Policy_Start_Week",
+    "Policy_Start_Day",
+    "Existing_Policyholder",
+]
+
+INPUT_COLUMNS = REQUIRED_COLUMNS + PASSTHROUGH_COLUMNS
+
+# Compact Arrow types for columnar input. Columns that may be missing stay
+# float64 so NaN handling (and derived ratios) match the CSV path exactly.
+INPUT_DTYPES: Dict[str, pa.DataType] = {
+    "User_ID": pa.string(),
+    "Estimated_Annual_Income": pa.float64(),
+    "Child_Dependents": pa.float64(),
+    "Broker_ID": pa.float64(),
+    "Employer_ID": pa.float64(),
+    **{col: pa.int32() for col in [
+        "Adult_Dependents",
+        "Infant_Dependents",
+        "Previous_Policy_Duration_Months",
+        "Days_Since_Quote",
+        "Grace_Period_Extensions",
+        "Custom_Riders_Requested",
+        "Vehicles_on_Policy",
+        "Policy_Amendments_Count",
+        "Previous_Claims_Filed",
+        "Years_Without_Claims",
+        "Underwriting_Processing_Days",
+        "Policy_Cancelled_Post_Purchase",
+        "Policy_Start_Year",
+        "Policy_Start_Week",
+        "Policy_Start_Day",
+        "Existing_Policyholder",
+    ]},
+    **{col: pa.dictionary(pa.int32(), pa.string()) for col in [
+        "Region_Code",
+        "Broker_Agency_Type",
+        "Deductible_Tier",
+        "Acquisition_Channel",
+        "Payment_Schedule",
+        "Employment_Status",
+        "Policy_Start_Month",
+    ]},
+}
+
+
+def detect_format(path: Union[str, Path]) -> str:
+    """``csv`` / ``parquet`` / ``arrow`` from the file suffix (CSV if unknown)."""
+    return FORMATS.get(Path(path).suffix.lower(), "csv")
+
+
+# ── Input ─────────────────────────────────────────────────────────────────────
+
+def _project(schema: pa.Schema, columns: Optional[List[str]]) -> List[str]:
+    """Wanted columns present in the file, in file order (like CSV input)."""
+    wanted = set(INPUT_COLUMNS if columns is None else columns)
+    return [c for c in schema.names if c in wanted]
+
+
+def _to_frame(table: pa.Table) -> pd.DataFrame:
+    """Cast to ``INPUT_DTYPES`` and convert (dictionary columns → category)."""
+    fields = []
+    for field in table.schema:
+        target = INPUT_DTYPES.get(field.name)
+        if target is None or field.type == target:
+            fields.append(field)
+        elif pa.types.is_integer(target) and table.column(field.name).null_count:
+            fields.append(pa.field(field.name, pa.float64()))  # keep NaNs
+        else:
+            fields.append(pa.field(field.name, target))
+    return table.cast(pa.schema(fields)).to_pandas()
+
+
+def _open_ipc(path: Union[str, Path]):
+    source = pa.memory_map(str(path), "r")
+    try:
+        return ipc.open_file(source)
+    except pa.ArrowInvalid:
+        source.seek(0)
+        return ipc.open_stream(source)
+
+
+def read_input(
+    path: Union[str, Path], columns: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """
+    Read a raw input file into a DataFrame.
+
+    Parquet and Arrow inputs only load ``columns`` (default: the pipeline's
+    ``INPUT_COLUMNS``) that exist in the file; CSV is read in full as before.
+    """
+    fmt = detect_format(path)
+    if fmt == "parquet":
+        schema = pq.read_schema(path)
+        table = pq.read_table(path, columns=_project(schema, columns))
+    elif fmt == "arrow":
+        reader = _open_ipc(path)
+        table = reader.read_all()
+        table = table.select(_project(table.schema, columns))
+    else:
+        return pd.read_csv(path)
+    logger.info("Read %s input | rows=%d cols=%d", fmt, table.num_rows, table.num_columns)
+    return _to_frame(table)
+
+
+def iter_input(
+    path: Union[str, Path], chunk_size: int, columns: Optional[List[str]] = None
+) -> Iterator[pd.DataFrame]:
+    """Yield the input ``chunk_size`` rows at a time, in any supported format."""
+    fmt = detect_format(path)
+    if fmt == "parquet":
+        pf = pq.ParquetFile(path)
+        for batch in pf.iter_batches(
+            batch_size=chunk_size, columns=_project(pf.schema_arrow, columns)
+        ):
+            yield _to_frame(pa.Table.from_batches([batch]))
+    elif fmt == "arrow":
+        reader = _open_ipc(path)
+        table = reader.read_all()  # memory-mapped: buffers are paged in lazily
+        table = table.select(_project(table.schema, columns))
+        for offset in range(0, table.num_rows, chunk_size):
+            yield _to_frame(table.slice(offset, chunk_size))
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+# ── Output ────────────────────────────────────────────────────────────────────
+
+def _is_float32_column(name: str) -> bool:
+    return name == "Confidence" or name.startswith("prob_") or name.endswith("_Prob")
+
+
+def encode_predictions(
+    preds: pd.DataFrame, fmt: str, header: bool = True
+) -> Union[bytes, pa.Table]:
+    """Serialise a ``predict`` frame: CSV bytes, or an Arrow table with float32
+    probabilities for columnar formats. Safe to call in worker processes."""
+    if fmt == "csv":
+        return preds.to_csv(index=False, header=header).encode()
+    arrays, names = [], []
+    for name in preds.columns:
+        values = preds[name]
+        if _is_float32_column(str(name)):
+            arrays.append(pa.array(values.to_numpy(dtype="float32")))
+        else:
+            arrays.append(pa.array(values))
+        names.append(str(name))
+    return pa.Table.from_arrays(arrays, names=names)
+
+
+class PredictionWriter:
+    """Append prediction chunks to a CSV, Parquet or Arrow IPC file."""
+
+    def __init__(self, path: Union[str, Path], fmt: Optional[str] = None):
+        self.path = Path(path)
+        self.fmt = fmt or detect_format(path)
+        self.rows = 0
+        self._schema: Optional[pa.Schema] = None
+        self._csv = None
+        self._writer = None
+
+    @property
+    def header_pending(self) -> bool:
+        return self.rows == 0
+
+    def write(self, preds: pd.DataFrame) -> None:
+        self.write_encoded(
+            encode_predictions(preds, self.fmt, header=self.header_pending), len(preds)
+        )
+
+    def write_encoded(self, payload: Union[bytes, pa.Table], n_rows: int) -> None:
+        """Append output of ``encode_predictions`` (e.g. from a worker)."""
+        if self.fmt == "csv":
+            if self._csv is None:
+                self._csv = open(self.path, "ab")
+            self._csv.write(payload)
+        else:
+            if self._writer is None:
+                self._schema = payload.schema
+                if self.fmt == "parquet":
+                    self._writer = pq.ParquetWriter(self.path, self._schema)
+                else:
+                    self._writer = ipc.new_file(str(self.path), self._schema)
+            elif payload.schema != self._schema:
+                payload = payload.cast(self._schema)
+            self._writer.write_table(payload)
+        self.rows += n_rows
+
+    def close(self) -> None:
+        if self._csv is not None:
+            self._csv.close()
+            self._csv = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self) -> "PredictionWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def write_predictions(preds: pd.DataFrame, path: Union[str, Path]) -> None:
+    """Write a full predictions frame in the format implied by ``path``."""
+    path = Path(path)
+    if detect_format(path) == "csv":
+        preds.to_csv(path, index=False)
+        return
+    path.unlink(missing_ok=True)
+    with PredictionWriter(path) as writer:
+        writer.write(preds)
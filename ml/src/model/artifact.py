@@ -0,0 +1,99 @@
+"""
+artifact.py
+-----------
+Native XGBoost model artifact: the booster in UBJSON plus a JSON sidecar.
+
+``export_model`` turns the pickled sklearn wrapper into ``model.ubj`` and
+``model.meta.json`` (feature names, classes, importances, objective).
+``load_booster`` reads them back without joblib/pickle or sklearn, which is
+what the API workers do at startup.
+"""
+
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import xgboost as xgb
+
+from src.model.predictor import _DEFAULT_MODEL_PATH
+
+logger = logging.getLogger(__name__)
+
+META_SUFFIX = ".meta.json"
+
+
+def default_booster_path(model_path: Optional[str] = None) -> str:
+    """``model.ubj`` sitting next to the (joblib) model file."""
+    path = model_path or os.environ.get("MODEL_PATH", _DEFAULT_MODEL_PATH)
+    return str(Path(path).with_suffix(".ubj"))
+
+
+def metadata_path(booster_path: str) -> str:
+    """Sidecar path: ``model.ubj`` → ``model.meta.json``."""
+    return str(Path(booster_path).with_suffix(META_SUFFIX))
+
+
+def export_model(
+    model, booster_path: str, class_names: Optional[List[str]] = None
+) -> dict:
+    """
+    Save a fitted ``XGBClassifier``'s booster as UBJSON plus metadata.
+
+    Parameters
+    ----------
+    model        : fitted sklearn-API XGBoost model.
+    booster_path : output path, normally ending in ``.ubj``.
+    class_names  : optional human-readable label per class index.
+
+    Returns
+    -------
+    The metadata dict written next to the booster.
+    """
+    booster = model.get_booster()
+    Path(booster_path).parent.mkdir(parents=True, exist_ok=True)
+    booster.save_model(booster_path)
+
+    feature_names = [str(f) for f in getattr(model, "feature_names_in_", [])]
+    meta = {
+        "format": "ubj",
+        "xgboost_version": xgb.__version__,
+        "exported_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "objective": getattr(model, "objective", None),
+        "classes": [c.item() if hasattr(c, "item") else c for c in model.classes_],
+        "feature_names": feature_names,
+        "feature_importances": [
+            float(v) for v in getattr(model, "feature_importances_", [])
+        ],
+    }
+    if class_names is not None:
+        if len(class_names) != len(meta["classes"]):
+            raise ValueError(
+                f"Got {len(class_names)} class names for {len(meta['classes'])} classes."
+            )
+        meta["class_names"] = list(class_names)
+
+    with open(metadata_path(booster_path), "w") as fh:
+        json.dump(meta, fh, indent=2)
+    logger.info("Exported booster to %s (%d features)", booster_path, len(feature_names))
+    return meta
+
+
+def load_booster(booster_path: str) -> Tuple[xgb.Booster, dict]:
+    """Load a UBJSON booster and its metadata sidecar."""
+    meta_file = metadata_path(booster_path)
+    if not os.path.exists(booster_path):
+        raise FileNotFoundError(f"Booster file not found: {booster_path}")
+    if not os.path.exists(meta_file):
+        raise FileNotFoundError(f"Booster metadata not found: {meta_file}")
+
+    booster = xgb.Booster()
+    booster.load_model(booster_path)
+    with open(meta_file) as fh:
+        meta = json.load(fh)
+    if meta.get("feature_names") and not booster.feature_names:
+        booster.feature_names = meta["feature_names"]
+    logger.info("Booster loaded from %s", booster_path)
+    return booster, meta
@@ -13,6 +13,8 @@ import joblib
 import numpy as np
 import pandas as pd
 
+from src.preprocessing.feature_engineering import FittedPreprocessor
+
 logger = logging.getLogger(__name__)
 
 # Default model path: <project_root>/front-end/src/model.joblib
@@ -43,14 +45,59 @@ def load_model(model_path: Optional[str] = None):
     return model
 
 
-def predict(df_features: pd.DataFrame, model) -> pd.DataFrame:
+def default_preprocessor_path(model_path: Optional[str] = None) -> str:
+    """``preprocessor.joblib`` sitting next to the model file."""
+    path = model_path or os.environ.get("MODEL_PATH", _DEFAULT_MODEL_PATH)
+    return str(Path(path).with_name("preprocessor.joblib"))
+
+
+def load_preprocessor(
+    preprocessor_path: Optional[str] = None,
+    model_path: Optional[str] = None,
+) -> Optional[FittedPreprocessor]:
+    """
+    Load the fitted preprocessing state saved alongside the model.
+
+    Parameters
+    ----------
+    preprocessor_path : explicit path to a saved ``FittedPreprocessor``.
+                        Falls back to PREPROCESSOR_PATH env-var → the file
+                        next to ``model_path``.
+
+    Returns
+    -------
+    FittedPreprocessor, or ``None`` when no explicit path was given and the
+    default artifact does not exist (preprocessing then fits per call).
+    """
+    explicit = preprocessor_path or os.environ.get("PREPROCESSOR_PATH")
+    path = explicit or default_preprocessor_path(model_path)
+    if not os.path.exists(path):
+        if explicit:
+            raise FileNotFoundError(f"Preprocessor file not found: {path}")
+        logger.warning(
+            "No fitted preprocessor at %s – statistics will be fit per call. "
+            "Create it with pipelines/fit_preprocessor.py.", path
+        )
+        return None
+    logger.info("Loading preprocessor from %s", path)
+    return FittedPreprocessor.load(path)
+
+
+def predict(
+    df_features: pd.DataFrame, model, top_k: Optional[int] = None
+) -> pd.DataFrame:
     """
     Run predictions using a fitted model on a feature-engineered DataFrame.
 
+    The model is evaluated once (``predict_proba``); labels are the argmax of
+    the probability matrix and the output frame is assembled in one step.
+
     Parameters
     ----------
     df_features : DataFrame output of ``preprocess()`` (includes User_ID).
-    model       : fitted sklearn estimator with ``predict`` and ``predict_proba``.
+    model       : fitted sklearn estimator with ``predict_proba`` (or ``predict``).
+    top_k       : if set, emit only the ``k`` most likely classes per row
+                  instead of one probability column per class.
 
     Returns
     -------
@@ -59,37 +106,48 @@ def predict(df_features: pd.DataFrame, model) -> pd.DataFrame:
       - Predicted_Bundle        (class label)
       - Predicted_Bundle_Index  (integer index)
       - Confidence              (max probability × 100)
-      - one column per class with probability × 100
+      - one column per class with probability × 100, or with ``top_k``
+        Top1_Bundle, Top1_Prob, …, Top{k}_Bundle, Top{k}_Prob
     """
     id_col = "User_ID"
     user_ids = df_features[id_col] if id_col in df_features.columns else None
 
-    # Drop non-feature columns
+    # Drop non-feature columns and match the training column order
     drop_cols = [c for c in [id_col, "Purchased_Coverage_Bundle"] if c in df_features.columns]
     X = df_features.drop(columns=drop_cols)
+    if hasattr(model, "feature_names_in_"):
+        X = X[list(model.feature_names_in_)]
 
-    # Predictions
-    preds = model.predict(X)
-    classes = list(model.classes_)
-
-    result = pd.DataFrame()
+    classes = np.asarray(model.classes_)
+    columns = {}
     if user_ids is not None:
-        result["User_ID"] = user_ids.values
-
-    result["Predicted_Bundle"] = preds
-
-    # Map to integer index
-    class_to_idx = {c: i for i, c in enumerate(classes)}
-    result["Predicted_Bundle_Index"] = result["Predicted_Bundle"].map(class_to_idx)
-
-    # Probabilities
-    if hasattr(model, "predict_proba"):
-        proba = model.predict_proba(X)
-        result["Confidence"] = np.max(proba, axis=1) * 100
+        columns["User_ID"] = user_ids.to_numpy()
+
+    if not hasattr(model, "predict_proba"):
+        preds = np.asarray(model.predict(X))
+        columns["Predicted_Bundle"] = preds
+        columns["Predicted_Bundle_Index"] = np.searchsorted(classes, preds)
+        columns["Confidence"] = np.full(len(preds), 100.0)  # deterministic models
+        return pd.DataFrame(columns)
+
+    proba = np.asarray(model.predict_proba(X))
+    idx = np.argmax(proba, axis=1)
+    pct = proba * 100
+    rows = np.arange(len(pct))
+
+    columns["Predicted_Bundle"] = classes[idx]
+    columns["Predicted_Bundle_Index"] = idx
+    columns["Confidence"] = pct[rows, idx]
+    if top_k is None:
         for i, cls in enumerate(classes):
-            result[f"prob_{cls}"] = proba[:, i] * 100
+            columns[f"prob_{cls}"] = pct[:, i]
     else:
-        result["Confidence"] = 100.0  # deterministic models
+        k = max(1, min(top_k, len(classes)))
+        top = np.argsort(-pct, axis=1, kind="stable")[:, :k]
+        for r in range(k):
+            columns[f"Top{r + 1}_Bundle"] = classes[top[:, r]]
+            columns[f"Top{r + 1}_Prob"] = pct[rows, top[:, r]]
 
+    result = pd.DataFrame(columns)
     logger.info("Predictions complete: %d rows, %d classes", len(result), len(classes))
-    return result
\ No newline at end of file
+    return result
@@ -1,13 +1,21 @@
 """
 feature_engineering.py
 -----------------------
-Stateless, reproducible feature engineering for the Coverage Bundle model.
+Reproducible feature engineering for the Coverage Bundle model.
 All transformations are deterministic and side-effect-free.
+
+The four population-dependent steps (income deciles, underwriting median,
+label encoding and frequency encoding) fit their statistics on the frame they
+receive unless a ``FittedPreprocessor`` is passed, in which case they become
+pure lookups against statistics learned once from the training set.
 """
 
 import pandas as pd
 import numpy as np
+from dataclasses import dataclass, field
 from sklearn.preprocessing import LabelEncoder
+from typing import Dict, List, Optional
+import joblib
 import logging
 
 logger = logging.getLogger(__name__)
@@ -25,6 +33,20 @@ FREQ_ENCODE_COLS = ["Broker_ID", "Employer_ID"]
 
 ID_COL = "User_ID"
 
+# Numeric columns coerced from ``object`` dtype by ``fill_missing_values``.
+ALWAYS_NUMERIC_COLS = [
+    "Estimated_Annual_Income", "Adult_Dependents", "Infant_Dependents",
+    "Existing_Policyholder", "Previous_Claims_Filed", "Years_Without_Claims",
+    "Policy_Amendments_Count", "Underwriting_Processing_Days",
+    "Vehicles_on_Policy", "Custom_Riders_Requested",
+    "Policy_Start_Year", "Policy_Start_Week", "Policy_Start_Day",
+    "Policy_Cancelled_Post_Purchase", "Previous_Policy_Duration_Months",
+    "Days_Since_Quote", "Grace_Period_Extensions",
+]
+
+DURATION_BINS = [-1, 0, 3, 6, 12, 24, 9999]
+QUOTE_DELAY_BINS = [-1, 7, 30, 90, 180, 99999]
+
 
 # ── Individual transforms ─────────────────────────────────────────────────────
 
@@ -49,16 +71,7 @@ def fill_missing_values(df: pd.DataFrame) -> pd.DataFrame:
 
     # --- safety net: coerce every other numeric-ish column that may have
     #     arrived as ``object`` (e.g. a single-row DataFrame built from JSON) ---
-    _always_numeric = [
-        "Estimated_Annual_Income", "Adult_Dependents", "Infant_Dependents",
-        "Existing_Policyholder", "Previous_Claims_Filed", "Years_Without_Claims",
-        "Policy_Amendments_Count", "Underwriting_Processing_Days",
-        "Vehicles_on_Policy", "Custom_Riders_Requested",
-        "Policy_Start_Year", "Policy_Start_Week", "Policy_Start_Day",
-        "Policy_Cancelled_Post_Purchase", "Previous_Policy_Duration_Months",
-        "Days_Since_Quote", "Grace_Period_Extensions",
-    ]
-    for col in _always_numeric:
+    for col in ALWAYS_NUMERIC_COLS:
         if col in df.columns and df[col].dtype == object:
             df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
 
@@ -78,13 +91,18 @@ def build_dependent_features(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def build_income_features(df: pd.DataFrame) -> pd.DataFrame:
+def build_income_features(
+    df: pd.DataFrame, fitted: Optional["FittedPreprocessor"] = None
+) -> pd.DataFrame:
     """Income & wealth-proxy features."""
     df = df.copy()
     df["Income_Per_Family"] = df["Estimated_Annual_Income"] / df["Family_Size"]
-    df["Income_Bracket"]    = pd.qcut(
-        df["Estimated_Annual_Income"], q=10, labels=False, duplicates="drop"
-    )
+    if fitted is not None:
+        df["Income_Bracket"] = fitted.income_bracket(df["Estimated_Annual_Income"])
+    else:
+        df["Income_Bracket"] = pd.qcut(
+            df["Estimated_Annual_Income"], q=10, labels=False, duplicates="drop"
+        )
     return df
 
 
@@ -94,7 +112,7 @@ def build_policy_duration_features(df: pd.DataFrame) -> pd.DataFrame:
     df["Is_New_Policy"]   = (df["Previous_Policy_Duration_Months"] == 0).astype(int)
     df["Duration_Bucket"] = pd.cut(
         df["Previous_Policy_Duration_Months"],
-        bins=[-1, 0, 3, 6, 12, 24, 9999],
+        bins=DURATION_BINS,
         labels=[0, 1, 2, 3, 4, 5],
     ).astype(float)
     return df
@@ -107,7 +125,7 @@ def build_quote_timing_features(df: pd.DataFrame) -> pd.DataFrame:
     df["Delayed_Purchase"]   = (df["Days_Since_Quote"] > 90).astype(int)
     df["Quote_Delay_Bucket"] = pd.cut(
         df["Days_Since_Quote"],
-        bins=[-1, 7, 30, 90, 180, 99999],
+        bins=QUOTE_DELAY_BINS,
         labels=[0, 1, 2, 3, 4],
     ).astype(float)
     return df
@@ -146,10 +164,15 @@ def build_binary_flags(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def build_underwriting_features(df: pd.DataFrame) -> pd.DataFrame:
+def build_underwriting_features(
+    df: pd.DataFrame, fitted: Optional["FittedPreprocessor"] = None
+) -> pd.DataFrame:
     """Underwriting-delay flag (uses population median – fit on train)."""
     df = df.copy()
-    med_uw = df["Underwriting_Processing_Days"].median()
+    if fitted is not None:
+        med_uw = fitted.underwriting_median
+    else:
+        med_uw = df["Underwriting_Processing_Days"].median()
     df["Long_Underwriting"] = (df["Underwriting_Processing_Days"] > med_uw).astype(int)
     return df
 
@@ -166,24 +189,137 @@ def build_rule_features(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def encode_categoricals(df: pd.DataFrame) -> pd.DataFrame:
-    """Label-encode categorical columns (fit per-call; safe for inference)."""
+def encode_categoricals(
+    df: pd.DataFrame, fitted: Optional["FittedPreprocessor"] = None
+) -> pd.DataFrame:
+    """Label-encode categorical columns (fit per-call unless ``fitted`` given).
+
+    With a fitted preprocessor, categories unseen at fit time encode as -1.
+    """
     df = df.copy()
     for col in CATEGORICAL_COLS:
-        enc = LabelEncoder()
-        df[col] = enc.fit_transform(df[col].astype(str))
+        if fitted is not None:
+            df[col] = fitted.encode_category(col, df[col])
+        else:
+            enc = LabelEncoder()
+            df[col] = enc.fit_transform(df[col].astype(str))
     return df
 
 
-def encode_frequencies(df: pd.DataFrame) -> pd.DataFrame:
-    """Frequency-encode high-cardinality ID columns."""
+def encode_frequencies(
+    df: pd.DataFrame, fitted: Optional["FittedPreprocessor"] = None
+) -> pd.DataFrame:
+    """Frequency-encode high-cardinality ID columns.
+
+    With a fitted preprocessor, IDs unseen at fit time get frequency 0.
+    """
     df = df.copy()
     for col in FREQ_ENCODE_COLS:
-        freq = df[col].value_counts(normalize=True)
-        df[f"{col}_freq"] = df[col].map(freq)
+        if fitted is not None:
+            df[f"{col}_freq"] = fitted.frequency(col, df[col])
+        else:
+            freq = df[col].value_counts(normalize=True)
+            df[f"{col}_freq"] = df[col].map(freq)
     return df
 
 
+# ── Fitted state ──────────────────────────────────────────────────────────────
+
+@dataclass
+class FittedPreprocessor:
+    """Population statistics learned once from the training set.
+
+    ``fit`` runs on the raw training frame; ``transform`` then applies the
+    pipeline with every population-dependent step reduced to an O(n) lookup,
+    so single rows and arbitrary chunks encode exactly like the training data.
+    """
+    category_vocab: Dict[str, List[str]] = field(default_factory=dict)
+    income_bin_edges: List[float] = field(default_factory=list)
+    underwriting_median: float = 0.0
+    freq_tables: Dict[str, Dict[float, float]] = field(default_factory=dict)
+
+    def __post_init__(self):
+        # Lookup structures derived from the serialisable fields above.
+        self._category_index = {
+            col: pd.Index(np.asarray(vocab, dtype=object))
+            for col, vocab in self.category_vocab.items()
+        }
+        self._freq_lookup = {
+            col: pd.Series(table, dtype=float)
+            for col, table in self.freq_tables.items()
+        }
+        self._inner_edges = np.asarray(self.income_bin_edges[1:-1], dtype=float)
+
+    # -- fitting ------------------------------------------------------------
+
+    @classmethod
+    def fit(cls, df: pd.DataFrame) -> "FittedPreprocessor":
+        """Learn encoder vocabularies, decile edges, median and frequencies."""
+        logger.info("Fitting preprocessor | rows=%d", len(df))
+        filled = fill_missing_values(df)
+
+        _, edges = pd.qcut(
+            filled["Estimated_Annual_Income"], q=10,
+            labels=False, retbins=True, duplicates="drop",
+        )
+        category_vocab = {
+            col: list(LabelEncoder().fit(filled[col].astype(str)).classes_)
+            for col in CATEGORICAL_COLS
+        }
+        freq_tables = {
+            col: filled[col].value_counts(normalize=True).to_dict()
+            for col in FREQ_ENCODE_COLS
+        }
+        return cls(
+            category_vocab=category_vocab,
+            income_bin_edges=[float(e) for e in edges],
+            underwriting_median=float(filled["Underwriting_Processing_Days"].median()),
+            freq_tables=freq_tables,
+        )
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        return preprocess(df, fitted=self)
+
+    # -- lookups ------------------------------------------------------------
+
+    def income_bracket(self, income: pd.Series) -> np.ndarray:
+        """Decile index of each income against the fitted ``qcut`` edges."""
+        values = income.to_numpy(dtype=float, na_value=np.nan)
+        if len(self.income_bin_edges) < 2:
+            return np.full(len(values), np.nan)
+        # qcut bins are right-closed, so side="left" reproduces its labels;
+        # out-of-range incomes clip into the first / last decile.
+        codes = np.searchsorted(self._inner_edges, values, side="left")
+        missing = np.isnan(values)
+        if missing.any():
+            return np.where(missing, np.nan, codes)
+        return codes
+
+    def encode_category(self, col: str, values: pd.Series) -> np.ndarray:
+        return self._category_index[col].get_indexer(values.astype(str))
+
+    def frequency(self, col: str, values: pd.Series) -> pd.Series:
+        return values.map(self._freq_lookup[col]).fillna(0.0)
+
+    # -- persistence --------------------------------------------------------
+
+    def to_dict(self) -> dict:
+        return {
+            "category_vocab": self.category_vocab,
+            "income_bin_edges": self.income_bin_edges,
+            "underwriting_median": self.underwriting_median,
+            "freq_tables": self.freq_tables,
+        }
+
+    def save(self, path: str) -> None:
+        joblib.dump(self.to_dict(), path)
+        logger.info("Preprocessor saved to %s", path)
+
+    @classmethod
+    def load(cls, path: str) -> "FittedPreprocessor":
+        return cls(**joblib.load(path))
+
+
 # ── Master pipeline ───────────────────────────────────────────────────────────
 
 TRANSFORM_STEPS = [
@@ -202,15 +338,32 @@ TRANSFORM_STEPS = [
 ]
 
 
-def preprocess(df: pd.DataFrame) -> pd.DataFrame:
+# Steps whose statistics come from ``FittedPreprocessor`` when one is supplied.
+FITTED_STEPS = {
+    build_income_features,
+    build_underwriting_features,
+    encode_categoricals,
+    encode_frequencies,
+}
+
+
+def preprocess(
+    df: pd.DataFrame, fitted: Optional[FittedPreprocessor] = None
+) -> pd.DataFrame:
     """
     Run the full feature-engineering pipeline.
     Input  : raw DataFrame (must include User_ID).
     Output : enriched DataFrame (User_ID retained).
+
+    Pass ``fitted`` to use training-set statistics instead of fitting the
+    population-dependent steps on ``df`` itself.
     """
     logger.info("Starting preprocessing | rows=%d cols=%d", len(df), df.shape[1])
     for step in TRANSFORM_STEPS:
-        df = step(df)
+        if fitted is not None and step in FITTED_STEPS:
+            df = step(df, fitted=fitted)
+        else:
+            df = step(df)
         logger.debug("After %s | cols=%d", step.__name__, df.shape[1])
     logger.info("Preprocessing complete | final cols=%d", df.shape[1])
     return df
\ No newline at end of file
@@ -0,0 +1,193 @@
+"""
+row_encoder.py
+--------------
+Pandas-free feature encoding for one raw record.
+
+``RowEncoder.encode`` maps a raw row dict straight into a float32 feature
+vector in the model's column order using plain Python arithmetic. It yields
+exactly what ``preprocess`` would for a one-row frame, including the
+degenerate per-call statistics when no ``FittedPreprocessor`` is supplied.
+"""
+
+import math
+from bisect import bisect_left
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.preprocessing.feature_engineering import (
+    ALWAYS_NUMERIC_COLS,
+    CATEGORICAL_COLS,
+    DURATION_BINS,
+    FREQ_ENCODE_COLS,
+    QUOTE_DELAY_BINS,
+    FittedPreprocessor,
+)
+from src.preprocessing.validation import REQUIRED_COLUMNS
+
+# What ``Series.astype(str)`` turns a missing value into (NaN or "None",
+# depending on the pandas version) – used to look up missing categories.
+_MISSING_AS_STR = pd.Series([None], dtype=object).astype(str).iloc[0]
+
+
+def _is_missing(value) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _to_number(value, default: float) -> float:
+    """``pd.to_numeric(errors="coerce")`` followed by ``fillna(default)``."""
+    if value is None:
+        return default
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return default
+    return default if math.isnan(number) else number
+
+
+def _divide(a: float, b: float) -> float:
+    """Float division with NumPy semantics for a zero divisor (inf / nan)."""
+    if b:
+        return a / b
+    return math.nan if a == 0 or math.isnan(a) else math.copysign(math.inf, a)
+
+
+def _bucket(value: float, bins: List[float]) -> float:
+    """Scalar equivalent of ``pd.cut(value, bins, labels=range(...))``."""
+    if math.isnan(value) or not bins[0] < value <= bins[-1]:
+        return math.nan
+    return float(bisect_left(bins, value) - 1)
+
+
+class RowEncoder:
+    """Encode raw row dicts into float32 vectors ordered like ``feature_names``."""
+
+    def __init__(
+        self, feature_names: List[str], fitted: Optional[FittedPreprocessor] = None
+    ):
+        self.feature_names = list(feature_names)
+        self.fitted = fitted
+        self._template = np.zeros(len(self.feature_names), dtype=np.float32)
+
+        self._category_codes: Dict[str, Dict[str, int]] = {}
+        self._missing_codes: Dict[str, int] = {}
+        self._income_edges: List[float] = []
+        if fitted is not None:
+            for col, vocab in fitted.category_vocab.items():
+                codes = {}
+                for i, key in enumerate(vocab):
+                    if _is_missing(key):
+                        self._missing_codes.setdefault(col, i)
+                    else:
+                        codes.setdefault(key, i)
+                self._category_codes[col] = codes
+            self._income_edges = list(fitted.income_bin_edges[1:-1])
+
+    # -- fitted / per-call statistics ---------------------------------------
+
+    def _category(self, col: str, value) -> float:
+        if self.fitted is None:
+            return 0.0  # a one-row LabelEncoder always fits a single class
+        key = _MISSING_AS_STR if _is_missing(value) else str(value)
+        if _is_missing(key):
+            return float(self._missing_codes.get(col, -1))
+        return float(self._category_codes[col].get(key, -1))
+
+    def _income_bracket(self, income: float) -> float:
+        if math.isnan(income):
+            return math.nan
+        if self.fitted is None:
+            return math.nan  # qcut of a single value yields no bins
+        if len(self.fitted.income_bin_edges) < 2:
+            return math.nan
+        return float(bisect_left(self._income_edges, income))
+
+    def _frequency(self, col: str, value: float) -> float:
+        if self.fitted is None:
+            return 1.0
+        return float(self.fitted.freq_tables[col].get(value, 0.0))
+
+    # -- encoding -----------------------------------------------------------
+
+    def features(self, row: dict) -> Dict[str, float]:
+        """Every pipeline column for ``row`` as a name → number mapping."""
+        missing = [c for c in REQUIRED_COLUMNS if c not in row]
+        if missing:
+            raise ValueError(
+                f"Data validation failed:\n  [ERROR]   Missing required columns: {missing}"
+            )
+
+        f: Dict[str, float] = {}
+        for col in ALWAYS_NUMERIC_COLS:
+            if col in row:
+                value = row[col]
+                # Only ``object`` columns (None / strings) get coerced to 0.
+                if value is None or isinstance(value, str):
+                    f[col] = _to_number(value, 0.0)
+                else:
+                    f[col] = float(value)
+
+        f["Has_Broker"] = float(not _is_missing(row["Broker_ID"]))
+        f["Has_Employer"] = float(not _is_missing(row["Employer_ID"]))
+        f["Child_Dependents"] = child = _to_number(row["Child_Dependents"], 0.0)
+        f["Broker_ID"] = _to_number(row["Broker_ID"], -1.0)
+        f["Employer_ID"] = _to_number(row["Employer_ID"], -1.0)
+
+        adult = f["Adult_Dependents"]
+        infant = f["Infant_Dependents"]
+        income = f["Estimated_Annual_Income"]
+        months = f["Previous_Policy_Duration_Months"]
+        days = f["Days_Since_Quote"]
+        grace = f["Grace_Period_Extensions"]
+        riders = f["Custom_Riders_Requested"]
+        vehicles = f["Vehicles_on_Policy"]
+        amendments = f["Policy_Amendments_Count"]
+        claims = f["Previous_Claims_Filed"]
+        underwriting = f["Underwriting_Processing_Days"]
+
+        total = adult + child + infant
+        f["Total_Dependents"] = total
+        f["Has_Children"] = float(child > 0 or infant > 0)
+        f["Family_Size"] = family = total + 1
+        f["Income_Per_Family"] = _divide(income, family)
+        f["Income_Bracket"] = self._income_bracket(income)
+
+        f["Is_New_Policy"] = float(months == 0)
+        f["Duration_Bucket"] = _bucket(months, DURATION_BINS)
+        f["Quick_Purchase"] = float(days <= 7)
+        f["Delayed_Purchase"] = float(days > 90)
+        f["Quote_Delay_Bucket"] = _bucket(days, QUOTE_DELAY_BINS)
+
+        f["Grace_X_Duration"] = grace * months
+        f["Riders_Plus_Vehicles"] = riders + vehicles
+        f["Amendments_X_Duration"] = amendments * months
+
+        f["Has_Claims"] = float(claims > 0)
+        f["Claims_Per_Year"] = _divide(claims, f["Years_Without_Claims"] + 1)
+
+        f["Has_Riders"] = float(riders > 0)
+        f["Has_Vehicles"] = float(vehicles > 0)
+        f["Has_Amendments"] = float(amendments > 0)
+        f["Has_Grace_Ext"] = float(grace > 0)
+
+        med_uw = self.fitted.underwriting_median if self.fitted is not None else underwriting
+        f["Long_Underwriting"] = float(underwriting > med_uw)
+
+        f["rule_renter_premium"] = float(
+            _is_missing(row["Region_Code"]) and income == 0 and
+            row["Deductible_Tier"] == "Tier_4_Zero_Ded" and riders == 0
+        )
+
+        for col in CATEGORICAL_COLS:
+            f[col] = self._category(col, row[col])
+        for col in FREQ_ENCODE_COLS:
+            f[f"{col}_freq"] = self._frequency(col, f[col])
+        return f
+
+    def encode(self, row: dict) -> np.ndarray:
+        """Return a ``(1, n_features)`` float32 matrix for ``row``."""
+        f = self.features(row)
+        x = self._template.copy()
+        x[:] = [f[name] for name in self.feature_names]
+        return x.reshape(1, -1)
@@ -0,0 +1,63 @@
+"""
+test_artifact.py
+----------------
+Unit tests for the native UBJSON model export.
+Run with: pytest test/test_artifact.py -v
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+import sys
+import xgboost as xgb
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.model.artifact import export_model, load_booster, metadata_path
+
+
+@pytest.fixture
+def model():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.random((200, 4)), columns=["a", "b", "c", "d"])
+    y = (X["a"] * 3).astype(int)
+    return xgb.XGBClassifier(n_estimators=5, max_depth=2).fit(X, y), X
+
+
+class TestExportModel:
+    def test_round_trip_predictions(self, model, tmp_path):
+        clf, X = model
+        path = str(tmp_path / "model.ubj")
+        export_model(clf, path)
+        booster, meta = load_booster(path)
+        np.testing.assert_allclose(
+            booster.inplace_predict(X.to_numpy()), clf.predict_proba(X), rtol=1e-6
+        )
+        assert booster.feature_names == ["a", "b", "c", "d"]
+
+    def test_metadata_sidecar(self, model, tmp_path):
+        clf, _ = model
+        path = str(tmp_path / "model.ubj")
+        export_model(clf, path, class_names=["low", "mid", "high"])
+        with open(metadata_path(path)) as fh:
+            meta = json.load(fh)
+        assert metadata_path(path).endswith("model.meta.json")
+        assert meta["classes"] == [0, 1, 2]
+        assert meta["class_names"] == ["low", "mid", "high"]
+        assert meta["feature_names"] == ["a", "b", "c", "d"]
+        assert len(meta["feature_importances"]) == 4
+
+    def test_class_name_count_checked(self, model, tmp_path):
+        clf, _ = model
+        with pytest.raises(ValueError):
+            export_model(clf, str(tmp_path / "model.ubj"), class_names=["only_one"])
+
+    def test_missing_sidecar(self, model, tmp_path):
+        clf, _ = model
+        path = str(tmp_path / "model.ubj")
+        clf.get_booster().save_model(path)
+        with pytest.raises(FileNotFoundError):
+            load_booster(path)
@@ -0,0 +1,90 @@
+"""
+test_batch_pipeline.py
+----------------------
+The process-pool path of the batch pipeline must write exactly what the
+sequential path writes, in the same row order.
+Run with: pytest test/test_batch_pipeline.py -v
+"""
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+import sys
+import xgboost as xgb
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pipelines.batch_pipeline import run_batch
+from src.preprocessing.feature_engineering import FittedPreprocessor
+from src.preprocessing.fused_engine import preprocess_fused
+
+
+def make_raw(n: int, seed: int = 0) -> pd.DataFrame:
+    """``n`` random records with every column the pipeline reads."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "User_ID": [f"U{i}" for i in range(n)],
+        "Estimated_Annual_Income": rng.integers(10_000, 200_000, n),
+        "Adult_Dependents": rng.integers(0, 4, n),
+        "Child_Dependents": np.where(rng.random(n) < 0.1, np.nan, rng.integers(0, 3, n)),
+        "Infant_Dependents": rng.integers(0, 2, n),
+        "Previous_Policy_Duration_Months": rng.integers(0, 60, n),
+        "Days_Since_Quote": rng.integers(0, 120, n),
+        "Grace_Period_Extensions": rng.integers(0, 3, n),
+        "Custom_Riders_Requested": rng.integers(0, 5, n),
+        "Vehicles_on_Policy": rng.integers(0, 3, n),
+        "Policy_Amendments_Count": rng.integers(0, 4, n),
+        "Previous_Claims_Filed": rng.integers(0, 4, n),
+        "Years_Without_Claims": rng.integers(0, 10, n),
+        "Underwriting_Processing_Days": rng.integers(1, 40, n),
+        "Region_Code": rng.choice(["R01", "R02", "R03"], n),
+        "Broker_Agency_Type": rng.choice(["Independent", "Urban_Boutique"], n),
+        "Deductible_Tier": rng.choice(["Tier_1", "Tier_2", "Tier_4_Zero_Ded"], n),
+        "Acquisition_Channel": rng.choice(["Online", "Agent"], n),
+        "Payment_Schedule": rng.choice(["Monthly", "Annual"], n),
+        "Employment_Status": rng.choice(["Employed", "Self_Employed"], n),
+        "Policy_Start_Month": rng.choice(["January", "June"], n),
+        "Broker_ID": np.where(rng.random(n) < 0.2, np.nan, rng.integers(1, 20, n)),
+        "Employer_ID": rng.integers(1, 30, n).astype(float),
+    })
+
+
+@pytest.fixture(scope="module")
+def artifacts(tmp_path_factory):
+    """A small CSV plus a model and fitted preprocessor trained on it."""
+    root = tmp_path_factory.mktemp("batch")
+    raw = make_raw(230)
+    fitted = FittedPreprocessor.fit(raw)
+    features = preprocess_fused(raw, fitted=fitted).drop(columns=["User_ID"])
+    labels = np.random.default_rng(1).integers(0, 3, len(raw))
+    model = xgb.XGBClassifier(n_estimators=5, max_depth=2, n_jobs=1).fit(features, labels)
+
+    model_path = root / "model.joblib"
+    joblib.dump(model, model_path)
+    fitted.save(str(root / "preprocessor.joblib"))
+    raw.to_csv(root / "input.csv", index=False)
+    return root
+
+
+class TestParallelBatch:
+    @pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+    def test_parallel_matches_serial(self, artifacts, tmp_path, suffix):
+        kwargs = dict(
+            input_path=str(artifacts / "input.csv"),
+            model_path=str(artifacts / "model.joblib"),
+            chunk_size=40,  # several blocks, the last one short
+        )
+        serial = tmp_path / f"serial{suffix}"
+        parallel = tmp_path / f"parallel{suffix}"
+        run_batch(output_path=str(serial), **kwargs)
+        run_batch(output_path=str(parallel), workers=2, max_in_flight=2, **kwargs)
+
+        read = pd.read_csv if suffix == ".csv" else pd.read_parquet
+        expected, actual = read(serial), read(parallel)
+        assert len(expected) == 230
+        assert actual["User_ID"].tolist() == [f"U{i}" for i in range(230)]
+        pd.testing.assert_frame_equal(actual, expected)
+        if suffix == ".csv":
+            assert parallel.read_bytes() == serial.read_bytes()
@@ -0,0 +1,102 @@
+"""
+test_columnar_io.py
+-------------------
+Unit tests for Parquet / Arrow input and prediction output.
+Run with: pytest test/test_columnar_io.py -v
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.data.columnar_io import (
+    PredictionWriter,
+    detect_format,
+    iter_input,
+    read_input,
+    write_predictions,
+)
+from src.preprocessing.fused_engine import preprocess_fused
+from test_preprocessing import make_population
+
+
+@pytest.fixture
+def population(tmp_path):
+    df = make_population(300, seed=3)
+    df["Unused_Column"] = "x"
+    df.to_csv(tmp_path / "in.csv", index=False)
+    df.to_parquet(tmp_path / "in.parquet")
+    df.to_feather(tmp_path / "in.arrow")
+    return tmp_path
+
+
+class TestColumnarInput:
+    def test_detect_format(self):
+        assert detect_format("a.parquet") == "parquet"
+        assert detect_format("a.feather") == "arrow"
+        assert detect_format("a.CSV") == "csv"
+        assert detect_format("a.txt") == "csv"
+
+    @pytest.mark.parametrize("name", ["in.parquet", "in.arrow"])
+    def test_projection_drops_unused_columns(self, population, name):
+        df = read_input(population / name)
+        assert "Unused_Column" not in df.columns
+        assert "User_ID" in df.columns
+
+    @pytest.mark.parametrize("name", ["in.parquet", "in.arrow"])
+    def test_compact_dtypes(self, population, name):
+        df = read_input(population / name)
+        assert df["Adult_Dependents"].dtype == np.int32
+        assert isinstance(df["Region_Code"].dtype, pd.CategoricalDtype)
+
+    @pytest.mark.parametrize("name", ["in.parquet", "in.arrow"])
+    def test_features_match_csv(self, population, name):
+        expected = preprocess_fused(read_input(population / "in.csv").drop(columns="Unused_Column"))
+        actual = preprocess_fused(read_input(population / name))
+        cols = [c for c in expected.columns if c != "User_ID"]
+        np.testing.assert_allclose(
+            actual[cols].to_numpy(dtype=float), expected[cols].to_numpy(dtype=float)
+        )
+
+    def test_iter_input_chunks(self, population):
+        sizes = [len(c) for c in iter_input(population / "in.parquet", chunk_size=128)]
+        assert sizes == [128, 128, 44]
+
+
+class TestPredictionOutput:
+    def make_preds(self, n=10):
+        rng = np.random.default_rng(0)
+        proba = rng.random((n, 3))
+        return pd.DataFrame({
+            "User_ID": np.arange(n),
+            "Predicted_Bundle": proba.argmax(axis=1),
+            "Confidence": proba.max(axis=1) * 100,
+            **{f"prob_{i}": proba[:, i] * 100 for i in range(3)},
+        })
+
+    def test_parquet_probabilities_are_float32(self, tmp_path):
+        write_predictions(self.make_preds(), tmp_path / "out.parquet")
+        schema = pq.read_schema(tmp_path / "out.parquet")
+        assert str(schema.field("Confidence").type) == "float"
+        assert str(schema.field("prob_0").type) == "float"
+        assert str(schema.field("User_ID").type) == "int64"
+
+    @pytest.mark.parametrize("name", ["out.parquet", "out.arrow", "out.csv"])
+    def test_writer_appends_chunks(self, tmp_path, name):
+        preds = self.make_preds(10)
+        with PredictionWriter(tmp_path / name) as writer:
+            writer.write(preds.iloc[:6])
+            writer.write(preds.iloc[6:])
+        assert writer.rows == 10
+        if name.endswith(".csv"):
+            out = pd.read_csv(tmp_path / name)
+        elif name.endswith(".parquet"):
+            out = pd.read_parquet(tmp_path / name)
+        else:
+            out = pd.read_feather(tmp_path / name)
+        assert out["User_ID"].tolist() == list(range(10))
@@ -0,0 +1,78 @@
+"""
+test_predictor.py
+-----------------
+Unit tests for ``predictor.predict`` output assembly.
+Run with: pytest test/test_predictor.py -v
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.model.predictor import predict
+
+
+class CountingModel:
+    """Minimal classifier that records how often it is evaluated."""
+
+    classes_ = np.array([10, 20, 30])
+    feature_names_in_ = np.array(["a", "b"])
+
+    def __init__(self):
+        self.calls = 0
+
+    def predict_proba(self, X):
+        self.calls += 1
+        logits = np.column_stack([X["a"], X["b"], X["a"] - X["b"]]).astype(float)
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def predict(self, X):
+        self.calls += 1
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+@pytest.fixture
+def features():
+    # Columns deliberately out of training order.
+    return pd.DataFrame({"User_ID": [1, 2, 3], "b": [0.0, 3.0, 1.0], "a": [2.0, 0.0, 1.0]})
+
+
+class TestPredict:
+    def test_single_model_evaluation(self, features):
+        model = CountingModel()
+        predict(features, model)
+        assert model.calls == 1
+
+    def test_labels_are_argmax_of_probabilities(self, features):
+        out = predict(features, CountingModel())
+        probs = out[["prob_10", "prob_20", "prob_30"]].to_numpy()
+        assert out["Predicted_Bundle"].tolist() == [10, 20, 10]
+        assert out["Predicted_Bundle_Index"].tolist() == probs.argmax(axis=1).tolist()
+        np.testing.assert_allclose(out["Confidence"], probs.max(axis=1))
+        np.testing.assert_allclose(probs.sum(axis=1), 100.0)
+
+    def test_columns(self, features):
+        out = predict(features, CountingModel())
+        assert list(out.columns) == [
+            "User_ID", "Predicted_Bundle", "Predicted_Bundle_Index", "Confidence",
+            "prob_10", "prob_20", "prob_30",
+        ]
+        assert out["User_ID"].tolist() == [1, 2, 3]
+
+    def test_top_k(self, features):
+        full = predict(features, CountingModel())
+        out = predict(features, CountingModel(), top_k=2)
+        assert [c for c in out.columns if c.startswith("prob_")] == []
+        assert out["Top1_Bundle"].tolist() == full["Predicted_Bundle"].tolist()
+        np.testing.assert_allclose(out["Top1_Prob"], full["Confidence"])
+        assert (out["Top1_Prob"] >= out["Top2_Prob"]).all()
+        assert "Top3_Bundle" not in out.columns
+
+    def test_top_k_capped_at_class_count(self, features):
+        out = predict(features, CountingModel(), top_k=10)
+        assert "Top3_Bundle" in out.columns and "Top4_Bundle" not in out.columns
@@ -25,7 +25,10 @@ from src.preprocessing.feature_engineering import (
     build_rule_features,
     preprocess,
     CATEGORICAL_COLS,
+    FittedPreprocessor,
 )
+from src.preprocessing.fused_engine import preprocess_fused, build_feature_matrix
+from src.preprocessing.row_encoder import RowEncoder
 from src.preprocessing.validation import validate, ValidationReport
 
 
@@ -66,6 +69,39 @@ def make_df(*rows) -> pd.DataFrame:
     return pd.DataFrame([make_minimal_row(**r) for r in rows])
 
 
+def make_population(n: int = 200, seed: int = 0) -> pd.DataFrame:
+    """Return ``n`` varied raw records, including nulls in nullable columns."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i in range(n):
+        rows.append({
+            "User_ID": i,
+            "Estimated_Annual_Income": int(rng.integers(0, 200_000)),
+            "Adult_Dependents": int(rng.integers(0, 4)),
+            "Child_Dependents": None if rng.random() < 0.2 else float(rng.integers(0, 4)),
+            "Infant_Dependents": int(rng.integers(0, 2)),
+            "Previous_Policy_Duration_Months": int(rng.integers(0, 40)),
+            "Days_Since_Quote": int(rng.integers(0, 300)),
+            "Grace_Period_Extensions": int(rng.integers(0, 3)),
+            "Custom_Riders_Requested": int(rng.integers(0, 4)),
+            "Vehicles_on_Policy": int(rng.integers(0, 3)),
+            "Policy_Amendments_Count": int(rng.integers(0, 5)),
+            "Previous_Claims_Filed": int(rng.integers(0, 4)),
+            "Years_Without_Claims": int(rng.integers(0, 10)),
+            "Underwriting_Processing_Days": int(rng.integers(0, 30)),
+            "Region_Code": None if rng.random() < 0.1 else str(rng.choice(["R01", "R02", "R03"])),
+            "Broker_Agency_Type": str(rng.choice(["Independent", "Urban_Boutique"])),
+            "Deductible_Tier": str(rng.choice(["Tier_1", "Tier_2", "Tier_4_Zero_Ded"])),
+            "Acquisition_Channel": str(rng.choice(["Online", "Direct_Website", "Agent"])),
+            "Payment_Schedule": str(rng.choice(["Monthly", "Annual"])),
+            "Employment_Status": str(rng.choice(["Employed", "Self_Employed"])),
+            "Policy_Start_Month": str(rng.choice(["January", "March", "July"])),
+            "Broker_ID": None if rng.random() < 0.3 else float(rng.integers(1, 20)),
+            "Employer_ID": None if rng.random() < 0.3 else float(rng.integers(1, 50)),
+        })
+    return pd.DataFrame(rows)
+
+
 # ── Missing value tests ───────────────────────────────────────────────────────
 
 class TestFillMissingValues:
@@ -188,6 +224,133 @@ class TestPreprocess:
             )
 
 
+# ── Fitted preprocessor tests ─────────────────────────────────────────────────
+
+class TestFittedPreprocessor:
+    def test_transform_on_training_data_matches_per_call_fit(self):
+        df = make_population()
+        fitted = FittedPreprocessor.fit(df)
+        pd.testing.assert_frame_equal(
+            fitted.transform(df), preprocess(df), check_dtype=False
+        )
+
+    def test_single_row_matches_full_frame_encoding(self):
+        df = make_population()
+        fitted = FittedPreprocessor.fit(df)
+        full = fitted.transform(df)
+        for i in (0, 17, 123):
+            single = fitted.transform(df.iloc[[i]].reset_index(drop=True))
+            pd.testing.assert_frame_equal(
+                single, full.iloc[[i]].reset_index(drop=True), check_dtype=False
+            )
+
+    def test_chunks_match_full_frame_encoding(self):
+        df = make_population()
+        fitted = FittedPreprocessor.fit(df)
+        chunks = [fitted.transform(df.iloc[i:i + 50]) for i in range(0, len(df), 50)]
+        pd.testing.assert_frame_equal(
+            pd.concat(chunks), fitted.transform(df), check_dtype=False
+        )
+
+    def test_unseen_values_fall_back(self):
+        fitted = FittedPreprocessor.fit(make_population())
+        out = fitted.transform(make_df({
+            "Region_Code": "R99", "Broker_ID": 999.0,
+            "Estimated_Annual_Income": 10_000_000,
+        }))
+        assert out["Region_Code"].iloc[0] == -1
+        assert out["Broker_ID_freq"].iloc[0] == 0.0
+        assert out["Income_Bracket"].iloc[0] == len(fitted.income_bin_edges) - 2
+
+    def test_save_load_roundtrip(self, tmp_path):
+        df = make_population()
+        fitted = FittedPreprocessor.fit(df)
+        path = tmp_path / "preprocessor.joblib"
+        fitted.save(str(path))
+        loaded = FittedPreprocessor.load(str(path))
+        pd.testing.assert_frame_equal(loaded.transform(df), fitted.transform(df))
+
+
+# ── Fused engine parity tests ─────────────────────────────────────────────────
+
+class TestFusedEngine:
+    def test_matches_preprocess(self):
+        df = make_population()
+        pd.testing.assert_frame_equal(preprocess_fused(df), preprocess(df))
+
+    def test_matches_preprocess_with_fitted_state(self):
+        df = make_population()
+        fitted = FittedPreprocessor.fit(df)
+        pd.testing.assert_frame_equal(
+            preprocess_fused(df, fitted=fitted), preprocess(df, fitted=fitted)
+        )
+
+    def test_matches_preprocess_on_single_json_row(self):
+        df = make_df({"Child_Dependents": None, "Broker_ID": None, "Region_Code": None})
+        pd.testing.assert_frame_equal(preprocess_fused(df), preprocess(df))
+
+    def test_matches_preprocess_on_object_columns(self):
+        df = make_population(20).astype(object)
+        pd.testing.assert_frame_equal(preprocess_fused(df), preprocess(df))
+
+    def test_columns_restrict_and_order_output(self):
+        df = make_population()
+        cols = ["Long_Underwriting", "Region_Code", "Income_Bracket", "Broker_ID_freq"]
+        pd.testing.assert_frame_equal(preprocess_fused(df, columns=cols), preprocess(df)[cols])
+
+    def test_feature_matrix_matches_preprocess(self):
+        df = make_population()
+        cols = [c for c in preprocess(df).columns if c != "User_ID"]
+        X = build_feature_matrix(df, cols)
+        assert X.dtype == np.float32
+        np.testing.assert_array_equal(X, preprocess(df)[cols].to_numpy(dtype=np.float32))
+
+    def test_no_side_effects_on_input(self):
+        df = make_population(10)
+        before = df.copy()
+        _ = preprocess_fused(df)
+        pd.testing.assert_frame_equal(df, before)
+
+
+# ── Single-row encoder tests ──────────────────────────────────────────────────
+
+def _feature_cols(df: pd.DataFrame) -> list:
+    return [c for c in preprocess(df).columns if c != "User_ID"]
+
+
+class TestRowEncoder:
+    def test_matches_pipeline_without_fitted_state(self):
+        pop = make_population(30)
+        cols = _feature_cols(pop)
+        encoder = RowEncoder(cols)
+        for row in pop.astype(object).where(pop.notna(), None).to_dict("records"):
+            expected = build_feature_matrix(pd.DataFrame([row]), cols)
+            np.testing.assert_array_equal(encoder.encode(row), expected)
+
+    def test_matches_pipeline_with_fitted_state(self):
+        pop = make_population()
+        fitted = FittedPreprocessor.fit(pop)
+        cols = _feature_cols(pop)
+        encoder = RowEncoder(cols, fitted)
+        rows = pop.astype(object).where(pop.notna(), None).to_dict("records")
+        rows.append(make_minimal_row(Region_Code="R99", Broker_ID=999.0))
+        for row in rows:
+            expected = build_feature_matrix(pd.DataFrame([row]), cols, fitted=fitted)
+            np.testing.assert_array_equal(encoder.encode(row), expected)
+
+    def test_output_shape_and_dtype(self):
+        cols = _feature_cols(make_population(5))
+        x = RowEncoder(cols).encode(make_minimal_row())
+        assert x.shape == (1, len(cols))
+        assert x.dtype == np.float32
+
+    def test_missing_required_column_raises(self):
+        row = make_minimal_row()
+        del row["Region_Code"]
+        with pytest.raises(ValueError):
+            RowEncoder(["Region_Code"]).encode(row)
+
+
 # ── Validation tests ──────────────────────────────────────────────────────────
 
 class TestValidation: